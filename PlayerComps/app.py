@@ -1,15 +1,22 @@
 import streamlit as st
-from main import df, find_similar_players
+from main import find_similar_players, name_index
+from shared.instrument import debug_enabled, debug_panel
 
-player_list = sorted(df['player'].unique())
+names = name_index()
 st.title("NBA Player Similarity Finder")
 
-selected_player = st.selectbox("Select a player", player_list)
+player_query = st.text_input("Search player", "LeBron James")
+matches = names.search(player_query, limit=20) or [names.resolve("LeBron James")]
+player_id = st.selectbox("Select a player", matches, format_func=names.label)
+selected_player = names.name(player_id)
 season = st.number_input("Select season", min_value=1976, max_value=2025, value=2023)
 
 if st.button("Find Similar Players"):
-    result = find_similar_players(selected_player, season)
+    result = find_similar_players(selected_player, season, player_id=player_id)
     if isinstance(result, str):
         st.error(result)
     else:
         st.dataframe(result)
+
+if debug_enabled():
+    debug_panel()
@@ -1,10 +1,23 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.canonical import COMPS_TRADED
+from shared.data_store import load_table
+from shared.filters import FilterIndex
+from shared.instrument import stage, timed
+from shared.features import load_feature_artifact, weight_vector
+from shared.lookup import player_season_index
+from shared.name_search import name_index  # player selectors
+from shared.similarity import SimilarityEngine, WeightedSimilarity
+from shared.embedding import DEFAULT_DIMS as EMBED_DIMS, load_embedding
+from shared.archetypes import DEFAULT_CLUSTERS, load_or_fit_archetypes
+
 # Load and clean the data
-df = pd.read_csv("../data/Per 100 Poss.csv")
+df = load_table("Per 100 Poss", traded=COMPS_TRADED, floats="float32")
 df = df.drop(columns=['birth_year'], errors='ignore')  # Drop unused column
 
 # Identity columns (non-numeric, metadata)
@@ -23,11 +36,7 @@ df[numeric_cols] = df[numeric_cols].fillna(0)
 df = df[identity_cols + numeric_cols].copy()
 df = df.loc[:, ~df.columns.duplicated()]  # Remove any duplicate columns
 df = df.reset_index(drop=True)
-
-# Scale numeric features
-features = df[numeric_cols].values
-scaler = StandardScaler()
-features_scaled = scaler.fit_transform(features)
+season_index = player_season_index(df)
 
 # === Weight important stats ===
 weights_by_stat = {
@@ -61,26 +70,69 @@ weights_by_stat = {
     'x2p_percent': 1.0,
 }
 
-# Apply weights
-weights = np.ones(len(numeric_cols))
-for i, col in enumerate(numeric_cols):
-    weights[i] = weights_by_stat.get(col, 1.0)
-
-features_weighted = features_scaled * weights
-similarity_matrix = cosine_similarity(features_weighted)
+# Scaler fit, weights and the scaled/weighted float32 features come from a
+# cached artifact; it is rebuilt when the source CSVs or weights_by_stat change
+artifact = load_feature_artifact("per100", df, numeric_cols, weights_by_stat, sources=["Per 100 Poss"])
+features_weighted = artifact.features
+
+# Only the normalized N x d matrix is kept; each query is scored on demand.
+# Set NBA_COMPS_PRECISION=float16 or int8 to store it more compactly, or
+# NBA_COMPS_EMBED_DIM=<k> to search a k-dim PCA embedding instead.
+engine = SimilarityEngine.from_normalized(artifact.vectors)
+if EMBED_DIMS:
+    engine = load_embedding("per100", artifact, EMBED_DIMS).engine()
+
+# Season-sorted positions and column arrays for filtered comps
+filter_index = FilterIndex(df)
+
+# Standardized features for query-time weights, built on first use
+_weighted_engine = None
+
+def get_weighted_engine():
+    global _weighted_engine
+    if _weighted_engine is None:
+        _weighted_engine = WeightedSimilarity.from_artifact(artifact)
+    return _weighted_engine
+
+# Style archetypes (shared/archetypes.py), loaded or fitted on first use. The
+# default clustering's labels enable the archetype filter; df is left as is.
+_archetypes = {}
+
+def get_archetypes(n_clusters=DEFAULT_CLUSTERS):
+    if n_clusters not in _archetypes:
+        archetypes = load_or_fit_archetypes("per100", df, artifact, n_clusters)
+        if n_clusters == DEFAULT_CLUSTERS:
+            filter_index.set_archetypes(archetypes.labels)
+        _archetypes[n_clusters] = archetypes
+    return _archetypes[n_clusters]
 
 # Player similarity function
-def find_similar_players(player_name, season, top_n=5):
-    idx = df[(df['player'] == player_name) & (df['season'] == season)].index
-    if len(idx) == 0:
+@timed("comps.find_similar_players")
+def find_similar_players(player_name, season, top_n=5, seasons=None, pos=None, lg=None, min_mp=None, min_g=None,
+                         weights=None, same_archetype=False, player_id=None):
+    # player_id (from shared.name_search) tells apart players who share a name
+    if player_id is not None:
+        idx = name_index().position(df, player_id, season)
+    else:
+        idx = season_index.position(player_name, season)
+    if idx is None:
         return f"No data for {player_name} in {season}"
-    idx = idx[0]
 
-    scores = similarity_matrix[idx]
-    top_indices = np.argsort(scores)[::-1][1:top_n+1]
+    # Filters select candidate rows before scoring; seasons is (first, last).
+    # weights ({stat: weight}, like weights_by_stat) re-weights this query only;
+    # same_archetype keeps only rows of the queried season's archetype.
+    archetype = get_archetypes().labels[idx] if same_archetype else None
+    candidates = filter_index.candidates(seasons=seasons, pos=pos, lg=lg, min_mp=min_mp, min_g=min_g,
+                                         archetype=archetype)
+    with stage("comps.search"):
+        if weights is not None:
+            top_indices, scores = get_weighted_engine().top_k(
+                idx, top_n, weight_vector(numeric_cols, weights), candidates=candidates)
+        else:
+            top_indices, scores = engine.top_k(idx, top_n, candidates=candidates)
 
     result_df = df.iloc[top_indices][['player', 'season', 'tm']].copy()
-    result_df['similarity'] = scores[top_indices]
+    result_df['similarity'] = scores
 
     return result_df
 
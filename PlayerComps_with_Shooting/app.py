@@ -1,15 +1,39 @@
 import streamlit as st
-from main import df, find_similar_players
+from main import df, find_similar_players, get_league_map, name_index
+from shared.instrument import debug_enabled, debug_panel
 
-player_list = sorted(df['player'].unique())
+names = name_index()
 st.title("NBA Player Similarity Finder")
 
-selected_player = st.selectbox("Select a player", player_list)
+player_query = st.text_input("Search player", "LeBron James")
+matches = names.search(player_query, limit=20) or [names.resolve("LeBron James")]
+player_id = st.selectbox("Select a player", matches, format_func=names.label)
+selected_player = names.name(player_id)
 season = st.number_input("Select season", min_value=1976, max_value=2025, value=2023)
 
 if st.button("Find Similar Players"):
-    result = find_similar_players(selected_player, season)
+    result = find_similar_players(selected_player, season, player_id=player_id)
     if isinstance(result, str):
         st.error(result)
     else:
         st.dataframe(result)
+
+st.header("League map")
+map_season = st.slider("Season", int(df['season'].min()), int(df['season'].max()), 2023)
+if st.checkbox("Show league map"):
+    import altair as alt
+
+    # Player-seasons on the first two principal components of the comps features
+    layout = get_league_map()
+    layout = layout[layout['season'] == map_season].copy()
+    key_col, key = names.key(player_id)
+    layout['selected'] = layout[key_col] == key
+    chart = alt.Chart(layout).mark_circle().encode(
+        x=alt.X('x', title='PC 1'), y=alt.Y('y', title='PC 2'),
+        color='pos', size=alt.condition('datum.selected', alt.value(200), alt.value(30)),
+        tooltip=['player', 'season', 'tm', 'pos'],
+    ).interactive()
+    st.altair_chart(chart, width="stretch")
+
+if debug_enabled():
+    debug_panel()
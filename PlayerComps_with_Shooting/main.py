@@ -1,21 +1,36 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.canonical import COMPS_TRADED
+from shared.data_store import load_table
+from shared.filters import FilterIndex
+from shared.instrument import stage, timed
+from shared.features import load_feature_artifact, weight_vector
+from shared.lookup import player_season_index
+from shared.name_search import name_index  # player selectors
+from shared.similarity import SimilarityEngine, WeightedSimilarity
+from shared.trajectory import TrajectoryIndex
+from shared.ann import load_or_build_index
+from shared.embedding import DEFAULT_DIMS as EMBED_DIMS, load_embedding
+from shared.archetypes import DEFAULT_CLUSTERS, load_or_fit_archetypes
+
 # Load and clean the primary data (Per 100 Poss)
-df_main = pd.read_csv("../data/Per 100 Poss.csv")
+df_main = load_table("Per 100 Poss", traded=COMPS_TRADED, floats="float32")
 df_main = df_main[df_main['season'] >= 1997].copy()
 df_main.drop(columns=['birth_year'], inplace=True, errors='ignore')
 
 # Load and clean Player Shooting data
-df_shooting = pd.read_csv("../data/Player Shooting.csv")
+df_shooting = load_table("Player Shooting", floats="float32")
 df_shooting.drop(columns=['season', 'player_id', 'player', 'pos', 'age', 'experience', 'lg', 'tm', 'fg_percent', 'birth_year'], errors='ignore', inplace=True)
 df_shooting.fillna(0, inplace=True)
 
 # Merge shooting data on seas_id
-df = df_main.merge(df_shooting, on='seas_id', how='left')
-df.fillna(0, inplace=True)
+with stage("comps.merge"):
+    df = df_main.merge(df_shooting, on='seas_id', how='left')
 
 # Identity columns (non-numeric, metadata)
 identity_cols = [
@@ -33,11 +48,7 @@ df[numeric_cols] = df[numeric_cols].fillna(0)
 df = df[identity_cols + numeric_cols].copy()
 df = df.loc[:, ~df.columns.duplicated()]
 df = df.reset_index(drop=True)
-
-# Scale numeric features
-features = df[numeric_cols].values
-scaler = StandardScaler()
-features_scaled = scaler.fit_transform(features)
+season_index = player_season_index(df)
 
 weights_by_stat = {
     # === Role and Output (Tier 1: 3.0) ===
@@ -100,27 +111,108 @@ weights_by_stat = {
     'num_heaves_made': 0.05
 }
 
-# Apply weights
-weights = np.ones(len(numeric_cols))
-for i, col in enumerate(numeric_cols):
-    weights[i] = weights_by_stat.get(col, 1.0)
-
-features_weighted = features_scaled * weights
-similarity_matrix = cosine_similarity(features_weighted)
+# Scaler fit, weights and the scaled/weighted float32 features come from a
+# cached artifact; it is rebuilt when the source CSVs or weights_by_stat change
+artifact = load_feature_artifact("shooting", df, numeric_cols, weights_by_stat, sources=["Per 100 Poss", "Player Shooting"])
+features_weighted = artifact.features
+
+# Only the normalized N x d matrix is kept; each query is scored on demand.
+# Set NBA_COMPS_PRECISION=float16 or int8 to store it more compactly, or
+# NBA_COMPS_EMBED_DIM=<k> to search a k-dim PCA embedding instead.
+engine = SimilarityEngine.from_normalized(artifact.vectors)
+if EMBED_DIMS:
+    engine = load_embedding("shooting", artifact, EMBED_DIMS).engine()
+
+# Season-sorted positions and column arrays for filtered comps
+filter_index = FilterIndex(df)
+
+# Optional approximate index, loaded from data/cache on first use
+_ann_index = None
+
+def get_ann_index(n_probe=8):
+    global _ann_index
+    if _ann_index is None:
+        _ann_index = load_or_build_index("comps_with_shooting", artifact.vectors, n_probe=n_probe)
+    return _ann_index
+
+# Standardized features for query-time weights, built on first use
+_weighted_engine = None
+
+def get_weighted_engine():
+    global _weighted_engine
+    if _weighted_engine is None:
+        _weighted_engine = WeightedSimilarity.from_artifact(artifact)
+    return _weighted_engine
+
+# Style archetypes (shared/archetypes.py), loaded or fitted on first use. The
+# default clustering's labels enable the archetype filter; df is left as is.
+_archetypes = {}
+
+def get_archetypes(n_clusters=DEFAULT_CLUSTERS):
+    if n_clusters not in _archetypes:
+        archetypes = load_or_fit_archetypes("shooting", df, artifact, n_clusters)
+        if n_clusters == DEFAULT_CLUSTERS:
+            filter_index.set_archetypes(archetypes.labels)
+        _archetypes[n_clusters] = archetypes
+    return _archetypes[n_clusters]
 
 # Player similarity function
-def find_similar_players(player_name, season, top_n=10):
-    idx = df[(df['player'] == player_name) & (df['season'] == season)].index
-    if len(idx) == 0:
+@timed("comps.find_similar_players")
+def find_similar_players(player_name, season, top_n=10, approximate=False, n_probe=None,
+                         seasons=None, pos=None, lg=None, min_mp=None, min_g=None, weights=None,
+                         same_archetype=False, player_id=None):
+    # player_id (from shared.name_search) tells apart players who share a name
+    if player_id is not None:
+        idx = name_index().position(df, player_id, season)
+    else:
+        idx = season_index.position(player_name, season)
+    if idx is None:
         return f"No data for {player_name} in {season}"
-    idx = idx[0]
 
-    scores = similarity_matrix[idx]
-    top_indices = np.argsort(scores)[::-1][1:top_n+1]
+    # Filters select candidate rows before scoring; seasons is (first, last).
+    # A filtered query is exact over its candidates, so it skips the ANN index.
+    # weights ({stat: weight}, like weights_by_stat) re-weights this query only;
+    # same_archetype keeps only rows of the queried season's archetype.
+    archetype = get_archetypes().labels[idx] if same_archetype else None
+    candidates = filter_index.candidates(seasons=seasons, pos=pos, lg=lg, min_mp=min_mp, min_g=min_g,
+                                         archetype=archetype)
+    if weights is not None:
+        with stage("comps.search"):
+            top_indices, scores = get_weighted_engine().top_k(
+                idx, top_n, weight_vector(numeric_cols, weights), candidates=candidates)
+    elif approximate and candidates is None:
+        top_indices, scores = get_ann_index().search(artifact.vectors[idx], top_n, n_probe=n_probe, exclude=idx)
+    else:
+        with stage("comps.search"):
+            top_indices, scores = engine.top_k(idx, top_n, candidates=candidates)
 
     result_df = df.iloc[top_indices][['player', 'season', 'tm']].copy()
-    result_df['similarity'] = scores[top_indices]
+    result_df['similarity'] = scores
 
     return result_df
 
-__all__ = ['df', 'find_similar_players']
+# 2D league map: every player-season on the first two principal components
+def get_league_map():
+    return load_embedding("shooting", artifact, max(EMBED_DIMS or 2, 2)).league_map(df)
+
+# Career arcs: padded players x ages x features tensor, built on first use
+_trajectories = {}
+
+def get_trajectory_index(key="age"):
+    if key not in _trajectories:
+        _trajectories[key] = TrajectoryIndex(df, artifact.vectors, key=key)
+    return _trajectories[key]
+
+def find_similar_trajectories(player_name, start, end, top_n=10, key="age", min_overlap=1):
+    # Players whose seasons at age (or experience) start..end most resemble player_name's
+    ids = df.loc[df['player'] == player_name, 'player_id'].dropna()
+    if ids.empty:
+        return f"No data for {player_name}"
+    player_id = ids.value_counts().idxmax()  # the most-played player of that name
+
+    try:
+        return get_trajectory_index(key).similar(player_id, start, end, top_n=top_n, min_overlap=min_overlap)
+    except ValueError as e:
+        return str(e)
+
+__all__ = ['df', 'find_similar_players', 'find_similar_trajectories']
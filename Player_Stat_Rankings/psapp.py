@@ -1,6 +1,15 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.data_store import load_table
+from shared.honors import honors_table
+from shared.name_search import name_index
+from shared.rankings import load_rank_table
+
 # Load all stat types
 
 def ordinal(n):
@@ -10,19 +19,23 @@ def ordinal(n):
         suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
     return f"{n}{suffix}"
 
-@st.cache_data
+@st.cache_resource
 def load_stats():
-    per_game = pd.read_csv("../data/Player Per Game.csv")
-    per_100 = pd.read_csv("../data/Per 100 Poss.csv")
-    totals = pd.read_csv("../data/Player Totals.csv")
+    per_game = load_table("Player Per Game")
+    per_100 = load_table("Per 100 Poss")
+    totals = load_table("Player Totals")
     return per_game, per_100, totals
 
-@st.cache_data
+@st.cache_resource
+def load_ranks(view, min_g, min_mp):
+    return load_rank_table(view, min_g=min_g, min_mp=min_mp)
+
+@st.cache_resource
 def load_honors():
-    all_star = pd.read_csv("../data/All-Star Selections.csv")
-    eos_teams = pd.read_csv("../data/End of Season Teams.csv")  # Use this for honors, not the Voting one
-    award_shares = pd.read_csv("../data/Player Award Shares.csv")
-    career_info = pd.read_csv("../data/Player Career Info.csv")
+    all_star = load_table("All-Star Selections")
+    eos_teams = load_table("End of Season Teams")  # Use this for honors, not the Voting one
+    award_shares = load_table("Player Award Shares")
+    career_info = load_table("Player Career Info")
     return all_star, eos_teams, award_shares, career_info
 
 all_star_df, eos_teams_df, award_shares_df, career_info_df = load_honors()
@@ -31,42 +44,33 @@ all_star_df, eos_teams_df, award_shares_df, career_info_df = load_honors()
 
 per_game_df, per_100_df, totals_df = load_stats()
 
-# Combine player list and year range
-all_players = sorted(set(per_game_df["player"].dropna()))
+# Year range; players are found through the name index
 all_seasons = sorted(per_game_df["season"].unique(), reverse=True)
+names = name_index()
 
 # Sidebar Inputs
 st.title("📊 NBA Stat Presenter")
 
-selected_player = st.selectbox("Select Player", all_players, index=all_players.index("LeBron James") if "LeBron James" in all_players else 0)
+player_query = st.text_input("Search Player", "LeBron James")
+matches = names.search(player_query, limit=20) or [names.resolve("LeBron James")]
+player_id = st.selectbox("Select Player", matches, format_func=names.label)
+selected_player = names.name(player_id)
 selected_season = st.selectbox("Select Season", all_seasons)
 view_mode = st.radio("Stat View Mode", ["Per Game", "Per 100 Possessions", "Total"])
+with st.expander("Ranking qualifiers"):
+    min_g = st.number_input("Minimum games", min_value=0, value=0, step=1)
+    min_mp = st.number_input("Minimum minutes", min_value=0, value=0, step=100)
 
 # Filter honors
-is_all_star = not all_star_df[
-    (all_star_df["player"] == selected_player) &
-    (all_star_df["season"] == selected_season)
-].empty
-
-season_honors = eos_teams_df[
-    (eos_teams_df["player"] == selected_player) &
-    (eos_teams_df["season"] == selected_season)
-]
-
-season_awards = award_shares_df[
-    (award_shares_df["player"] == selected_player) &
-    (award_shares_df["season"] == selected_season)
-]
-
-hof_status = career_info_df[
-    (career_info_df["player"].str.lower() == selected_player.lower())
-]
-
-is_hof = not hof_status.empty and hof_status.iloc[0]["hof"] == True
+honors = honors_table(all_star_df, eos_teams_df, award_shares_df, career_info_df).get(
+    player_id, selected_season)
+is_all_star = honors["all_star"]
+is_hof = honors["hof"]
 
 # Choose correct dataset
 if view_mode == "Per Game":
     stat_df = per_game_df
+    rank_view = "per_game"
     priority_stats = [
     "pts_per_game", "ast_per_game", "trb_per_game",
     "stl_per_game", "blk_per_game", "tov_per_game",
@@ -78,6 +82,7 @@ if view_mode == "Per Game":
 
 elif view_mode == "Per 100 Possessions":
     stat_df = per_100_df
+    rank_view = "per_100"
     priority_stats = [
         "pts_per_100_poss", "ast_per_100_poss", "trb_per_100_poss",
         "stl_per_100_poss", "blk_per_100_poss", "tov_per_100_poss",
@@ -90,6 +95,7 @@ elif view_mode == "Per 100 Possessions":
     ]
 else:
     stat_df = totals_df
+    rank_view = "totals"
     priority_stats = [
         "pts", "ast", "trb", "stl", "blk", "tov",  
         "fg", "fga", "fg_percent",
@@ -99,14 +105,19 @@ else:
     ]
 
 # --- Filter player and season ---
-filtered = stat_df[(stat_df["player"] == selected_player) & (stat_df["season"] == selected_season)]
+row_pos = names.position(stat_df, player_id, selected_season)
 
-if filtered.empty:
+if row_pos is None:
     st.error("No stats available for this player in that season.")
 else:
     st.subheader(f"{selected_player} — {selected_season} Season ({view_mode})")
 
-    stats = filtered.iloc[0]
+    stats = stat_df.iloc[row_pos]
+    rank_table = load_ranks(rank_view, min_g, min_mp)
+    ranks = rank_table.for_row(row_pos)
+    pool = int(rank_table.pool[row_pos])
+    if not ranks:
+        st.caption("Not ranked: below the qualifiers, or a partial-season team line.")
 
     # Show only numeric stats (including g, gs, mp)
     numeric_stats = stats.drop(labels=["seas_id", "player_id", "season"], errors="ignore")
@@ -121,7 +132,11 @@ else:
     cols = st.columns(4)
     for i, (stat, value) in enumerate(numeric_stats.items()):
         with cols[i % 4]:
-            st.metric(label=stat.replace("_", " ").title(), value=round(value, 2))
+            rank = ranks.get(stat)
+            st.metric(
+                label=stat.replace("_", " ").title(), value=round(value, 2),
+                delta=f"{ordinal(rank[0])} of {pool}" if rank else None, delta_color="off",
+            )
 
 
     st.markdown("### 🏅 Awards & Honors")
@@ -144,8 +159,7 @@ else:
         """, unsafe_allow_html=True)
 
 
-    for _, row in season_honors.iterrows():
-        honor_text = f"{row['type']} {row['number_tm']} Team"
+    for honor_text in honors["teams"]:
         st.markdown(f"""
         <div style="
             background: linear-gradient(90deg, gold, goldenrod);
@@ -163,25 +177,13 @@ else:
         """, unsafe_allow_html=True)
 
 
-    for _, row in season_awards.iterrows():
-        award_name = row['award'].upper()
-        season = row['season']
-
-        # Get all players for this award & season
-        award_season_df = award_shares_df[
-        (award_shares_df["season"] == season) & (award_shares_df["award"] == row["award"])
-        ].sort_values(by="pts_won", ascending=False).reset_index(drop=True)
-
-        # Rank placement (1-based)
-        player_rank = (
-            award_season_df[award_season_df["player"] == selected_player].index[0] + 1
-            if selected_player in award_season_df["player"].values else None
-        )
+    for award in honors["awards"]:
+        award_name = award["award"].upper()
 
-        if row['winner'] == "TRUE":
+        if award["winner"]:
             banner_text = f"{award_name} Winner 🏆"
         else:
-            banner_text = f"{award_name}: {ordinal(player_rank)} Place ({round(row['share'] * 100, 1)}% Vote Share)"
+            banner_text = f"{award_name}: {ordinal(award['rank'])} Place ({round(award['share'] * 100, 1)}% Vote Share)"
 
         st.markdown(f"""
         <div style="
@@ -1,12 +1,20 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 
-# Load data
-@st.cache_data
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.data_store import load_table
+from shared.lookup import row_index
+from shared.name_search import name_index
+
+# Load data (cache_resource: the same frames every rerun, so their indexes are reused)
+@st.cache_resource
 def load_data():
-    per_game = pd.read_csv("data/Player Per Game.csv")
-    per_100 = pd.read_csv("data/Per 100 Poss.csv")
-    totals = pd.read_csv("data/Player Totals.csv")
+    per_game = load_table("Player Per Game")
+    per_100 = load_table("Per 100 Poss")
+    totals = load_table("Player Totals")
     return per_game, per_100, totals
 
 per_game_df, per_100_df, totals_df = load_data()
@@ -14,21 +22,29 @@ per_game_df, per_100_df, totals_df = load_data()
 # UI Inputs
 st.title("NBA Stat Presenter")
 
-selected_player = st.text_input("Enter Player Name (e.g., LeBron James):")
+names = name_index()
+player_query = st.text_input("Enter Player Name (e.g., LeBron James):")
+matches = names.search(player_query) if player_query else []
+player_id = st.selectbox("Player", matches, format_func=names.label) if matches else None
+selected_player = names.name(player_id) if player_id is not None else None
 selected_season = st.number_input("Enter Season Year (e.g., 2023):", min_value=1947, max_value=2025, step=1)
 mode = st.selectbox("Select Stat View:", ["Per Game", "Per 100 Possessions", "Total"])
 
 # Display logic
-def filter_stats(df, player_name, season):
-    return df[(df["player"].str.lower() == player_name.lower()) & (df["season"] == season)]
+def filter_stats(df, player_id, season):
+    col, key = names.key(player_id)
+    return row_index(df, [col, "season"]).rows(df, key, season)
+
+if player_query and not matches:
+    st.warning("No player matches that name.")
 
 if selected_player and selected_season:
     if mode == "Per Game":
-        filtered = filter_stats(per_game_df, selected_player, selected_season)
+        filtered = filter_stats(per_game_df, player_id, selected_season)
     elif mode == "Per 100 Possessions":
-        filtered = filter_stats(per_100_df, selected_player, selected_season)
+        filtered = filter_stats(per_100_df, player_id, selected_season)
     else:  # Total
-        filtered = filter_stats(totals_df, selected_player, selected_season)
+        filtered = filter_stats(totals_df, player_id, selected_season)
 
     if not filtered.empty:
         st.subheader(f"{selected_player} - {selected_season} Season Stats ({mode})")
@@ -2,10 +2,11 @@ import streamlit as st
 
 st.set_page_config(page_title="NBA Shot Chart", layout="centered")
 
-import pandas as pd
-from main import load_shooting_data, load_league_averages, get_player_shot_profile, plot_shot_chart
+from main import load_shooting_data, load_league_averages, shot_chart_bytes
+from shared.name_search import name_index
+from shared.instrument import debug_enabled, debug_panel
 
-@st.cache_data
+@st.cache_resource
 def load_data():
     return load_shooting_data(), load_league_averages()
 
@@ -16,8 +17,11 @@ st.markdown("Enter a player name and season to explore their shooting zones and
 
 # Sidebar input
 st.sidebar.header("Select Player and Enter Season")
-players = sorted(df["player"].dropna().unique())
-selected_player = st.sidebar.selectbox("Player", players)
+names = name_index()
+player_query = st.sidebar.text_input("Search player", "LeBron James")
+matches = names.search(player_query, limit=20) or [names.resolve("LeBron James")]
+player_id = st.sidebar.selectbox("Player", matches, format_func=names.label)
+selected_player = names.name(player_id)
 
 min_season = int(df["season"].min())
 max_season = int(df["season"].max())
@@ -26,10 +30,11 @@ selected_season = st.sidebar.number_input("Season (Year)", min_value=min_season,
 # Submit Button
 if st.sidebar.button("Generate Shot Chart"):
     try:
-        shot_profile = get_player_shot_profile(df, selected_player, selected_season, league_avg_df)
-        fig = plot_shot_chart(shot_profile, selected_player, selected_season)
-        st.pyplot(fig)
+        st.image(shot_chart_bytes(df, selected_player, selected_season, league_avg_df, player_id=player_id))
     except ValueError as e:
         st.warning(str(e))
 else:
     st.info("Select a player and season, then click 'Generate Shot Chart'.")
+
+if debug_enabled():
+    debug_panel()
@@ -0,0 +1,35 @@
+# recall@k and latency of the IVF index against exact cosine search over the
+# shooting-merged comps features.
+#
+#   python -m benchmarks.bench_ann [--app PlayerComps_with_Shooting] [--k 10]
+#                                  [--n-lists 128] [--n-probe 1 2 4 8 16 32]
+import argparse
+import time
+
+from shared.apps import load_app_module
+from shared.ann import IVFIndex, recall_report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting",
+                        choices=["PlayerComps_with_Shooting", "combined_player_season_page"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    engine = comps.engine
+
+    start = time.perf_counter()
+    index = IVFIndex.build(comps.artifact.vectors, n_lists=args.n_lists)
+    print(f"rows={len(engine)} lists={index.n_lists} build={time.perf_counter() - start:.2f}s")
+
+    report = recall_report(index, engine, k=args.k, n_probes=args.n_probe, n_queries=args.queries)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Filtered comps: latency vs selectivity, and exactness against scoring every
+# row and post-filtering.
+#
+#   python -m benchmarks.bench_filters [--app PlayerComps] [--queries 200]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.apps import load_app_module
+
+FILTERS = [
+    ("none", {}),
+    ("min_g=20", {"min_g": 20}),
+    ("2000-2025", {"seasons": (2000, 2025)}),
+    ("2015-2025, g>=50", {"seasons": (2015, 2025), "min_g": 50}),
+    ("C, 2020-2025", {"seasons": (2020, 2025), "pos": "C"}),
+    ("2024 only", {"seasons": (2024, 2024)}),
+    ("PG, 2024, mp>=1500", {"seasons": (2024, 2024), "pos": "PG", "min_mp": 1500}),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps", choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    engine, filter_index = comps.engine, comps.filter_index
+    rng = np.random.default_rng(0)
+    queries = rng.integers(0, len(engine), size=args.queries)
+
+    rows = []
+    for label, filters in FILTERS:
+        start = time.perf_counter()
+        for idx in queries:
+            cand = filter_index.candidates(**filters)
+            engine.top_k(idx, args.k, candidates=cand)
+        ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        # Reference: score everything, then drop rows outside the filter
+        cand = filter_index.candidates(**filters)
+        allowed = np.ones(len(engine), bool) if cand is None else np.isin(np.arange(len(engine)), cand)
+        exact = True
+        for idx in queries[:50]:
+            scores = engine.scores(idx)
+            scores[~allowed] = -np.inf
+            scores[idx] = -np.inf
+            k = min(args.k, int(np.isfinite(scores).sum()))
+            reference = np.sort(scores)[::-1][:k]
+            _, got = engine.top_k(idx, args.k, candidates=cand)
+            exact &= np.allclose(np.sort(got)[::-1], reference)
+
+        n_cand = len(engine) if cand is None else len(cand)
+        rows.append({"filter": label, "candidates": n_cand, "selectivity": n_cand / len(engine),
+                     "query_ms": ms, "exact": exact})
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
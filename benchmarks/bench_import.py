@@ -0,0 +1,144 @@
+# Cold-start report: per-stage wall time and peak-RSS growth for each app
+# entry point, each measured in a fresh interpreter.
+#
+#   python -m benchmarks.bench_import [--repeat 3]
+#   python -m benchmarks.bench_import --check          # exit 1 if over budget
+#   python -m benchmarks.bench_import --update-budget  # rewrite the budget file
+#
+# The budget (benchmarks/import_budget.json) caps the time of the "import"
+# stage and lists heavy libraries that importing the module must not pull in.
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from shared.apps import APP_CWD
+from shared.paths import ROOT_DIR
+
+BUDGET_PATH = Path(__file__).with_name("import_budget.json")
+HEAVY_MODULES = ["sklearn", "matplotlib", "streamlit", "scipy"]
+BUDGET_HEADROOM = 1.5  # --update-budget writes measured import time x this
+
+# (stage, code) run in order in one interpreter; "import" is the cold import
+ENTRY_POINTS = {
+    "combined_player_season_page": [
+        ("import", "import main"),
+        ("name_index", "main.name_index()"),
+        ("comps_state", "main.comps.get()"),
+        ("first_comps", "main.find_similar_players('LeBron James', 2023)"),
+        ("first_chart", "main.shot_chart_bytes(main.load_shooting_data(), 'LeBron James', 2023, main.load_league_averages())"),
+    ],
+    "PlayerComps_with_Shooting": [
+        ("import", "import main"),
+        ("first_comps", "main.find_similar_players('LeBron James', 2023)"),
+    ],
+    "PlayerComps": [
+        ("import", "import main"),
+        ("first_comps", "main.find_similar_players('LeBron James', 2023)"),
+    ],
+    "ShotCharts": [
+        ("import", "import main"),
+        ("first_chart", "main.shot_chart_bytes(main.load_shooting_data(), 'LeBron James', 2023, main.load_league_averages())"),
+    ],
+}
+
+_RUNNER = """
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+stages, heavy = json.loads(sys.argv[2]), json.loads(sys.argv[3])
+ns, out = {}, []
+for label, code in stages:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    exec(code, ns)
+    out.append({
+        "stage": label,
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024,
+        "heavy_loaded": [m for m in heavy if m in sys.modules],
+    })
+print(json.dumps(out))
+"""
+
+
+def measure(app, stages):
+    proc = subprocess.run(
+        [sys.executable, "-c", _RUNNER, str(ROOT_DIR / app), json.dumps(stages), json.dumps(HEAVY_MODULES)],
+        cwd=APP_CWD[app], capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{app} failed:\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def report(repeat=3):
+    rows = []
+    for app, stages in ENTRY_POINTS.items():
+        runs = [measure(app, stages) for _ in range(repeat)]
+        for i, (label, _) in enumerate(stages):
+            samples = [run[i] for run in runs]
+            rows.append({
+                "app": app,
+                "stage": label,
+                "seconds": sorted(s["seconds"] for s in samples)[len(samples) // 2],  # median
+                "peak_rss_mb": samples[-1]["peak_rss_mb"],
+                "rss_growth_mb": samples[-1]["rss_growth_mb"],
+                "heavy_loaded": ",".join(samples[-1]["heavy_loaded"]) or "-",
+            })
+    return pd.DataFrame(rows)
+
+
+def check(table, budget):
+    failures = []
+    imports = table[table["stage"] == "import"].set_index("app")
+    for app, limits in budget.items():
+        row = imports.loc[app]
+        if row["seconds"] > limits["import_seconds"]:
+            failures.append(f"{app}: import took {row['seconds']:.2f}s, budget {limits['import_seconds']:.2f}s")
+        loaded = set(row["heavy_loaded"].split(",")) & set(limits.get("forbid", []))
+        if loaded:
+            failures.append(f"{app}: import loaded {', '.join(sorted(loaded))}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--update-budget", action="store_true")
+    parser.add_argument("--json", default=None, help="also write the report here")
+    args = parser.parse_args()
+
+    table = report(args.repeat)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    if args.json:
+        Path(args.json).write_text(table.to_json(orient="records", indent=2))
+
+    if args.update_budget:
+        old = json.loads(BUDGET_PATH.read_text()) if BUDGET_PATH.exists() else {}
+        imports = table[table["stage"] == "import"].set_index("app")
+        budget = {
+            app: {
+                "import_seconds": round(float(imports.loc[app, "seconds"]) * BUDGET_HEADROOM, 2),
+                "forbid": old.get(app, {}).get("forbid", []),
+            }
+            for app in ENTRY_POINTS
+        }
+        BUDGET_PATH.write_text(json.dumps(budget, indent=2) + "\n")
+        print(f"wrote {BUDGET_PATH}")
+
+    if args.check:
+        failures = check(table, json.loads(BUDGET_PATH.read_text()))
+        for failure in failures:
+            print(f"FAIL {failure}")
+        if failures:
+            sys.exit(1)
+        print("import budget ok")
+
+
+if __name__ == "__main__":
+    main()
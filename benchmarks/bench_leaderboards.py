@@ -0,0 +1,73 @@
+# Leaderboard latency: pandas filter-and-sort vs shared.leaderboards, with a
+# check that both return the same player-seasons.
+#
+#   python -m benchmarks.bench_leaderboards [--queries 200] [--top-n 25]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.data_store import load_table
+from shared.leaderboards import TABLES, Leaderboard
+
+
+def pandas_top(df, allowed_rows, stat, top_n, seasons, min_g):
+    sub = df[allowed_rows]
+    if seasons is not None:
+        sub = sub[(sub["season"] >= seasons[0]) & (sub["season"] <= seasons[1])]
+    if min_g:
+        sub = sub[sub["g"] >= min_g]
+    return sub.dropna(subset=[stat]).sort_values(stat, ascending=False, kind="stable").head(top_n)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=25)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    rows = []
+    for view in ["per_100", "shooting"]:
+        df = load_table(TABLES[view])
+        start = time.perf_counter()
+        board = Leaderboard(df)
+        for stat in board.columns:
+            board.index(stat)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        first, last = int(board.seasons[0]), int(board.seasons[-1])
+        queries = []
+        for _ in range(args.queries):
+            stat = board.columns[rng.integers(len(board.columns))]
+            lo = int(rng.integers(first, last + 1))
+            seasons = None if rng.random() < 0.3 else (lo, int(rng.integers(lo, last + 1)))
+            queries.append((stat, seasons, [None, 20, 50][rng.integers(3)]))
+
+        mismatches = 0
+        times = {"pandas": [], "index": []}
+        for stat, seasons, min_g in queries:
+            t0 = time.perf_counter()
+            expected = pandas_top(df, board.player_rows, stat, args.top_n, seasons, min_g)
+            t1 = time.perf_counter()
+            got, values = board.top(stat, args.top_n, seasons, min_g=min_g)
+            t2 = time.perf_counter()
+            times["pandas"].append(t1 - t0)
+            times["index"].append(t2 - t1)
+            # Same values in the same order (ties may list different rows)
+            mismatches += not np.array_equal(expected[stat].to_numpy(dtype=np.float64), values)
+
+        pandas_ms = np.mean(times["pandas"]) * 1000
+        index_ms = np.mean(times["index"]) * 1000
+        rows.append({
+            "view": view, "rows": len(df), "stats": len(board.columns), "build_ms": build_ms,
+            "pandas_ms": pandas_ms, "index_ms": index_ms, "p99_index_ms": np.percentile(times["index"], 99) * 1000,
+            "speedup": pandas_ms / index_ms, "mismatches": mismatches,
+        })
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
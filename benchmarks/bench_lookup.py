@@ -0,0 +1,47 @@
+# Per-lookup latency of a (player, season) boolean mask vs the hash index.
+#
+#   python -m benchmarks.bench_lookup [--lookups 2000]
+import argparse
+import time
+
+import numpy as np
+
+from shared.data_store import load_table
+from shared.lookup import player_season_index
+
+
+def time_per_call(fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(*key)
+    return (time.perf_counter() - start) / len(keys) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    for name in ["Per 100 Poss", "Player Shooting"]:
+        df = load_table(name)
+        sample = df.iloc[rng.integers(0, len(df), size=args.lookups)]
+        keys = list(zip(sample["player"], sample["season"]))
+
+        def mask_lookup(player, season):
+            hit = df[(df["player"] == player) & (df["season"] == season)]
+            return hit.iloc[0] if not hit.empty else None
+
+        start = time.perf_counter()
+        index = player_season_index(df)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        mask_us = time_per_call(mask_lookup, keys[:200])
+        pos_us = time_per_call(index.position, keys)
+        row_us = time_per_call(lambda p, s: index.row(df, p, s), keys)
+        print(f"{name} ({len(df)} rows): index build {build_ms:.1f} ms | "
+              f"mask {mask_us:.1f} us | index position {pos_us:.2f} us | index row {row_us:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# Top-k overlap, score error, memory and latency of reduced-precision
+# similarity storage against a float64 baseline. The baseline is built from
+# the source tables read in float64, not from the app's float32 frame.
+#
+#   python -m benchmarks.bench_precision [--app PlayerComps_with_Shooting] [--k 10]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.apps import load_app_module
+from shared.canonical import COMPS_TRADED
+from shared.data_store import load_table
+from shared.similarity import PRECISIONS, SimilarityEngine
+
+
+def float64_features(app, comps_df, columns):
+    # The app's feature rows rebuilt the way its main.py does, without float32
+    df = load_table("Per 100 Poss", traded=COMPS_TRADED)
+    if app == "PlayerComps_with_Shooting":
+        df = df[df["season"] >= 1997]
+        shooting = load_table("Player Shooting").drop(
+            columns=["season", "player_id", "player", "pos", "age", "experience", "lg", "tm", "fg_percent",
+                     "birth_year"], errors="ignore").fillna(0)
+        df = df.merge(shooting, on="seas_id", how="left")
+    df = df.reset_index(drop=True)
+    if not np.array_equal(df["seas_id"].to_numpy(dtype=np.float64), comps_df["seas_id"].to_numpy(dtype=np.float64),
+                          equal_nan=True):
+        raise RuntimeError(f"float64 rebuild of {app} does not line up with its frame")
+    return df[columns].fillna(0).to_numpy(dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting",
+                        choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    artifact = comps.artifact
+    # float64 baseline recomputed from the stored scaler and weights
+    raw = float64_features(args.app, comps.df, artifact.columns)
+    baseline = SimilarityEngine((raw - artifact.mean) / artifact.scale * artifact.weights, "float64")
+
+    rng = np.random.default_rng(0)
+    queries = rng.choice(len(baseline), size=min(args.queries, len(baseline)), replace=False)
+    truth = {i: baseline.top_k(i, args.k) for i in queries}
+
+    rows = []
+    for precision in PRECISIONS:
+        engine = SimilarityEngine.from_normalized(baseline.vectors, precision=precision)
+        overlap, score_err = 0, 0.0
+        start = time.perf_counter()
+        results = {i: engine.top_k(i, args.k) for i in queries}
+        query_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        for i in queries:
+            top, _ = results[i]
+            true_top, true_scores = truth[i]
+            overlap += len(set(top).intersection(true_top))
+            score_err += np.abs(engine.scores(i)[true_top] - true_scores).mean()
+        rows.append({
+            "precision": precision,
+            "MB": engine.nbytes / 1e6,
+            f"top{args.k}_overlap": overlap / (args.k * len(queries)),
+            "mean_abs_score_err": score_err / len(queries),
+            "query_ms": query_ms,
+        })
+
+    print(f"{args.app}: {len(baseline)} rows x {baseline.vectors.shape[1]} features")
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.4g}"))
+
+
+if __name__ == "__main__":
+    main()
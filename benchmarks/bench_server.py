@@ -0,0 +1,103 @@
+# Load test for shared.server: p50/p99 latency and throughput of /comps at
+# several concurrency levels, with micro-batching on and off.
+#
+#   python -m benchmarks.bench_server [--requests 2000] [--concurrency 1 4 16 64]
+#   python -m benchmarks.bench_server --url http://127.0.0.1:8600   # a running server
+#
+# Without --url, a server is started in-process on a free port for each
+# batching window in --windows ("off" = no batcher, 0 = only batch what is
+# already queued).
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlencode, urlparse
+
+import numpy as np
+import pandas as pd
+
+
+def run_level(host, port, paths, concurrency):
+    latencies = np.empty(len(paths))
+    errors = []
+    cursor = iter(range(len(paths)))
+    lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(host, port)
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                break
+            start = time.perf_counter()
+            conn.request("GET", paths[i])
+            response = conn.getresponse()
+            response.read()
+            latencies[i] = time.perf_counter() - start
+            if response.status != 200:
+                errors.append(response.status)
+        conn.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "p50_ms": np.percentile(latencies, 50) * 1000,
+        "p99_ms": np.percentile(latencies, 99) * 1000,
+        "req_per_s": len(paths) / elapsed,
+        "errors": len(errors),
+    }
+
+
+def query_paths(df, n, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = df.iloc[rng.integers(0, len(df), size=n)]
+    return [f"/comps?{urlencode({'player': p, 'season': int(s), 'top_n': 10})}"
+            for p, s in zip(rows["player"], rows["season"])]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default=None)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--windows", nargs="+", default=["off", "0", "2"])
+    args = parser.parse_args()
+
+    from shared.server import CompsService, make_server
+
+    rows = []
+    if args.url:
+        url = urlparse(args.url)
+        from shared.data_store import load_table
+        paths = query_paths(load_table("Per 100 Poss").query("season >= 1997"), args.requests)
+        for c in args.concurrency:
+            rows.append({"window_ms": "remote", **run_level(url.hostname, url.port, paths, c)})
+    else:
+        service = CompsService()
+        paths = query_paths(service.comps.df, args.requests)
+        for window in args.windows:
+            service.batcher.window = None if window == "off" else float(window) / 1000
+            server = make_server(port=0, service=service)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address[:2]
+            for c in args.concurrency:
+                before = (service.batcher.batches, service.batcher.queries)
+                result = run_level(host, port, paths, c)
+                batches = service.batcher.batches - before[0]
+                result["mean_batch"] = (service.batcher.queries - before[1]) / max(batches, 1)
+                rows.append({"window_ms": window, **result})
+            server.shutdown()
+            server.server_close()
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Per-query latency of the on-demand SimilarityEngine vs the old dense
+# cosine_similarity matrix used by PlayerComps/main.py.
+#
+#   python -m benchmarks.bench_similarity [--dense-rows 5000] [--queries 200]
+#
+# The dense baseline is built on the first --dense-rows rows only; at full
+# size it needs N*N*8 bytes, which is what used to OOM the app containers.
+import argparse
+import time
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from shared.apps import load_app_module
+
+
+def time_queries(fn, query_rows):
+    start = time.perf_counter()
+    for idx in query_rows:
+        fn(idx)
+    return (time.perf_counter() - start) / len(query_rows) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dense-rows", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=10)
+    args = parser.parse_args()
+
+    comps, import_s = load_app_module("PlayerComps")
+    features = comps.features_weighted
+    engine = comps.engine
+    n, d = features.shape
+    rng = np.random.default_rng(0)
+
+    print(f"rows={n} features={d}  PlayerComps/main.py import: {import_s:.2f}s")
+    print(f"engine matrix: {engine.nbytes / 1e6:.1f} MB")
+    print(f"dense matrix at full size would be: {n * n * 8 / 1e9:.2f} GB")
+
+    query_rows = rng.integers(0, n, size=args.queries)
+    engine_ms = time_queries(lambda i: engine.top_k(i, args.top_n), query_rows)
+    print(f"engine top-{args.top_n} query ({n} rows): {engine_ms:.3f} ms")
+
+    m = min(args.dense_rows, n)
+    start = time.perf_counter()
+    dense = cosine_similarity(features[:m])
+    build_s = time.perf_counter() - start
+    sub_engine = type(engine)(features[:m])
+
+    def dense_query(i):
+        return np.argsort(dense[i])[::-1][1:args.top_n + 1]
+
+    dense_rows = rng.integers(0, m, size=args.queries)
+    dense_ms = time_queries(dense_query, dense_rows)
+    sub_ms = time_queries(lambda i: sub_engine.top_k(i, args.top_n), dense_rows)
+    print(f"dense baseline on {m} rows: build {build_s:.2f}s, "
+          f"{dense.nbytes / 1e6:.1f} MB, query {dense_ms:.3f} ms")
+    print(f"engine on the same {m} rows: query {sub_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Career-trajectory comps: tensor build time and batched query latency against
+# a Python loop over players, with an exactness check between the two.
+#
+#   python -m benchmarks.bench_trajectory [--app PlayerComps] [--key age] [--window 21 26]
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.apps import load_app_module
+from shared.trajectory import TrajectoryIndex
+
+
+def loop_scores(df, vectors, key, player_id, start, end):
+    # Reference: per-player dict lookups, one season at a time
+    seasons = {}
+    for pos, (pid, k, tm) in enumerate(zip(df["player_id"], df[key], df["tm"].astype(str))):
+        if pd.isna(pid) or not start <= k <= end:
+            continue
+        if (pid, k) not in seasons or tm == "TOT":
+            seasons[(pid, k)] = pos
+    by_player = {}
+    for (pid, k), pos in seasons.items():
+        by_player.setdefault(pid, {})[k] = pos
+
+    query = by_player[player_id]
+    scores = {}
+    for pid, ages in by_player.items():
+        total = sum(float(vectors[ages[k]] @ vectors[query[k]]) for k in query if k in ages)
+        scores[int(pid)] = total / len(query)
+    return scores
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting", choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--key", default="age", choices=["age", "experience"])
+    parser.add_argument("--window", type=int, nargs=2, default=[21, 26])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    start_key, end_key = args.window
+
+    comps, _ = load_app_module(args.app)
+    df, vectors = comps.df, np.asarray(comps.artifact.vectors)
+
+    start = time.perf_counter()
+    index = TrajectoryIndex(df, vectors, key=args.key)
+    build_s = time.perf_counter() - start
+    players, keys, dim = index.tensor.shape
+    print(f"{args.app}: {len(df)} seasons -> {players} players x {keys} {args.key}s x {dim} features "
+          f"({index.tensor.nbytes / 1e6:.1f} MB), built in {build_s * 1000:.0f} ms")
+
+    # Queries: players with at least one season inside the window
+    lo, hi = index._window(start_key, end_key)
+    eligible = np.flatnonzero(index.mask[:, lo:hi].any(axis=1))
+    rng = np.random.default_rng(0)
+    queries = index.player_ids[rng.choice(eligible, size=min(args.queries, len(eligible)), replace=False)]
+
+    start = time.perf_counter()
+    for pid in queries:
+        index.similar(pid, start_key, end_key, top_n=args.k)
+    batched_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    n_loop = min(10, len(queries))
+    exact = True
+    start = time.perf_counter()
+    for pid in queries[:n_loop]:
+        reference = loop_scores(df, vectors, args.key, pid, start_key, end_key)
+        got, _ = index.scores(pid, start_key, end_key)
+        expected = np.array([reference.get(int(p), 0.0) for p in index.player_ids])
+        exact &= np.allclose(got, expected, atol=1e-4)
+    loop_ms = (time.perf_counter() - start) / n_loop * 1000
+
+    print(pd.DataFrame([
+        {"method": "batched tensor", "query_ms": batched_ms},
+        {"method": "python loop", "query_ms": loop_ms},
+    ]).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    print(f"speedup {loop_ms / batched_ms:.0f}x, scores match: {exact}")
+
+
+if __name__ == "__main__":
+    main()
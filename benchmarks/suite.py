@@ -0,0 +1,189 @@
+# End-to-end benchmark suite on synthetic history (see benchmarks/synthetic.py).
+#
+#   python -m benchmarks.suite [--scales 1 10] [--queries 500] [--out results.json]
+#   python -m benchmarks.suite --scales 1 10 100          # 100x needs ~4 GB of RAM
+#   python -m benchmarks.suite --compare old.json new.json
+#
+# For each scale the synthetic tables are generated (once), their cache is
+# wiped, and a fresh worker process with NBA_DATA_DIR pointed at them times:
+#
+#   load         every table cold (CSV parse + cache write) and warm (parquet)
+#   features     importing PlayerComps_with_Shooting, incl. the artifact build
+#   comps        single top-10 queries and 64-query batches
+#   profiles     the shot profile table build and per-row zone lookups
+#   honors       the HonorsTable build and per-player lookups
+#
+# Results go to data/cache/bench/<commit>-<time>.json by default, one record
+# per scale, so two commits can be compared with --compare.
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import COPY_TABLES, STAT_TABLES, STATIC_TABLES, generate
+from shared.paths import ROOT_DIR
+
+BENCH_DIR = ROOT_DIR / "data" / "cache" / "bench"
+BATCH = 64
+
+
+def _latency(func, args):
+    times = np.empty(len(args))
+    for i, arg in enumerate(args):
+        start = time.perf_counter()
+        func(arg)
+        times[i] = time.perf_counter() - start
+    return {
+        "mean_ms": times.mean() * 1000,
+        "p50_ms": np.percentile(times, 50) * 1000,
+        "p99_ms": np.percentile(times, 99) * 1000,
+    }
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def worker(queries, seed):
+    # Runs inside the NBA_DATA_DIR process; prints one JSON object
+    from shared.apps import load_app_module
+    from shared.data_store import load_table
+    from shared.honors import HonorsTable
+    from shared.instrument import registry
+    from shared.shot_profiles import shot_profile_table, zones_for_row
+
+    metrics = {}
+    tables = {}
+    for name in STAT_TABLES + COPY_TABLES + STATIC_TABLES:
+        tables[name], cold = _timed(lambda: load_table(name))
+        _, warm = _timed(lambda: load_table(name))
+        metrics[f"load.{name}.cold_s"] = cold
+        metrics[f"load.{name}.warm_s"] = warm
+    metrics["load.cold_s"] = sum(v for k, v in metrics.items() if k.endswith(".cold_s"))
+    metrics["load.warm_s"] = sum(v for k, v in metrics.items() if k.endswith(".warm_s"))
+
+    registry.reset()
+    comps, seconds = load_app_module("PlayerComps_with_Shooting")
+    stages = registry.snapshot()
+    metrics["features.import_s"] = seconds
+    metrics["features.build_s"] = stages.get("features.build", {}).get("total_s", 0.0)
+    metrics["features.merge_s"] = stages.get("comps.merge", {}).get("total_s", 0.0)
+    metrics["rows"] = len(comps.df)
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(comps.df), size=queries)
+    engine = comps.engine
+    for key, value in _latency(lambda idx: engine.top_k(int(idx), 10), picks).items():
+        metrics[f"comps.single.{key}"] = value
+    batches = [picks[i:i + BATCH].tolist() for i in range(0, len(picks) - BATCH + 1, BATCH)] or [picks.tolist()]
+    batch = _latency(lambda b: engine.top_k_batch(b, 10), batches)
+    metrics["comps.batch.per_query_ms"] = batch["mean_ms"] / len(batches[0])
+    metrics["comps.batch.p99_ms"] = batch["p99_ms"]
+
+    shooting_df = tables["Player Shooting"]
+    league_avg_df = tables["League Average Shooting"].set_index("Season")
+    profiles, metrics["profiles.build_s"] = _timed(lambda: shot_profile_table(shooting_df, league_avg_df))
+    rows = rng.integers(0, len(shooting_df), size=queries)
+    metrics["profiles.lookup_ms"] = _latency(lambda pos: zones_for_row(profiles, int(pos)), rows)["mean_ms"]
+
+    honors, metrics["honors.build_s"] = _timed(lambda: HonorsTable(
+        tables["All-Star Selections"], tables["End of Season Teams"],
+        tables["Player Award Shares"], tables["Player Career Info"],
+    ))
+    keys = list(zip(comps.df["player"].iloc[picks], comps.df["season"].iloc[picks]))
+    metrics["honors.lookup_ms"] = _latency(lambda key: honors.lookup(*key), keys)["mean_ms"]
+
+    print(json.dumps({key: float(value) for key, value in metrics.items()}))
+
+
+def run_scale(scale, queries, seed):
+    data_dir = generate(scale)
+    shutil.rmtree(data_dir / "cache", ignore_errors=True)  # every run starts cold
+    env = dict(os.environ, NBA_DATA_DIR=str(data_dir))
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.suite", "--worker", "--queries", str(queries), "--seed", str(seed)],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    if out.returncode != 0:
+        raise RuntimeError(f"scale {scale} failed:\n{out.stderr}")
+    manifest = json.loads((data_dir / "synthetic.json").read_text())
+    return {"scale": scale, "source_rows": manifest["rows"], "metrics": json.loads(out.stdout.splitlines()[-1])}
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def compare(old_path, new_path):
+    old = {r["scale"]: r["metrics"] for r in json.loads(Path(old_path).read_text())["results"]}
+    new = json.loads(Path(new_path).read_text())
+    print(f"{old_path} -> {new_path} ({new['commit'][:10]})")
+    for record in new["results"]:
+        before = old.get(record["scale"])
+        if before is None:
+            continue
+        print(f"\nx{record['scale']}")
+        for key, value in record["metrics"].items():
+            if key not in before or key.startswith("load.") and key.count(".") > 1:
+                continue
+            ratio = value / before[key] if before[key] else float("nan")
+            print(f"  {key:28s} {before[key]:10.4f} {value:10.4f}  x{ratio:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.queries, args.seed)
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = _git("rev-parse", "HEAD")
+    results = []
+    for scale in args.scales:
+        record = run_scale(scale, args.queries, args.seed)
+        m = record["metrics"]
+        print(f"x{scale}: {int(m['rows'])} rows, load {m['load.cold_s']:.2f}s cold / {m['load.warm_s']:.2f}s warm, "
+              f"features {m['features.import_s']:.2f}s, comps {m['comps.single.p50_ms']:.2f}ms "
+              f"(batch {m['comps.batch.per_query_ms']:.2f}ms/query), "
+              f"profiles {m['profiles.build_s']:.2f}s, honors {m['honors.build_s']:.2f}s")
+        results.append(record)
+
+    report = {
+        "commit": commit,
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "queries": args.queries,
+        "seed": args.seed,
+        "results": results,
+    }
+    out = Path(args.out) if args.out else BENCH_DIR / f"{commit[:10] or 'nogit'}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"-> {out}")
+
+
+if __name__ == "__main__":
+    main()
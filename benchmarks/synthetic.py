@@ -0,0 +1,134 @@
+# Schema-faithful synthetic copies of the data/ tables at N x the real history.
+#
+#   python -m benchmarks.synthetic --scale 10 [--out data/cache/synthetic/x10] [--seed 0]
+#
+# Replica 0 is the real data. Replica r > 0 copies every row with seas_id and
+# player_id shifted past the real ranges and the player name suffixed " <r>".
+# The stat tables also jitter each numeric stat by ~5%, clipped to the
+# column's real range. Seasons are kept, so every season gets N x the players.
+# Names and ids stay consistent across tables, so the shooting merge and the
+# honors name matching behave as they do on the real data. League averages
+# are one row per season and are copied as-is.
+#
+# Point the apps at the result with NBA_DATA_DIR=<out> (see shared/paths.py).
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shared.paths import ROOT_DIR
+
+SOURCE_DIR = ROOT_DIR / "data"
+SYNTHETIC_DIR = ROOT_DIR / "data" / "cache" / "synthetic"
+
+# Tables the comps, shot chart and honors paths read
+STAT_TABLES = ["Per 100 Poss", "Player Shooting"]
+COPY_TABLES = ["All-Star Selections", "End of Season Teams", "Player Award Shares", "Player Career Info"]
+STATIC_TABLES = ["League Average Shooting"]
+
+# Columns that identify a row rather than measure it; never jittered
+IDENTITY_COLS = {
+    "seas_id", "season", "player_id", "player", "birth_year", "pos", "age",
+    "experience", "lg", "tm",
+}
+JITTER = 0.05
+
+
+def _offset(max_id):
+    # Next power of ten above the real ids, so replica ids never collide
+    return 10 ** len(str(int(max_id)))
+
+
+def _read_stats(name):
+    df = pd.read_csv(SOURCE_DIR / f"{name}.csv")
+    for col in ("seas_id", "player_id"):
+        df[col] = df[col].astype("Int64")
+    return df
+
+
+def _read_raw(name):
+    # Award tables are copied textually: "NA", "TRUE" etc. stay as written
+    return pd.read_csv(SOURCE_DIR / f"{name}.csv", dtype=str, keep_default_na=False)
+
+
+def _shift_ids(values, offset, r):
+    if pd.api.types.is_string_dtype(values):  # raw text ids, "NA" for missing
+        numeric = pd.to_numeric(values, errors="coerce")
+        shifted = (numeric + offset * r).astype("Int64").astype(str)
+        return shifted.where(numeric.notna(), values)
+    return values + offset * r
+
+
+def _replica(df, r, seas_offset, player_offset, rng, jitter_cols=()):
+    part = df.copy()
+    if "seas_id" in part:
+        part["seas_id"] = _shift_ids(part["seas_id"], seas_offset, r)
+    if "player_id" in part:
+        part["player_id"] = _shift_ids(part["player_id"], player_offset, r)
+    part["player"] = part["player"].astype(str) + f" {r}"
+
+    for col in jitter_cols:
+        values = df[col].to_numpy(dtype=np.float64)
+        noisy = values * (1 + JITTER * rng.standard_normal(len(values)))
+        noisy = np.clip(noisy, np.nanmin(values), np.nanmax(values))
+        # Counts stay whole numbers; rates keep the source's 3 decimals
+        whole = np.nanmax(np.abs(values - np.round(values)), initial=0) == 0
+        noisy = np.round(noisy, 0 if whole else 3)
+        if pd.api.types.is_integer_dtype(df[col]):
+            noisy = noisy.astype(df[col].dtype)
+        part[col] = noisy
+    return part
+
+
+def generate(scale, out_dir=None, seed=0):
+    # Writes the synthetic tables to out_dir (skipped when already there) and returns it
+    out_dir = Path(out_dir or SYNTHETIC_DIR / f"x{scale}")
+    manifest_path = out_dir / "synthetic.json"
+    if manifest_path.exists() and json.loads(manifest_path.read_text()).get("params") == [scale, seed]:
+        return out_dir
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    frames = {name: _read_stats(name) for name in STAT_TABLES}
+    frames.update({name: _read_raw(name) for name in COPY_TABLES})
+    seas_offset = _offset(max(frames[name]["seas_id"].max() for name in STAT_TABLES))
+    player_offset = _offset(max(
+        pd.to_numeric(df["player_id"], errors="coerce").max() for df in frames.values() if "player_id" in df
+    ))
+
+    rng = np.random.default_rng(seed)
+    rows = {}
+    for name, df in frames.items():
+        jitter_cols = []
+        if name in STAT_TABLES:
+            jitter_cols = [col for col in df.select_dtypes(include=[np.number]).columns if col not in IDENTITY_COLS]
+        path = out_dir / f"{name}.csv"
+        for r in range(scale):
+            part = df if r == 0 else _replica(df, r, seas_offset, player_offset, rng, jitter_cols)
+            part.to_csv(path, mode="w" if r == 0 else "a", header=r == 0, index=False, na_rep="NA")
+        rows[name] = len(df) * scale
+
+    for name in STATIC_TABLES:
+        df = _read_raw(name)
+        df.to_csv(out_dir / f"{name}.csv", index=False)
+        rows[name] = len(df)
+
+    manifest_path.write_text(json.dumps({"params": [scale, seed], "rows": rows}, indent=2))
+    return out_dir
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=10)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    out = generate(args.scale, args.out, args.seed)
+    print(json.loads((out / "synthetic.json").read_text())["rows"])
+    print(f"-> {out}")
+
+
+if __name__ == "__main__":
+    main()
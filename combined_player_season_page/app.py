@@ -1,45 +1,19 @@
 import streamlit as st
-import pandas as pd
-from collections import defaultdict
 from main import (
-    df,  # season similarity df
+    name_index,  # sidebar search; the comps state is built on the first search
     find_similar_players,  # similarity logic
     load_shooting_data,
     load_league_averages,
-    get_player_shot_profile,
-    plot_shot_chart,
+    shot_chart_bytes,
     load_award_data,
     load_basic_stats,
-    display_awards_and_honors
+    display_awards_and_honors,
+    category_map_per_game,
+    category_map_per_100,
+    category_map_totals,
+    group_stats
 )
-
-category_map_per_game = {
-    "🏀 Scoring": ["pts_per_game", "fg_per_game", "fga_per_game", "fg_percent", "ft_per_game", "fta_per_game", "ft_percent"],
-    "🎯 3PT Shooting": ["x3p_per_game", "x3pa_per_game", "x3p_percent"],
-    "💥 Inside Game": ["x2p_per_game", "x2pa_per_game", "x2p_percent", "e_fg_percent"],
-    "🎨 Playmaking": ["ast_per_game", "tov_per_game"],
-    "🛡️ Defense": ["stl_per_game", "blk_per_game", "pf_per_game"],
-    "🧱 Rebounding": ["orb_per_game", "drb_per_game", "trb_per_game"],
-    "🧭 Context": ["mp_per_game", "g", "gs"]
-}
-category_map_per_100 = {
-    "🏀 Scoring": ["pts_per_100_poss", "fg_per_100_poss", "fga_per_100_poss", "fg_percent", "ft_per_100_poss", "fta_per_100_poss", "ft_percent"],
-    "🎯 3PT Shooting": ["x3p_per_100_poss", "x3pa_per_100_poss", "x3p_percent"],
-    "💥 Inside Game": ["x2p_per_100_poss", "x2pa_per_100_poss", "x2p_percent"],
-    "🎨 Playmaking": ["ast_per_100_poss", "tov_per_100_poss", "o_rtg"],
-    "🛡️ Defense": ["stl_per_100_poss", "blk_per_100_poss", "pf_per_100_poss", "d_rtg"],
-    "🧱 Rebounding": ["orb_per_100_poss", "drb_per_100_poss", "trb_per_100_poss"],
-    "🧭 Context": ["mp", "g", "gs"]
-}
-category_map_totals = {
-    "🏀 Scoring": ["pts", "fg", "fga", "fg_percent", "ft", "fta", "ft_percent"],
-    "🎯 3PT Shooting": ["x3p", "x3pa", "x3p_percent"],
-    "💥 Inside Game": ["x2p", "x2pa", "x2p_percent"],
-    "🎨 Playmaking": ["ast", "tov"],
-    "🛡️ Defense": ["stl", "blk", "pf"],
-    "🧱 Rebounding": ["orb", "drb", "trb"],
-    "🧭 Context": ["mp", "g", "gs"]
-}
+from shared.instrument import debug_enabled, debug_panel
 
 # Page setup
 st.set_page_config(page_title="NBA Player Explorer", layout="wide")
@@ -55,7 +29,7 @@ def section_header(title):
 
 
 # Load data
-@st.cache_data
+@st.cache_resource
 def load_all_data():
     df_shooting = load_shooting_data()
     league_avg = load_league_averages()
@@ -75,8 +49,11 @@ if "last_view_mode" not in st.session_state:
 
 # Sidebar: Player & Season Selector
 st.sidebar.header("Select Player and Season")
-players = sorted(df["player"].unique())
-selected_player = st.sidebar.selectbox("Player", players)
+names = name_index()
+player_query = st.sidebar.text_input("Search player", "LeBron James")
+matches = names.search(player_query, limit=20) or [names.resolve("LeBron James")]
+player_id = st.sidebar.selectbox("Player", matches, format_func=names.label)
+selected_player = names.name(player_id)
 season = st.sidebar.number_input("Season", min_value=1996, max_value=2025, value=2025)
 view_mode = st.sidebar.radio("Stat View Mode", ["Per Game", "Per 100 Possessions", "Total"])
 
@@ -85,12 +62,12 @@ triggered = st.sidebar.button("Generate Profile")
 
 if triggered or (
     st.session_state.profile_loaded and
-    selected_player == st.session_state.last_player and
+    player_id == st.session_state.last_player and
     season == st.session_state.last_season and
     view_mode != st.session_state.last_view_mode
 ):
 
-    st.session_state.last_player = selected_player
+    st.session_state.last_player = player_id
     st.session_state.last_season = season
     st.session_state.profile_loaded = True
     st.session_state.last_view_mode = view_mode
@@ -136,20 +113,12 @@ if triggered or (
         #     "orb", "drb", "pf", "mp", "g", "gs"
         # ]
 
-    filtered = stat_df[(stat_df["player"] == selected_player) & (stat_df["season"] == season)]
-    if not filtered.empty:
-        stats = filtered.iloc[0]
-        numeric_stats = stats.drop(labels=["seas_id", "player_id", "season"], errors="ignore")
-        numeric_stats = numeric_stats.apply(pd.to_numeric, errors="coerce").dropna()
+    row_pos = names.position(stat_df, player_id, season)
+    if row_pos is not None:
+        stats = stat_df.iloc[row_pos]
         st.subheader(f"{selected_player} — {season} Season ({view_mode})")
 
-        grouped_stats = defaultdict(list)
-        for stat, value in numeric_stats.items():
-            for category, stats in category_map.items():
-                if stat in stats:
-                    grouped_stats[category].append((stat, value))
-                    break
-
+        grouped_stats = group_stats(stats, category_map)
         for category, stats in grouped_stats.items():
             with st.container():
                 st.markdown(f"#### {category}")
@@ -170,18 +139,18 @@ if triggered or (
 
     # Only load the rest once
     if st.session_state.profile_loaded:
-        display_awards_and_honors(selected_player, season, all_star_df, eos_teams_df, award_shares_df, career_info_df)
+        display_awards_and_honors(selected_player, season, all_star_df, eos_teams_df, award_shares_df, career_info_df,
+                                  player_id=player_id)
 
         try:
-            shot_profile = get_player_shot_profile(df_shooting, selected_player, season, league_avg_df)
-            fig = plot_shot_chart(shot_profile, selected_player, season)
+            chart = shot_chart_bytes(df_shooting, selected_player, season, league_avg_df, player_id=player_id)
             section_header("📊 Shot Profile vs League Average 📊")
-            st.pyplot(fig)
+            st.image(chart)
         except ValueError as e:
             st.warning(str(e))
 
         section_header("🔎 Most Similar Players This Season 🔎")
-        sim_result = find_similar_players(selected_player, season)
+        sim_result = find_similar_players(selected_player, season, player_id=player_id)
         if isinstance(sim_result, str):
             st.error(sim_result)
         else:
@@ -189,3 +158,5 @@ if triggered or (
 else:
     st.info("Click the arrow in the top left. Select a player and season, then click 'Generate Profile'.")
 
+if debug_enabled():
+    debug_panel()
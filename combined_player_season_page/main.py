@@ -1,27 +1,25 @@
+import sys
+import threading
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
-import streamlit as st
-
-
 
-# Load and clean the primary data (Per 100 Poss)
-df_main = pd.read_csv("data/Per 100 Poss.csv")
-df_main = df_main[df_main['season'] >= 1997].copy()
-df_main.drop(columns=['birth_year'], inplace=True, errors='ignore')
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from shared.charts import plot_shot_chart, shot_chart_bytes  # cached, thread-safe renderer
+from shared.data_store import load_table
+from shared.honors import honors_table
+from shared.instrument import stage, timed
+from shared.lazy import Lazy, once
+from shared.lookup import player_season_index
+from shared.name_search import name_index  # player selectors
+from shared.shot_profiles import shot_profiles, zones_for_row
 
-# Load and clean Player Shooting data
-df_shooting = pd.read_csv("data/Player Shooting.csv")
-df_shooting.drop(columns=['season', 'player_id', 'player', 'pos', 'age', 'experience', 'lg', 'tm', 'fg_percent', 'birth_year'], errors='ignore', inplace=True)
-df_shooting.fillna(0, inplace=True)
-
-# Merge shooting data on seas_id
-df = df_main.merge(df_shooting, on='seas_id', how='left')
-df.fillna(0, inplace=True)
+# Importing this module is cheap: the merged comps frame, feature artifact and
+# search indexes are built on first use (see comps below), and sklearn,
+# matplotlib and streamlit are only imported by the code paths that need them.
 
 # Identity columns (non-numeric, metadata)
 identity_cols = [
@@ -29,22 +27,6 @@ identity_cols = [
     'age', 'experience', 'lg', 'tm'
 ]
 
-# Keep only numeric stat columns (exclude identity)
-numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns if col not in identity_cols]
-
-# Fill missing numeric values
-df[numeric_cols] = df[numeric_cols].fillna(0)
-
-# Final assembled DataFrame
-df = df[identity_cols + numeric_cols].copy()
-df = df.loc[:, ~df.columns.duplicated()]
-df = df.reset_index(drop=True)
-
-# Scale numeric features
-features = df[numeric_cols].values
-scaler = StandardScaler()
-features_scaled = scaler.fit_transform(features)
-
 weights_by_stat = {
     # === Role and Output (Tier 1: 3.0) ===
     'pts_per_100_poss': 3.0,
@@ -106,111 +88,215 @@ weights_by_stat = {
     'num_heaves_made': 0.05
 }
 
-# Apply weights
-weights = np.ones(len(numeric_cols))
-for i, col in enumerate(numeric_cols):
-    weights[i] = weights_by_stat.get(col, 1.0)
-
-features_weighted = features_scaled * weights
-similarity_matrix = cosine_similarity(features_weighted)
+@timed("comps.build_state")
+def _build_comps():
+    from shared.canonical import COMPS_TRADED
+    from shared.features import load_feature_artifact
+    from shared.filters import FilterIndex
+    from shared.embedding import DEFAULT_DIMS as EMBED_DIMS, load_embedding
+    from shared.similarity import SimilarityEngine, WeightedSimilarity
+
+    # Load and clean the primary data (Per 100 Poss)
+    df_main = load_table("Per 100 Poss", traded=COMPS_TRADED, floats="float32")
+    df_main = df_main[df_main['season'] >= 1997].copy()
+    df_main.drop(columns=['birth_year'], inplace=True, errors='ignore')
+
+    # Load and clean Player Shooting data
+    df_shooting = load_table("Player Shooting", floats="float32")
+    df_shooting.drop(columns=['season', 'player_id', 'player', 'pos', 'age', 'experience', 'lg', 'tm', 'fg_percent', 'birth_year'], errors='ignore', inplace=True)
+    df_shooting.fillna(0, inplace=True)
+
+    # Merge shooting data on seas_id
+    with stage("comps.merge"):
+        df = df_main.merge(df_shooting, on='seas_id', how='left')
+
+    # Keep only numeric stat columns (exclude identity)
+    numeric_cols = [col for col in df.select_dtypes(include=[np.number]).columns if col not in identity_cols]
+
+    # Fill missing numeric values
+    df[numeric_cols] = df[numeric_cols].fillna(0)
+
+    # Final assembled DataFrame
+    df = df[identity_cols + numeric_cols].copy()
+    df = df.loc[:, ~df.columns.duplicated()]
+    df = df.reset_index(drop=True)
+
+    # Scaler fit, weights and the scaled/weighted float32 features come from a
+    # cached artifact; it is rebuilt when the source CSVs or weights_by_stat change
+    artifact = load_feature_artifact("shooting", df, numeric_cols, weights_by_stat, sources=["Per 100 Poss", "Player Shooting"])
+    filter_index = FilterIndex(df)
+
+    return SimpleNamespace(
+        df=df,
+        numeric_cols=numeric_cols,
+        season_index=player_season_index(df),
+        artifact=artifact,
+        features_weighted=artifact.features,
+        # Only the normalized N x d matrix is kept; each query is scored on demand.
+        # Set NBA_COMPS_PRECISION=float16 or int8 to store it more compactly, or
+        # NBA_COMPS_EMBED_DIM=<k> to search a k-dim PCA embedding instead.
+        engine=(load_embedding("shooting", artifact, EMBED_DIMS).engine() if EMBED_DIMS
+                else SimilarityEngine.from_normalized(artifact.vectors)),
+        # Season-sorted positions and column arrays for filtered comps
+        filter_index=filter_index,
+        # Standardized features for query-time weights, built on first use
+        weighted_engine=Lazy(lambda: WeightedSimilarity.from_artifact(artifact)),
+        # Style archetypes, loaded or fitted on first use (see get_archetypes)
+        archetypes=Lazy(lambda: _load_archetypes(df, artifact, filter_index)),
+    )
+
+def _load_archetypes(df, artifact, filter_index):
+    # The labels live on the archetypes and the filter index, not in df
+    from shared.archetypes import load_or_fit_archetypes
+
+    archetypes = load_or_fit_archetypes("shooting", df, artifact)
+    filter_index.set_archetypes(archetypes.labels)
+    return archetypes
+
+def get_archetypes():
+    return comps.get().archetypes.get()
+
+comps = Lazy(_build_comps)
+_COMPS_ATTRS = {"df", "numeric_cols", "season_index", "artifact", "features_weighted", "engine", "filter_index"}
+
+def __getattr__(name):
+    # main.df, main.engine, ... still work; the first access builds the comps state
+    if name in _COMPS_ATTRS:
+        return getattr(comps.get(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Optional approximate index, loaded from data/cache on first use
+_ann_index = None
+_ann_lock = threading.Lock()
+
+def get_ann_index(n_probe=8):
+    global _ann_index
+    from shared.ann import load_or_build_index
+
+    with _ann_lock:
+        if _ann_index is None:
+            _ann_index = load_or_build_index("comps_with_shooting", comps.get().artifact.vectors, n_probe=n_probe)
+    return _ann_index
 
 # Player similarity function
-def find_similar_players(player_name, season, top_n=10):
-    idx = df[(df['player'] == player_name) & (df['season'] == season)].index
-    if len(idx) == 0:
+@timed("comps.find_similar_players")
+def find_similar_players(player_name, season, top_n=10, approximate=False, n_probe=None,
+                         seasons=None, pos=None, lg=None, min_mp=None, min_g=None, weights=None,
+                         same_archetype=False, player_id=None):
+    state = comps.get()
+    # player_id (from shared.name_search) tells apart players who share a name
+    if player_id is not None:
+        idx = name_index().position(state.df, player_id, season)
+    else:
+        idx = state.season_index.position(player_name, season)
+    if idx is None:
         return f"No data for {player_name} in {season}"
-    idx = idx[0]
-
-    scores = similarity_matrix[idx]
-    top_indices = np.argsort(scores)[::-1][1:top_n+1]
 
-    result_df = df.iloc[top_indices][['player', 'season', 'tm']].copy()
-    result_df['similarity'] = scores[top_indices]
+    # Filters select candidate rows before scoring; seasons is (first, last).
+    # A filtered query is exact over its candidates, so it skips the ANN index.
+    # weights ({stat: weight}, like weights_by_stat) re-weights this query only;
+    # same_archetype keeps only rows of the queried season's archetype.
+    archetype = get_archetypes().labels[idx] if same_archetype else None
+    candidates = state.filter_index.candidates(seasons=seasons, pos=pos, lg=lg, min_mp=min_mp, min_g=min_g,
+                                               archetype=archetype)
+    if weights is not None:
+        from shared.features import weight_vector
+
+        with stage("comps.search"):
+            top_indices, scores = state.weighted_engine.get().top_k(
+                idx, top_n, weight_vector(state.numeric_cols, weights), candidates=candidates)
+    elif approximate and candidates is None:
+        top_indices, scores = get_ann_index().search(state.artifact.vectors[idx], top_n, n_probe=n_probe, exclude=idx)
+    else:
+        with stage("comps.search"):
+            top_indices, scores = state.engine.top_k(idx, top_n, candidates=candidates)
+
+    result_df = state.df.iloc[top_indices][['player', 'season', 'tm']].copy()
+    result_df['similarity'] = scores
 
     return result_df
 
 __all__ = ['df', 'find_similar_players']
 
-def load_shooting_data(file_path="data/Player Shooting.csv"):
-    return pd.read_csv(file_path)
+def load_shooting_data(name="Player Shooting"):
+    return load_table(name)
 
-def load_league_averages(file_path="data/League Average Shooting.csv"):
-    return pd.read_csv(file_path).set_index("Season")
+def load_league_averages(name="League Average Shooting"):
+    return load_table(name).set_index("Season")
 
-@st.cache_data
+@once
+@timed("data.load_basic_stats")
 def load_basic_stats():
-    per_game = pd.read_csv("data/Player Per Game.csv")
-    per_100 = pd.read_csv("data/Per 100 Poss.csv")
-    totals = pd.read_csv("data/Player Totals.csv")
+    per_game = load_table("Player Per Game")
+    per_100 = load_table("Per 100 Poss")
+    totals = load_table("Player Totals")
     return per_game, per_100, totals
 
-@st.cache_data
+@once
+@timed("data.load_award_data")
 def load_award_data():
-    all_star = pd.read_csv("data/All-Star Selections.csv")
-    eos_teams = pd.read_csv("data/End of Season Teams.csv")
-    award_shares = pd.read_csv("data/Player Award Shares.csv")
-    career_info = pd.read_csv("data/Player Career Info.csv")
+    all_star = load_table("All-Star Selections")
+    eos_teams = load_table("End of Season Teams")
+    award_shares = load_table("Player Award Shares")
+    career_info = load_table("Player Career Info")
     return all_star, eos_teams, award_shares, career_info
 
+# Stat blocks of the profile page for each stat view
+category_map_per_game = {
+    "🏀 Scoring": ["pts_per_game", "fg_per_game", "fga_per_game", "fg_percent", "ft_per_game", "fta_per_game", "ft_percent"],
+    "🎯 3PT Shooting": ["x3p_per_game", "x3pa_per_game", "x3p_percent"],
+    "💥 Inside Game": ["x2p_per_game", "x2pa_per_game", "x2p_percent", "e_fg_percent"],
+    "🎨 Playmaking": ["ast_per_game", "tov_per_game"],
+    "🛡️ Defense": ["stl_per_game", "blk_per_game", "pf_per_game"],
+    "🧱 Rebounding": ["orb_per_game", "drb_per_game", "trb_per_game"],
+    "🧭 Context": ["mp_per_game", "g", "gs"]
+}
+category_map_per_100 = {
+    "🏀 Scoring": ["pts_per_100_poss", "fg_per_100_poss", "fga_per_100_poss", "fg_percent", "ft_per_100_poss", "fta_per_100_poss", "ft_percent"],
+    "🎯 3PT Shooting": ["x3p_per_100_poss", "x3pa_per_100_poss", "x3p_percent"],
+    "💥 Inside Game": ["x2p_per_100_poss", "x2pa_per_100_poss", "x2p_percent"],
+    "🎨 Playmaking": ["ast_per_100_poss", "tov_per_100_poss", "o_rtg"],
+    "🛡️ Defense": ["stl_per_100_poss", "blk_per_100_poss", "pf_per_100_poss", "d_rtg"],
+    "🧱 Rebounding": ["orb_per_100_poss", "drb_per_100_poss", "trb_per_100_poss"],
+    "🧭 Context": ["mp", "g", "gs"]
+}
+category_map_totals = {
+    "🏀 Scoring": ["pts", "fg", "fga", "fg_percent", "ft", "fta", "ft_percent"],
+    "🎯 3PT Shooting": ["x3p", "x3pa", "x3p_percent"],
+    "💥 Inside Game": ["x2p", "x2pa", "x2p_percent"],
+    "🎨 Playmaking": ["ast", "tov"],
+    "🛡️ Defense": ["stl", "blk", "pf"],
+    "🧱 Rebounding": ["orb", "drb", "trb"],
+    "🧭 Context": ["mp", "g", "gs"]
+}
+
+def group_stats(stats, category_map):
+    # {category: [(stat, value), ...]} for one stat row, in row order
+    numeric_stats = stats.drop(labels=["seas_id", "player_id", "season"], errors="ignore")
+    numeric_stats = numeric_stats.apply(pd.to_numeric, errors="coerce").dropna()
+    grouped = defaultdict(list)
+    for stat, value in numeric_stats.items():
+        for category, stats_in_category in category_map.items():
+            if stat in stats_in_category:
+                grouped[category].append((stat, value))
+                break
+    return grouped
+
+@timed("profile.get_player_shot_profile")
 def get_player_shot_profile(df, player_name, season, league_avg_df):
-    df_player = df[(df["player"] == player_name) & (df["season"] == season)]
-    if df_player.empty:
+    pos = player_season_index(df).position(player_name, season)
+    if pos is None:
         raise ValueError(f"No data found for {player_name} in {season} season.")
-    
-    row = df_player.iloc[0]
-    league_row = league_avg_df.loc[season]
-
-    zones = [
-        ("0–3 ft", "fg_percent_from_x0_3_range"),
-        ("3–10 ft", "fg_percent_from_x3_10_range"),
-        ("10–16 ft", "fg_percent_from_x10_16_range"),
-        ("16 ft – 3PT", "fg_percent_from_x16_3p_range"),
-        ("Corner 3", "corner_3_point_percent"),
-        ("Non-Corner 3", "fg_percent_from_x3p_range"),
-    ]
-
-    corner_3_pct = row["percent_corner_3s_of_3pa"] * row["percent_fga_from_x3p_range"] * 100
-    non_corner_3_pct = (row["percent_fga_from_x3p_range"] * 100) - corner_3_pct
-
-    shot_zones = {}
-    for label, col in zones:
-        player_fg = row[col] * 100
-        league_fg = league_row[col] * 100
-        fga_pct = (
-            corner_3_pct if label == "Corner 3"
-            else non_corner_3_pct if label == "Non-Corner 3"
-            else row["percent_fga_from_" + col.split("_from_")[1]] * 100
-        )
-        diff = player_fg - league_fg
-        shot_zones[label] = (fga_pct, player_fg, diff)
-
-    return shot_zones
-
-def plot_shot_chart(shot_zones, player_name, season):
-    labels = list(shot_zones.keys())
-    fga_pct = [v[0] for v in shot_zones.values()]
-    fg_pct = [v[1] for v in shot_zones.values()]
-    diff = [v[2] for v in shot_zones.values()]
-
-    # Normalize difference for color mapping
-    max_diff = max(abs(min(diff)), abs(max(diff)), 1e-6)
-    norm_diff = [d / max_diff for d in diff]
-    colors = [plt.cm.RdYlGn((d + 1) / 2) for d in norm_diff]
-
-    fig, ax = plt.subplots(figsize=(10, 6))
-    bars = ax.barh(labels, fga_pct, color=colors)
-    ax.set_xlabel("% of Field Goal Attempts")
-    ax.set_title(f"{player_name} vs League Avg ({season})")
-
-    for bar, fg, d in zip(bars, fg_pct, diff):
-        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
-                f"{fg:.1f}% ({'+' if d >= 0 else ''}{d:.1f}%)", va='center')
-
-    ax.set_xlim(0, max(fga_pct) + 10)
-    plt.tight_layout()
-    return fig
-
-def display_awards_and_honors(selected_player, selected_season, all_star_df, eos_teams_df, award_shares_df, career_info_df):
+
+    # All player-seasons are profiled in one vectorized pass; this just slices
+    return zones_for_row(shot_profiles(df, league_avg_df), pos)
+
+
+@timed("honors.display_awards_and_honors")
+def display_awards_and_honors(selected_player, selected_season, all_star_df, eos_teams_df, award_shares_df, career_info_df,
+                              player_id=None):
+    import streamlit as st
+
     def ordinal(n):
         if 10 <= n % 100 <= 20:
             suffix = "th"
@@ -218,25 +304,13 @@ def display_awards_and_honors(selected_player, selected_season, all_star_df, eos
             suffix = {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
         return f"{n}{suffix}"
 
-    is_all_star = not all_star_df[
-        (all_star_df["player"] == selected_player) &
-        (all_star_df["season"] == selected_season)
-    ].empty
-
-    season_honors = eos_teams_df[
-        (eos_teams_df["player"] == selected_player) &
-        (eos_teams_df["season"] == selected_season)
-    ]
-
-    season_awards = award_shares_df[
-        (award_shares_df["player"] == selected_player) &
-        (award_shares_df["season"] == selected_season)
-    ]
-
-    hof_status = career_info_df[
-        (career_info_df["player"].str.lower() == selected_player.lower())
-    ]
-    is_hof = not hof_status.empty and hof_status.iloc[0]["hof"] == True
+    honors = honors_table(all_star_df, eos_teams_df, award_shares_df, career_info_df)
+    if player_id is not None:  # the selector's player, even when several share the name
+        honors = honors.get(player_id, selected_season)
+    else:
+        honors = honors.lookup(selected_player, selected_season)
+    is_all_star = honors["all_star"]
+    is_hof = honors["hof"]
 
     st.markdown("### 🏅 Awards & Honors")
 
@@ -257,8 +331,7 @@ def display_awards_and_honors(selected_player, selected_season, all_star_df, eos
         </div>
         """, unsafe_allow_html=True)
         
-    for _, row in season_honors.iterrows():
-        honor_text = f"{row['type']} {row['number_tm']} Team"
+    for honor_text in honors["teams"]:
         st.markdown(f"""
         <div style="
             background: linear-gradient(90deg, gold, goldenrod);
@@ -275,37 +348,27 @@ def display_awards_and_honors(selected_player, selected_season, all_star_df, eos
         </div>
         """, unsafe_allow_html=True)
 
-    for _, row in season_awards.iterrows():
-        award_name = row['award'].upper()
-        award_season_df = award_shares_df[
-            (award_shares_df["season"] == row["season"]) & 
-            (award_shares_df["award"] == row["award"])
-        ].sort_values(by="pts_won", ascending=False).reset_index(drop=True)
-
-        player_rank = (
-            award_season_df[award_season_df["player"] == selected_player].index[0] + 1
-            if selected_player in award_season_df["player"].values else None
-        )
-
-        if row['winner'] == "TRUE":
+    for award in honors["awards"]:
+        award_name = award["award"].upper()
+        if award["winner"]:
             banner = f"{award_name} Winner 🏆"
         else:
-            banner = f"{award_name}: {ordinal(player_rank)} Place ({round(row['share'] * 100, 1)}% Vote Share)"
-            st.markdown(f"""
-                <div style="
-                background: linear-gradient(90deg, gold, goldenrod);
-                padding: 10px;
-                border-radius: 10px;
-                text-align: center;
-                font-weight: bold;
-                color: black;
-                margin-top: 10px;
-                margin-bottom: 10px;
-                font-size: 16px;
-                ">
-                {banner}
-                </div>
-                """, unsafe_allow_html=True)
+            banner = f"{award_name}: {ordinal(award['rank'])} Place ({round(award['share'] * 100, 1)}% Vote Share)"
+        st.markdown(f"""
+            <div style="
+            background: linear-gradient(90deg, gold, goldenrod);
+            padding: 10px;
+            border-radius: 10px;
+            text-align: center;
+            font-weight: bold;
+            color: black;
+            margin-top: 10px;
+            margin-bottom: 10px;
+            font-size: 16px;
+            ">
+            {banner}
+            </div>
+            """, unsafe_allow_html=True)
 
     if is_hof:
         st.markdown(f"""
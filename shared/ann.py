@@ -0,0 +1,180 @@
+import hashlib
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.paths import CACHE_DIR
+
+
+def fingerprint(vectors):
+    # Ties a saved index to the exact feature matrix it was built from
+    vectors = np.ascontiguousarray(vectors)
+    digest = hashlib.sha1(vectors.tobytes()).hexdigest()
+    return f"{vectors.shape[0]}x{vectors.shape[1]}-{vectors.dtype}-{digest}"
+
+
+# IVF (inverted file) index over L2-normalized vectors: rows are bucketed by
+# their nearest k-means centroid and a query only scores the rows in the
+# n_probe closest buckets. n_probe is the recall/latency knob: 1 is fastest,
+# n_lists is an exact (but slower) search.
+class IVFIndex:
+    def __init__(self, vectors, centroids, list_ids, list_offsets, n_probe=8):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.list_ids = list_ids
+        self.list_offsets = list_offsets
+        self.n_probe = n_probe
+        # Rows stored in list order so each probed list is a contiguous slice
+        self.list_vectors = vectors[list_ids]
+
+    @property
+    def n_lists(self):
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, n_probe=8, random_state=0):
+        from sklearn.cluster import MiniBatchKMeans  # only needed to train a new index
+
+        n = vectors.shape[0]
+        if n_lists is None:
+            n_lists = max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_lists, batch_size=4096, n_init=3, random_state=random_state
+        )
+        labels = kmeans.fit_predict(vectors)
+
+        # Normalized centroids so the probe step is also a cosine ranking
+        centroids = kmeans.cluster_centers_.astype(vectors.dtype)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids /= norms
+
+        return cls.from_labels(vectors, centroids, labels, n_probe)
+
+    @classmethod
+    def from_labels(cls, vectors, centroids, labels, n_probe=8):
+        # CSR layout: rows of list c are list_ids[list_offsets[c]:list_offsets[c + 1]]
+        list_ids = np.argsort(labels, kind="stable").astype(np.int64)
+        counts = np.bincount(labels, minlength=centroids.shape[0])
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return cls(vectors, centroids, list_ids, list_offsets, n_probe)
+
+    @classmethod
+    def reassign(cls, vectors, centroids, n_probe=8, block_size=8192):
+        # Keep trained centroids, re-bucket (possibly updated) vectors by nearest centroid
+        labels = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], block_size):
+            block = np.asarray(vectors[start:start + block_size])
+            labels[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+        return cls.from_labels(vectors, centroids, labels, n_probe)
+
+    def probe_lists(self, query, n_probe=None):
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        centroid_scores = self.centroids @ query
+        return np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+    def search(self, query, k, n_probe=None, exclude=None):
+        query = np.asarray(query, dtype=self.vectors.dtype)
+        cand_parts, score_parts = [], []
+        for c in self.probe_lists(query, n_probe):
+            start, end = self.list_offsets[c], self.list_offsets[c + 1]
+            cand_parts.append(self.list_ids[start:end])
+            score_parts.append(self.list_vectors[start:end] @ query)
+        cand = np.concatenate(cand_parts)
+        scores = np.concatenate(score_parts)
+
+        if exclude is not None:
+            keep = cand != exclude
+            cand, scores = cand[keep], scores[keep]
+        if len(cand) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=self.vectors.dtype)
+
+        k = min(k, len(cand))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return cand[top], scores[top]
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            centroids=self.centroids,
+            list_ids=self.list_ids,
+            list_offsets=self.list_offsets,
+            n_probe=self.n_probe,
+            fingerprint=fingerprint(self.vectors),
+        )
+
+    @classmethod
+    def load(cls, path, vectors):
+        with np.load(path) as data:
+            if str(data["fingerprint"]) != fingerprint(vectors):
+                raise ValueError(f"{path.name} was built from different features")
+            return cls(
+                vectors, data["centroids"], data["list_ids"],
+                data["list_offsets"], int(data["n_probe"]),
+            )
+
+
+def load_or_build_index(name, vectors, n_lists=None, n_probe=8):
+    # Loads data/cache/<name>.ivf.npz, rebuilding it if missing or stale
+    path = CACHE_DIR / f"{name}.ivf.npz"
+    if path.exists():
+        try:
+            index = IVFIndex.load(path, vectors)
+            index.n_probe = n_probe
+            return index
+        except (ValueError, KeyError, OSError):
+            pass
+
+    index = IVFIndex.build(vectors, n_lists=n_lists, n_probe=n_probe)
+    index.save(path)
+    return index
+
+
+def refresh_index(name, vectors, n_probe=8):
+    # After an incremental feature update: re-bucket rows under the saved
+    # centroids instead of retraining k-means. Returns None if nothing is saved.
+    path = CACHE_DIR / f"{name}.ivf.npz"
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        if str(data["fingerprint"]) == fingerprint(vectors):
+            return IVFIndex.load(path, vectors)
+        centroids = data["centroids"]
+    if centroids.shape[1] != vectors.shape[1]:
+        return None
+    index = IVFIndex.reassign(vectors, centroids, n_probe=n_probe)
+    index.save(path)
+    return index
+
+
+def recall_report(index, engine, k=10, n_probes=(1, 2, 4, 8, 16, 32), n_queries=500, seed=0):
+    # recall@k and per-query latency of the index against exact cosine search
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(engine), size=min(n_queries, len(engine)), replace=False)
+
+    start = time.perf_counter()
+    exact = [set(engine.top_k(i, k)[0]) for i in queries]
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    rows = []
+    for n_probe in n_probes:
+        if n_probe > index.n_lists:
+            continue
+        hits = 0
+        start = time.perf_counter()
+        for i, truth in zip(queries, exact):
+            found, _ = index.search(index.vectors[i], k, n_probe=n_probe, exclude=i)
+            hits += len(truth.intersection(found))
+        ann_ms = (time.perf_counter() - start) / len(queries) * 1000
+        rows.append({
+            "n_probe": n_probe,
+            f"recall@{k}": hits / (k * len(queries)),
+            "ann_ms": ann_ms,
+            "exact_ms": exact_ms,
+        })
+    return pd.DataFrame(rows)
@@ -0,0 +1,24 @@
+import importlib
+import os
+import sys
+import time
+
+from shared.paths import ROOT_DIR
+
+# Working directory each app's main.py expects its relative data paths from
+APP_CWD = {
+    "PlayerComps": ROOT_DIR / "PlayerComps",
+    "PlayerComps_with_Shooting": ROOT_DIR / "PlayerComps_with_Shooting",
+    "combined_player_season_page": ROOT_DIR,
+    "ShotCharts": ROOT_DIR / "ShotCharts",
+}
+
+
+def load_app_module(app, module="main"):
+    # Import <app>/main.py the way `streamlit run` does: script dir on sys.path
+    os.chdir(APP_CWD[app])
+    sys.path.insert(0, str(ROOT_DIR / app))
+    sys.modules.pop(module, None)
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    return mod, time.perf_counter() - start
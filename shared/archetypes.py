@@ -0,0 +1,175 @@
+# Style archetypes: every comps row assigned to one of n clusters of the
+# normalized weighted features (the same space the comps search uses).
+#
+#   python -m shared.archetypes [--app PlayerComps_with_Shooting] [--clusters 12]
+#                               [--season 2024 [--tm BOS]]
+#
+# The fit is MiniBatchKMeans.partial_fit over shuffled row chunks, so only a
+# chunk at a time is read from the (memory-mapped) feature matrix and it
+# scales to the synthetic 10x/100x histories. Centroids and labels are saved
+# to data/cache/archetypes/<name>-c<clusters>.npz, tied to the exact feature
+# matrix (see shared.ann.fingerprint).
+#
+# Each cluster is named after the stats that set its centroid apart, e.g.
+# "x3pa_per_100_poss+ avg_dist_fga+ orb_per_100_poss-". Rows are also kept
+# in (season, archetype) order with a seasons x clusters offset table, so
+# the rows of one archetype in one season, a season's mix, and a team's mix
+# are O(1) lookups for team-composition reports.
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from shared.ann import fingerprint
+from shared.paths import CACHE_DIR
+
+ARCHETYPE_DIR = CACHE_DIR / "archetypes"
+DEFAULT_CLUSTERS = 12
+_CHUNK = 4096
+
+
+def fit_archetypes(vectors, n_clusters=DEFAULT_CLUSTERS, epochs=3, random_state=0):
+    # (centroids, labels) from chunked partial_fit passes over vectors
+    from sklearn.cluster import MiniBatchKMeans  # only needed to fit
+
+    n = vectors.shape[0]
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=_CHUNK, random_state=random_state)
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        # Shuffled chunk order; each chunk is a contiguous (mmap-friendly) block
+        starts = rng.permutation(np.arange(0, n, _CHUNK))
+        for start in starts:
+            chunk = np.asarray(vectors[start:start + _CHUNK], dtype=np.float64)
+            if len(chunk) < n_clusters and not hasattr(kmeans, "cluster_centers_"):
+                continue  # the first partial_fit needs at least n_clusters rows
+            kmeans.partial_fit(chunk)
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    return centroids, assign(vectors, centroids)
+
+
+def assign(vectors, centroids):
+    # Nearest centroid per row, chunked so N x clusters is never built at once
+    labels = np.empty(vectors.shape[0], dtype=np.int16)
+    sq = (centroids ** 2).sum(axis=1)
+    for start in range(0, vectors.shape[0], _CHUNK):
+        chunk = np.asarray(vectors[start:start + _CHUNK], dtype=np.float32)
+        labels[start:start + len(chunk)] = np.argmin(sq - 2 * chunk @ centroids.T, axis=1)
+    return labels
+
+
+def describe(features, weights, labels, columns, n_clusters, top=3):
+    # Name each cluster by its most distinctive stats (standardized centroid)
+    standardized = np.asarray(features, dtype=np.float64) / np.where(weights == 0, 1, weights)
+    names = []
+    for c in range(n_clusters):
+        members = labels == c
+        if not members.any():
+            names.append(f"archetype {c}")
+            continue
+        center = standardized[members].mean(axis=0)
+        picks = np.argsort(-np.abs(center))[:top]
+        names.append(" ".join(f"{columns[j]}{'+' if center[j] > 0 else '-'}" for j in picks))
+    return names
+
+
+class Archetypes:
+    def __init__(self, centroids, labels, names, seasons, teams=None):
+        self.centroids = centroids
+        self.labels = labels
+        self.names = list(names)
+        self.n_clusters = len(centroids)
+        self._build_membership(np.asarray(seasons), teams)
+
+    def _build_membership(self, seasons, teams):
+        self.seasons = np.unique(seasons)
+        season_pos = np.searchsorted(self.seasons, seasons)
+        # Rows sorted by (season, archetype); offsets[s, c]:offsets[s, c + 1] is one cell
+        self.order = np.lexsort((self.labels, season_pos)).astype(np.int32)
+        cell = season_pos * self.n_clusters + self.labels.astype(np.int64)
+        counts = np.bincount(cell, minlength=len(self.seasons) * self.n_clusters)
+        self.counts = counts.reshape(len(self.seasons), self.n_clusters)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self._season_pos = {int(s): i for i, s in enumerate(self.seasons)}
+
+        self._team_counts = {}
+        if teams is not None:
+            frame = pd.DataFrame({"season": seasons, "tm": np.asarray(teams).astype(str), "label": self.labels})
+            table = frame.groupby(["season", "tm", "label"]).size().unstack(fill_value=0)
+            table = table.reindex(columns=range(self.n_clusters), fill_value=0)
+            for (season, tm), row in zip(table.index, table.to_numpy()):
+                self._team_counts[(int(season), tm)] = row
+
+    def members(self, season, archetype):
+        # Row positions of one archetype in one season
+        s = self._season_pos.get(int(season))
+        if s is None:
+            return self.order[:0]
+        cell = s * self.n_clusters + int(archetype)
+        return self.order[self.offsets[cell]:self.offsets[cell + 1]]
+
+    def season_mix(self, season):
+        # Rows per archetype in a season
+        s = self._season_pos.get(int(season))
+        return np.zeros(self.n_clusters, dtype=np.int64) if s is None else self.counts[s]
+
+    def team_mix(self, season, tm):
+        return self._team_counts.get((int(season), str(tm)), np.zeros(self.n_clusters, dtype=np.int64))
+
+    def composition(self, season, tm=None):
+        counts = self.season_mix(season) if tm is None else self.team_mix(season, tm)
+        return pd.DataFrame({"archetype": range(self.n_clusters), "name": self.names, "rows": counts})
+
+    def save(self, path, vectors):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, centroids=self.centroids, labels=self.labels, names=np.array(self.names),
+                 fingerprint=fingerprint(vectors))
+
+
+def load_or_fit_archetypes(name, df, artifact, n_clusters=DEFAULT_CLUSTERS):
+    # Saved archetypes for this feature matrix, refitted when it changed
+    path = ARCHETYPE_DIR / f"{name}-c{n_clusters}.npz"
+    vectors = artifact.vectors
+    teams = df["tm"] if "tm" in df else None
+    if path.exists():
+        try:
+            with np.load(path) as data:
+                if str(data["fingerprint"]) == fingerprint(vectors):
+                    return Archetypes(data["centroids"], data["labels"], data["names"].tolist(), df["season"], teams)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    centroids, labels = fit_archetypes(vectors, n_clusters)
+    names = describe(artifact.features, np.asarray(artifact.weights), labels, artifact.columns, n_clusters)
+    archetypes = Archetypes(centroids, labels, names, df["season"], teams)
+    archetypes.save(path, vectors)
+    return archetypes
+
+
+def main():
+    from shared.apps import load_app_module
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting", choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--clusters", type=int, default=DEFAULT_CLUSTERS)
+    parser.add_argument("--season", type=int, default=None)
+    parser.add_argument("--tm", default=None)
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    archetypes = comps.get_archetypes(args.clusters)
+    if args.season is None:
+        sizes = np.bincount(archetypes.labels, minlength=archetypes.n_clusters)
+        for c, (size, label) in enumerate(zip(sizes, archetypes.names)):
+            print(f"  {c:3d}  {size:6d}  {label}")
+        return
+    print(archetypes.composition(args.season, args.tm).to_string(index=False))
+    for c in range(archetypes.n_clusters):
+        rows = archetypes.members(args.season, c)
+        if args.tm:
+            rows = rows[comps.df["tm"].to_numpy()[rows].astype(str) == args.tm]
+        if len(rows):
+            print(f"{c:3d}: {', '.join(comps.df['player'].to_numpy()[rows][:6])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# Top-k comps for every player-season in one batch job.
+#
+#   python -m shared.batch_comps --app PlayerComps_with_Shooting --k 10 \
+#       --workers 8 --block-size 512 --out data/cache/comps_top10.parquet
+#
+# Rows are scored in blocks of --block-size against the full normalized
+# feature matrix, so peak memory per worker is block_size x N scores instead
+# of the N x N similarity matrix. Workers read the matrix through a shared
+# memory-mapped .npy file.
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shared.paths import CACHE_DIR
+
+_vectors = None
+
+
+def _init_worker(vectors_path):
+    global _vectors
+    _vectors = np.load(vectors_path, mmap_mode="r")
+
+
+def block_top_k(vectors, start, end, k):
+    # (end - start) x N scores for this block only
+    scores = np.asarray(vectors[start:end]) @ np.asarray(vectors).T
+    rows = np.arange(end - start)
+    scores[rows, rows + start] = -np.inf  # a player-season is not its own comp
+
+    k = min(k, scores.shape[1] - 1)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+
+
+def _run_block(args):
+    start, end, k = args
+    top, top_scores = block_top_k(_vectors, start, end, k)
+    return start, top.astype(np.int32), top_scores.astype(np.float32)
+
+
+def _npy_source(vectors):
+    # The .npy file behind a whole-file np.load(mmap_mode=...) array, else None
+    path = getattr(vectors, "filename", None)
+    if path is None or not str(path).endswith(".npy"):
+        return None
+    on_disk = np.load(path, mmap_mode="r")
+    if on_disk.shape != vectors.shape or on_disk.dtype != vectors.dtype:
+        return None
+    return path
+
+
+def all_top_k(vectors, k=10, block_size=512, workers=None):
+    # Returns (neighbours, scores), both N x k, rows in the order of vectors
+    n = vectors.shape[0]
+    neighbours = np.empty((n, min(k, n - 1)), dtype=np.int32)
+    scores = np.empty(neighbours.shape, dtype=np.float32)
+    blocks = [(start, min(start + block_size, n), k) for start in range(0, n, block_size)]
+
+    def collect(results):
+        for start, top, top_scores in results:
+            neighbours[start:start + len(top)] = top
+            scores[start:start + len(top)] = top_scores
+
+    if workers == 1:
+        global _vectors
+        _vectors = vectors
+        collect(map(_run_block, blocks))
+        return neighbours, scores
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A memory-mapped feature artifact is shared as-is; anything else is spilled once
+        vectors_path = _npy_source(vectors)
+        if vectors_path is None:
+            vectors_path = os.path.join(tmp, "vectors.npy")
+            np.save(vectors_path, np.ascontiguousarray(vectors))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(vectors_path,)) as pool:
+            collect(pool.map(_run_block, blocks))
+    return neighbours, scores
+
+
+def patch_top_k(vectors, neighbours, scores, dirty, block_size=512):
+    # Bring top-k lists up to date after the rows in `dirty` were added or changed.
+    # neighbours/scores are N x k in the row order of vectors, with -1 for rows
+    # that have no usable list. Only rows whose list involves a dirty row are
+    # rescored in full; every other row is merged against the dirty rows only.
+    # Returns (neighbours, scores, recomputed, patched) where the last two are
+    # row positions.
+    n, k = neighbours.shape
+    dirty = np.asarray(dirty, dtype=np.int64)
+    is_dirty = np.zeros(n, dtype=bool)
+    is_dirty[dirty] = True
+
+    lost = (neighbours < 0).any(axis=1)
+    lost[~lost] = is_dirty[neighbours[~lost]].any(axis=1)
+    recompute = np.flatnonzero(is_dirty | lost)
+    for start in range(0, len(recompute), block_size):
+        rows = recompute[start:start + block_size]
+        block = np.asarray(vectors[rows]) @ np.asarray(vectors).T
+        block[np.arange(len(rows)), rows] = -np.inf
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        neighbours[rows] = np.take_along_axis(top, order, axis=1)
+        scores[rows] = np.take_along_axis(top_scores, order, axis=1)
+
+    # A clean row only changes if a dirty row now beats its k-th score
+    clean = np.flatnonzero(~(is_dirty | lost))
+    patched = []
+    dirty_vectors = np.asarray(vectors[dirty]).T
+    for start in range(0, len(clean), block_size):
+        rows = clean[start:start + block_size]
+        against = np.asarray(vectors[rows]) @ dirty_vectors
+        enters = (against > scores[rows, -1:]).any(axis=1)
+        if not enters.any():
+            continue
+        rows, against = rows[enters], against[enters]
+        cand = np.concatenate([neighbours[rows], np.broadcast_to(dirty, (len(rows), len(dirty)))], axis=1)
+        cand_scores = np.concatenate([scores[rows], against], axis=1)
+        top = np.argsort(-cand_scores, axis=1, kind="stable")[:, :k]
+        neighbours[rows] = np.take_along_axis(cand, top, axis=1)
+        scores[rows] = np.take_along_axis(cand_scores, top, axis=1)
+        patched.append(rows)
+
+    patched = np.concatenate(patched) if patched else np.empty(0, dtype=np.int64)
+    return neighbours, scores, recompute, patched
+
+
+def neighbours_table(seas_ids, neighbours, scores):
+    # Long (seas_id, neighbour_seas_id, rank, score) table; missing seas_id -> -1
+    seas_ids = pd.Series(seas_ids).fillna(-1).to_numpy(dtype=np.int32)
+    k = neighbours.shape[1]
+    rank_dtype = np.int16 if k <= np.iinfo(np.int16).max else np.int32  # int8 would wrap past k=127
+    return pd.DataFrame({
+        "seas_id": np.repeat(seas_ids, k),
+        "neighbour_seas_id": seas_ids[neighbours.ravel()],
+        "rank": np.tile(np.arange(1, k + 1, dtype=rank_dtype), len(seas_ids)),
+        "score": scores.ravel(),
+    })
+
+
+def write_table(table, path, meta=None):
+    # meta (e.g. the feature artifact's fit_id/generation) goes to a .meta.json sidecar
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".npz":
+        np.savez_compressed(path, **{col: table[col].to_numpy() for col in table.columns})
+    else:
+        table.to_parquet(path, index=False)
+    if meta is not None:
+        path.with_suffix(".meta.json").write_text(json.dumps(meta))
+
+
+def read_table(path):
+    path = Path(path)
+    meta_path = path.with_suffix(".meta.json")
+    meta = json.loads(meta_path.read_text()) if meta_path.exists() else None
+    if path.suffix == ".npz":
+        with np.load(path) as data:
+            return pd.DataFrame({col: data[col] for col in data.files}), meta
+    return pd.read_parquet(path), meta
+
+
+def table_meta(artifact, k):
+    return {"fit_id": artifact.meta["fit_id"], "generation": artifact.meta["generation"], "k": k}
+
+
+def main():
+    from shared.apps import load_app_module
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting",
+                        choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--block-size", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default=None, help=".parquet or .npz")
+    args = parser.parse_args()
+    out = Path(args.out) if args.out else CACHE_DIR / f"{args.app}_top{args.k}.parquet"
+    out = out.resolve()  # load_app_module changes the working directory
+
+    comps, _ = load_app_module(args.app)
+    vectors = comps.artifact.vectors
+
+    start = time.perf_counter()
+    neighbours, scores = all_top_k(vectors, k=args.k, block_size=args.block_size, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    table = neighbours_table(comps.df["seas_id"], neighbours, scores)
+    write_table(table, out, meta=table_meta(comps.artifact, neighbours.shape[1]))
+    print(f"{len(vectors)} rows, top-{args.k}, {args.workers} workers: {elapsed:.1f}s -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Canonical in-memory form of the data tables, shared by every loader
+# (shared.data_store applies compact() before caching a table):
+#
+#   - string columns whose values repeat (player, tm, pos, lg, ...) become
+#     categoricals; unique-per-row strings stay strings
+#   - integer columns become int16/int32 (never int8, so g * 48 style
+#     arithmetic on them cannot overflow)
+#   - float stats become float32 only on request (floats="float32"); by
+#     default they stay float64 so displayed and exported values match the CSV
+#
+# Traded players have one row per team plus a TOT row for the season (each
+# with its own seas_id). load_table(name, traded=...) picks what a caller sees:
+#
+#   all     every row (default)
+#   flag    every row plus a bool "multi_team" column
+#   tot     one row per player-season: the TOT row for traded players
+#   teams   the per-team rows only, TOT rows of traded players dropped
+#
+# The comps modules load with floats="float32" and NBA_COMPS_TRADED=<policy>
+# (default all), e.g. NBA_COMPS_TRADED=tot keeps traded players' near-duplicate
+# per-team rows out of the similarity matrix.
+#
+#   python -m shared.canonical [--table "Per 100 Poss" ...]   # memory report
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+TRADED_POLICIES = ("all", "flag", "tot", "teams")
+MAX_CATEGORY_RATIO = 0.5  # categorical only when values repeat at least twice on average
+COMPS_TRADED = os.environ.get("NBA_COMPS_TRADED", "all")
+
+
+def compact(df, floats=None):
+    # Categoricals and small integers; floats="float32" also halves the float columns
+    out = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_string_dtype(values) and not isinstance(values.dtype, pd.CategoricalDtype):
+            if values.nunique(dropna=True) <= MAX_CATEGORY_RATIO * len(values):
+                values = values.astype("category")
+        elif pd.api.types.is_integer_dtype(values) and values.dtype.itemsize > 2:
+            info = np.iinfo(np.int16)
+            if len(values) == 0 or (values.min() >= info.min and values.max() <= info.max):
+                values = values.astype("int16")
+            elif values.dtype.itemsize > 4 and values.min() >= np.iinfo(np.int32).min \
+                    and values.max() <= np.iinfo(np.int32).max:
+                values = values.astype("int32")
+        elif floats == "float32" and values.dtype == np.float64:
+            values = values.astype("float32")
+        out[col] = values
+    return pd.DataFrame(out, index=df.index)
+
+
+def multi_team_rows(df):
+    # True for every row of a traded player's season: a player-season with
+    # several rows, one of them TOT (award tables repeat player-seasons too)
+    key = pd.DataFrame({"player_id": df["player_id"].to_numpy(dtype=np.float64),
+                        "season": df["season"].to_numpy(), "tot": total_rows(df)})
+    has_total = key.groupby(["player_id", "season"], dropna=False)["tot"].transform("any").to_numpy()
+    return key.duplicated(["player_id", "season"], keep=False).to_numpy() & has_total \
+        & ~np.isnan(key["player_id"].to_numpy())
+
+
+def total_rows(df):
+    return (df["tm"].astype(str) == "TOT").to_numpy()
+
+
+def apply_traded_policy(df, policy="all"):
+    if policy not in TRADED_POLICIES:
+        raise ValueError(f"traded policy must be one of {TRADED_POLICIES}, got {policy!r}")
+    if policy == "all" or not {"player_id", "season", "tm"} <= set(df.columns):
+        return df
+    multi = multi_team_rows(df)
+    if policy == "flag":
+        return df.assign(multi_team=multi)
+    if policy == "tot":
+        keep = ~multi | total_rows(df)
+    else:
+        keep = ~(multi & total_rows(df))
+    return df[keep].reset_index(drop=True)
+
+
+def memory_mb(df):
+    return df.memory_usage(deep=True).sum() / 2 ** 20
+
+
+def memory_report(names):
+    # MB per table: plain read_csv, the cached canonical form, float32 stats,
+    # and float32 with one row per player-season
+    from shared.data_store import load_table, source_path
+
+    rows = []
+    for name in names:
+        raw = pd.read_csv(source_path(name))
+        df = load_table(name)
+        small = compact(df, floats="float32")
+        row = {"table": name, "rows": len(raw), "read_csv": memory_mb(raw),
+               "canonical": memory_mb(df), "float32": memory_mb(small)}
+        if {"player_id", "season", "tm"} <= set(df.columns):
+            tot = apply_traded_policy(small, "tot")
+            row["float32_tot"] = memory_mb(tot)
+            row["tot_rows"] = len(tot)
+        rows.append(row)
+    report = pd.DataFrame(rows)
+    report["saved"] = 1 - report["float32"] / report["read_csv"]
+    return report
+
+
+def main():
+    from shared.paths import DATA_DIR
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--table", action="append", default=None, help="CSV name without extension (repeatable)")
+    args = parser.parse_args()
+
+    names = args.table or sorted(src.stem for src in DATA_DIR.glob("*.csv"))
+    report = memory_report(names)
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    total = report[["read_csv", "canonical", "float32"]].sum()
+    print(f"total: {total['read_csv']:.1f} MB read_csv -> {total['canonical']:.1f} MB canonical "
+          f"-> {total['float32']:.1f} MB with float32 stats")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# Shot chart rendering with a bytes cache.
+#
+# plot_shot_chart() builds the matplotlib figure; shot_chart_bytes() renders
+# it once per (player_id, season, data version, STYLE_VERSION, format) and
+# keeps the PNG/SVG bytes in a per-process LRU cache, so repeated button
+# presses do not redraw. Figures are plain matplotlib.figure.Figure objects on
+# their own Agg canvas, never registered with pyplot: nothing leaks, and
+# concurrent sessions or server threads cannot draw on each other's figure. The data version is
+# the source sha1 of the shooting and league average tables (see
+# shared.data_store), so a refreshed CSV never serves an old chart.
+#
+# Headless batch mode renders a whole season (optionally one team) across a
+# process pool with the Agg backend:
+#
+#   python -m shared.charts --season 2024 [--team LAL] [--fmt svg] \
+#       [--workers 8] [--out data/cache/charts]
+import argparse
+import hashlib
+import io
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from shared.instrument import timed
+from shared.lookup import cached_per_frame, player_season_index
+from shared.paths import CACHE_DIR
+from shared.shot_profiles import shot_profiles, zones_for_row
+
+STYLE_VERSION = 1  # bump whenever plot_shot_chart's output changes
+
+
+@timed("chart.plot_shot_chart")
+def plot_shot_chart(shot_zones, player_name, season):
+    # deferred: pages without a chart never load matplotlib
+    from matplotlib import colormaps
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    labels = list(shot_zones.keys())
+    fga_pct = [v[0] for v in shot_zones.values()]
+    fg_pct = [v[1] for v in shot_zones.values()]
+    diff = [v[2] for v in shot_zones.values()]
+
+    # Normalize difference for color mapping
+    max_diff = max(abs(min(diff)), abs(max(diff)), 1e-6)
+    norm_diff = [d / max_diff for d in diff]
+    colors = [colormaps["RdYlGn"]((d + 1) / 2) for d in norm_diff]
+
+    # No pyplot: its current-figure state is shared by every thread
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    bars = ax.barh(labels, fga_pct, color=colors)
+    ax.set_xlabel("% of Field Goal Attempts")
+    ax.set_title(f"{player_name} vs League Avg ({season})")
+
+    for bar, fg, d in zip(bars, fg_pct, diff):
+        ax.text(bar.get_width() + 1, bar.get_y() + bar.get_height() / 2,
+                f"{fg:.1f}% ({'+' if d >= 0 else ''}{d:.1f}%)", va='center')
+
+    ax.set_xlim(0, max(fga_pct) + 10)
+    fig.tight_layout()
+    return fig
+
+
+@timed("chart.render")
+def figure_bytes(fig, fmt="png", dpi=100):
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    return buf.getvalue()
+
+
+class ChartCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()  # Streamlit sessions share the process
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, render):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+        data = render()
+        with self._lock:
+            self.misses += 1
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+chart_cache = ChartCache()
+
+
+def _render_row(shooting_df, league_avg_df, pos, fmt):
+    row = shooting_df.iloc[pos]
+    zones = zones_for_row(shot_profiles(shooting_df, league_avg_df), pos)
+    return figure_bytes(plot_shot_chart(zones, row["player"], int(row["season"])), fmt=fmt)
+
+
+def data_version(df):
+    # Source sha1 of a load_table() frame; a content hash for any other frame
+    sha1 = df.attrs.get("source_sha1")
+    if sha1 is not None:
+        return sha1
+    return cached_per_frame(df, "content_sha1", lambda: hashlib.sha1(
+        pd.util.hash_pandas_object(df).to_numpy().tobytes()).hexdigest())
+
+
+def shot_chart_bytes(shooting_df, player_name, season, league_avg_df, fmt="png", player_id=None):
+    # player_id (from shared.name_search) tells apart players who share a name
+    if player_id is not None:
+        from shared.name_search import name_index
+
+        pos = name_index().position(shooting_df, player_id, season)
+    else:
+        pos = player_season_index(shooting_df).position(player_name, season)
+    if pos is None:
+        raise ValueError(f"No data found for {player_name} in {season} season.")
+
+    player_id = shooting_df["player_id"].iloc[pos]
+    who = player_name if pd.isna(player_id) else int(player_id)
+    key = (who, int(season), data_version(shooting_df), data_version(league_avg_df), STYLE_VERSION, fmt)
+    return chart_cache.get(key, lambda: _render_row(shooting_df, league_avg_df, pos, fmt))
+
+
+# === Headless batch rendering ===
+
+_frames = None
+
+
+def _init_worker():
+    global _frames
+    import matplotlib
+    from shared.data_store import load_table
+
+    matplotlib.use("Agg")
+    _frames = (load_table("Player Shooting"), load_table("League Average Shooting").set_index("Season"))
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")
+
+
+def _render_to_file(args):
+    pos, out_dir, fmt = args
+    shooting_df, league_avg_df = _frames
+    row = shooting_df.iloc[pos]
+    player_id = "na" if pd.isna(row["player_id"]) else int(row["player_id"])
+    path = Path(out_dir) / str(int(row["season"])) / f"{player_id}_{_slug(str(row['player']))}_{row['tm']}.{fmt}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(_render_row(shooting_df, league_avg_df, pos, fmt))
+    return str(path)
+
+
+def render_batch(positions, out_dir, fmt="png", workers=None):
+    tasks = [(pos, str(out_dir), fmt) for pos in positions]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(_render_to_file, tasks, chunksize=16))
+
+
+def main():
+    from shared.data_store import load_table
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--team", default=None, help="tm abbreviation, e.g. LAL")
+    parser.add_argument("--fmt", default="png", choices=["png", "svg"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default=str(CACHE_DIR / "charts"))
+    args = parser.parse_args()
+
+    shooting_df = load_table("Player Shooting")
+    mask = shooting_df["season"] == args.season
+    if args.team:
+        mask &= shooting_df["tm"] == args.team
+    positions = mask.to_numpy().nonzero()[0]
+
+    start = time.perf_counter()
+    paths = render_batch(positions, args.out, fmt=args.fmt, workers=args.workers)
+    print(f"rendered {len(paths)} charts in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
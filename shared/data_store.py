@@ -0,0 +1,170 @@
+# Typed columnar cache for the CSVs in data/.
+#
+# Each "<name>.csv" is parsed once into data/cache/tables/<name>.parquet with
+# explicit dtypes. A sidecar .meta.json records the source file's size,
+# mtime and sha1; a changed mtime only triggers a rebuild if the content hash
+# changed too. Every app loads its tables through load_table() instead of its
+# own pd.read_csv("../data/...") call. Tables are cached in the compact
+# canonical form of shared.canonical (categoricals, small integers); the
+# float32 and traded-player options are applied per load_table() call.
+# Every loaded frame carries its source's sha1 in df.attrs["source_sha1"], so
+# caches of derived results (e.g. shared.charts) can key on the data itself.
+# Cache and sidecar files are written under temporary names and moved into
+# place with os.replace, so a process loading a table while another rebuilds
+# it never reads a half-written file.
+#
+#   python -m shared.data_store            # (re)build the cache for every CSV
+import hashlib
+import json
+import os
+import uuid
+
+import pandas as pd
+
+from shared.canonical import apply_traded_policy, compact
+from shared.instrument import timed
+from shared.paths import CACHE_DIR, DATA_DIR
+
+TABLE_DIR = CACHE_DIR / "tables"
+FORMAT_VERSION = 2  # bump when the dtype policy below changes
+
+# Low-cardinality labels shared by most tables
+CATEGORY_COLS = {
+    "pos", "lg", "tm", "team", "abbreviation", "type", "number_tm",
+    "position", "award", "League",
+}
+DTYPES = {
+    "season": "int16",
+    "Season": "int16",
+}
+
+try:
+    import pyarrow  # noqa: F401
+    _CACHE_SUFFIX = ".parquet"
+except ImportError:  # parquet needs pyarrow; fall back to pickle
+    _CACHE_SUFFIX = ".pkl"
+
+
+def source_path(name):
+    return DATA_DIR / f"{name}.csv"
+
+
+def _file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@timed("data.parse_csv")
+def read_source(name):
+    path = source_path(name)
+    header = pd.read_csv(path, nrows=0).columns
+    dtypes = {col: DTYPES.get(col, "category") for col in header
+              if col in DTYPES or col in CATEGORY_COLS}
+    return compact(pd.read_csv(path, dtype=dtypes))
+
+
+def _fresh_meta(src, meta_path):
+    # The sidecar's contents if it still describes src, else None. Callers use
+    # this one read, never a second one another process may have replaced.
+    try:
+        meta = json.loads(meta_path.read_text())
+    except FileNotFoundError:
+        return None
+    if meta.get("version") != FORMAT_VERSION:
+        return None
+
+    stat = src.stat()
+    if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return meta
+    # Touched but possibly unchanged (e.g. re-downloaded): compare content
+    if meta["size"] == stat.st_size and meta["sha1"] == _file_sha1(src):
+        meta["mtime_ns"] = stat.st_mtime_ns
+        _replace(meta_path, lambda tmp: tmp.write_text(json.dumps(meta)))
+        return meta
+    return None
+
+
+def _replace(path, write):
+    # write(tmp) fills a temporary file next to path, which then replaces it
+    tmp = path.with_name(f"{path.name}.tmp-{uuid.uuid4().hex}")
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _write_cache(df, cache_path, src, meta_path):
+    TABLE_DIR.mkdir(parents=True, exist_ok=True)
+    if _CACHE_SUFFIX == ".parquet":
+        _replace(cache_path, lambda tmp: df.to_parquet(tmp, index=False))
+    else:
+        _replace(cache_path, df.to_pickle)
+    # The sidecar goes last: until it is replaced, readers see the old
+    # sidecar, which no longer matches the source, and rebuild for themselves
+    stat = src.stat()
+    meta = {
+        "version": FORMAT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha1": _file_sha1(src),
+    }
+    _replace(meta_path, lambda tmp: tmp.write_text(json.dumps(meta)))
+    return meta
+
+
+@timed("data.load_table")
+def load_table(name, traded="all", floats=None):
+    # name is the CSV file name without extension, e.g. "Per 100 Poss".
+    # traded is a shared.canonical policy for traded players' rows;
+    # floats="float32" stores the float stats in single precision.
+    df = _load_cached(name)
+    sha1 = df.attrs["source_sha1"]
+    if floats is not None:
+        df = compact(df, floats=floats)
+    df = apply_traded_policy(df, traded)
+    df.attrs["source_sha1"] = sha1
+    return df
+
+
+def _load_cached(name):
+    src = source_path(name)
+    if not src.exists():
+        raise FileNotFoundError(f"No such data file: {src}")
+
+    cache_path = TABLE_DIR / f"{name}{_CACHE_SUFFIX}"
+    meta_path = TABLE_DIR / f"{name}.meta.json"
+    meta = _fresh_meta(src, meta_path) if cache_path.exists() else None
+    if meta is not None:
+        if _CACHE_SUFFIX == ".parquet":
+            df = pd.read_parquet(cache_path, memory_map=True)
+        else:
+            df = pd.read_pickle(cache_path)
+    else:
+        df = read_source(name)
+        meta = _write_cache(df, cache_path, src, meta_path)
+    df.attrs["source_sha1"] = meta["sha1"]
+    return df
+
+
+def source_sha1(name):
+    # Content hash of data/<name>.csv, from the cache sidecar when it is fresh
+    meta_path = TABLE_DIR / f"{name}.meta.json"
+    cache_path = TABLE_DIR / f"{name}{_CACHE_SUFFIX}"
+    meta = _fresh_meta(source_path(name), meta_path) if cache_path.exists() else None
+    if meta is None:
+        return load_table(name).attrs["source_sha1"]
+    return meta["sha1"]
+
+
+def build_all():
+    for src in sorted(DATA_DIR.glob("*.csv")):
+        load_table(src.stem)
+        print(f"cached {src.name}")
+
+
+if __name__ == "__main__":
+    build_all()
@@ -0,0 +1,202 @@
+# PCA embedding of the weighted comps features: a compact k-dim space for
+# search and its first two components as a 2D league map.
+#
+#   python -m shared.embedding [--app PlayerComps_with_Shooting] [--dims 4 8 12 16 24]
+#                              [--k 10] [--queries 500] [--method exact|randomized]
+#
+# The scaled and weighted features (artifact.features) are projected onto
+# their top principal components. Cosine search over the projected rows
+# costs O(N * k) instead of O(N * d), and since the weighted features are
+# already centered it stays close to cosine search in the full space. The
+# CLI reports cumulative explained variance and top-k agreement with the
+# full space for each size in --dims.
+#
+# Embeddings are saved under data/cache/embeddings/<name>-k<dims>[-randomized]/
+# (published like the feature artifact, see shared.publish) and opened with
+# mmap, keyed on the feature artifact they were fitted on:
+#
+#   meta.json             dims, method, artifact key and fit
+#   components.npy        dims x d projection      center.npy   d
+#   explained.npy         explained variance ratio of every component (d)
+#   coords.npy            float32 N x dims          vectors.npy  coords, L2-normalized
+#
+# NBA_COMPS_EMBED_DIM=<dims> makes the comps modules search in the embedding.
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from shared.paths import CACHE_DIR
+from shared.publish import publish_dir, read_version
+from shared.similarity import SimilarityEngine
+
+EMBED_DIR = CACHE_DIR / "embeddings"
+FORMAT_VERSION = 1
+ARRAYS = ["components", "center", "explained", "coords", "vectors"]
+METHODS = ("exact", "randomized")
+DEFAULT_DIMS = int(os.environ["NBA_COMPS_EMBED_DIM"]) if os.environ.get("NBA_COMPS_EMBED_DIM") else None
+
+
+def fit_pca(features, dims, method="exact", random_state=0):
+    # (center, components dims x d, explained variance ratio of all d components)
+    features = np.asarray(features, dtype=np.float64)
+    center = features.mean(axis=0)
+    centered = features - center
+    total = (centered ** 2).sum()
+    if method == "randomized":
+        from sklearn.utils.extmath import randomized_svd  # for wide feature sets
+
+        _, singular, components = randomized_svd(centered, dims, random_state=random_state)
+        explained = singular ** 2 / total
+    else:
+        # d is small: eigenvectors of the d x d scatter matrix give every component
+        eigvals, eigvecs = np.linalg.eigh(centered.T @ centered)
+        order = np.argsort(eigvals)[::-1]
+        components = eigvecs[:, order].T[:dims]
+        explained = np.maximum(eigvals[order], 0) / total
+    # Deterministic signs: the largest loading of each component is positive
+    signs = np.sign(components[np.arange(len(components)), np.abs(components).argmax(axis=1)])
+    return center, components * signs[:, None], explained
+
+
+def _normalize(coords):
+    norms = np.linalg.norm(coords, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return coords / norms
+
+
+class Embedding:
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.meta = meta
+        self.dims = meta["dims"]
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def load(cls, path):
+        def read(version):
+            meta = json.loads((version / "meta.json").read_text())
+            return cls(path, meta, {name: np.load(version / f"{name}.npy", mmap_mode="r") for name in ARRAYS})
+
+        return read_version(path, read)
+
+    def transform(self, features):
+        # Weighted feature rows -> embedding coordinates
+        return ((np.asarray(features, dtype=np.float64) - self.center) @ self.components.T).astype(np.float32)
+
+    def engine(self):
+        return SimilarityEngine.from_normalized(self.vectors)
+
+    def league_map(self, df):
+        # 2D layout (the first two components) with the identity columns of df
+        cols = [col for col in ["player_id", "player", "season", "tm", "pos", "seas_id"] if col in df]
+        layout = df[cols].reset_index(drop=True)
+        layout["x"] = self.coords[:, 0]
+        layout["y"] = self.coords[:, 1]
+        return layout
+
+
+def _artifact_fit(artifact):
+    return {"key": artifact.meta["key"], "fit_id": artifact.meta.get("fit_id"),
+            "generation": artifact.meta.get("generation", 0)}
+
+
+def build_embedding(path, artifact, dims, method="exact"):
+    features = np.asarray(artifact.features)
+    dims = min(dims, features.shape[1])
+    center, components, explained = fit_pca(features, dims, method)
+    coords = ((features - center) @ components.T).astype(np.float32)
+    arrays = {
+        "components": components, "center": center, "explained": explained,
+        "coords": coords, "vectors": _normalize(coords),
+    }
+    meta = {"version": FORMAT_VERSION, "dims": dims, "method": method, "rows": len(coords),
+            "artifact": _artifact_fit(artifact)}
+
+    def write(version):
+        for name, array in arrays.items():
+            np.save(version / f"{name}.npy", array)
+        (version / "meta.json").write_text(json.dumps(meta))
+
+    publish_dir(path, write)
+    return Embedding.load(path)
+
+
+def load_embedding(name, artifact, dims, method="exact"):
+    # Saved embedding of this artifact, refitted when the artifact changed
+    path = EMBED_DIR / (f"{name}-k{dims}" if method == "exact" else f"{name}-k{dims}-{method}")
+    if (path / "meta.json").exists():
+        try:
+            embedding = Embedding.load(path)
+            meta = embedding.meta
+            if (meta.get("version") == FORMAT_VERSION and meta["method"] == method
+                    and meta["artifact"] == _artifact_fit(artifact)):
+                return embedding
+        except (OSError, ValueError, KeyError):
+            pass
+    return build_embedding(path, artifact, dims, method)
+
+
+def agreement_report(artifact, full_engine, name, dims_list, k=10, n_queries=500, method="exact", seed=0):
+    # Explained variance, top-k overlap with the full space and latency per size
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(full_engine), size=min(n_queries, len(full_engine)), replace=False)
+
+    start = time.perf_counter()
+    exact = [set(full_engine.top_k(i, k)[0].tolist()) for i in queries]
+    full_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+    rows = []
+    for dims in dims_list:
+        start = time.perf_counter()
+        embedding = load_embedding(name, artifact, dims, method)
+        load_ms = (time.perf_counter() - start) * 1000
+        engine = embedding.engine()
+        hits = 0
+        start = time.perf_counter()
+        for i, truth in zip(queries, exact):
+            hits += len(truth.intersection(engine.top_k(i, k)[0].tolist()))
+        rows.append({
+            "dims": embedding.dims,
+            "explained": float(np.sum(embedding.explained[:embedding.dims])),
+            f"agreement@{k}": hits / (k * len(queries)),
+            "embed_ms": (time.perf_counter() - start) / len(queries) * 1000,
+            "full_ms": full_ms,
+            "load_ms": load_ms,
+            "mb": embedding.vectors.nbytes / 2 ** 20,
+        })
+    return pd.DataFrame(rows)
+
+
+EMBED_NAMES = {"PlayerComps": "per100", "PlayerComps_with_Shooting": "shooting"}
+
+
+def main():
+    from shared.apps import load_app_module
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting", choices=sorted(EMBED_NAMES))
+    parser.add_argument("--dims", type=int, nargs="+", default=[4, 8, 12, 16, 24])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--method", choices=METHODS, default="exact")
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    artifact = comps.artifact
+    full_engine = SimilarityEngine.from_normalized(artifact.vectors, precision="float32")
+    report = agreement_report(artifact, full_engine, EMBED_NAMES[args.app], args.dims,
+                              args.k, args.queries, args.method)
+    print(f"{args.app}: {len(full_engine)} rows x {artifact.features.shape[1]} features")
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    out = EMBED_DIR / f"{EMBED_NAMES[args.app]}-report.json"
+    out.write_text(report.to_json(orient="records", indent=2))
+    print(f"-> {out}")
+
+
+if __name__ == "__main__":
+    main()
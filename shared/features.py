@@ -0,0 +1,271 @@
+# Versioned comps feature artifact.
+#
+# The StandardScaler fit, the weights_by_stat vector and the scaled/weighted
+# feature matrix are built once and saved under data/cache/features/<name>/:
+#
+#   meta.json     artifact version, cache keys, column order, change log
+#   mean.npy      scaler mean          scale.npy    scaler scale
+#   weights.npy   weight per column    seas_id.npy  row -> seas_id
+#   features.npy  float32 scaled * weighted features (N x d)
+#   vectors.npy   float32 L2-normalized features, used by SimilarityEngine
+#   row_hash.npy  hash of each row's raw stat values
+#   col_sum.npy / col_sumsq.npy   raw column sums behind the streaming fit
+#
+#   python -m shared.features      # build (or refresh) the artifacts up front
+#
+# Arrays are opened with np.load(mmap_mode="r"), so several app workers share
+# the same pages through the OS cache. <name> is a symlink to the current
+# version directory (see shared.publish), swapped atomically on every rebuild
+# or update, so concurrent builders and readers never collide. The cache key covers the source CSV
+# hashes, the weights dict and the column order, so editing any of them
+# rebuilds the artifact on the next start.
+#
+# When only the source data changed (e.g. the daily in-season refresh), the
+# artifact is updated in place instead: rows are matched on seas_id and
+# row_hash, and only added or changed rows are transformed. NBA_COMPS_REFIT
+# picks how the scaler is handled:
+#
+#   frozen     keep the reference fit; untouched rows keep their features (default)
+#   streaming  refit mean/scale from the raw column sums and re-transform every row
+#   full       always refit from scratch
+#
+# Each incremental update appends {generation, added, changed, removed} to
+# meta["changes"], so stored results (see shared.ingest) can be patched. Only
+# the last MAX_CHANGES records are kept; results older than that are rebuilt.
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from shared.data_store import source_sha1
+from shared.instrument import timed
+from shared.paths import CACHE_DIR
+from shared.publish import publish_dir, read_version
+
+ARTIFACT_VERSION = 2
+FEATURE_DIR = CACHE_DIR / "features"
+ARRAYS = ["mean", "scale", "weights", "seas_id", "features", "vectors", "row_hash", "col_sum", "col_sumsq"]
+REFIT_MODES = ("frozen", "streaming", "full")
+MAX_CHANGES = 64  # change records kept in meta.json
+
+
+def weight_vector(numeric_cols, weights_by_stat):
+    return np.array([weights_by_stat.get(col, 1.0) for col in numeric_cols], dtype=np.float64)
+
+
+def _sha1(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def schema_key(numeric_cols, weights_by_stat):
+    # Everything but the data: a change here always needs a full rebuild
+    return _sha1({
+        "version": ARTIFACT_VERSION,
+        "columns": list(numeric_cols),
+        "weights": sorted(weights_by_stat.items()),
+    })
+
+
+def artifact_key(numeric_cols, weights_by_stat, sources):
+    return _sha1({
+        "schema": schema_key(numeric_cols, weights_by_stat),
+        "sources": {name: source_sha1(name) for name in sources},
+    })
+
+
+def row_hashes(df, numeric_cols):
+    return pd.util.hash_pandas_object(df[numeric_cols], index=False).to_numpy(dtype=np.uint64)
+
+
+def keyed_rows(seas_id):
+    # Rows with a usable key: a seas_id that is present and unique (the
+    # shooting frames fill a missing seas_id with 0)
+    seas_id = pd.Series(seas_id)
+    return (seas_id.notna() & ~seas_id.duplicated(keep=False)).to_numpy()
+
+
+def match_rows(old_seas_id, new_seas_id):
+    # Position of each new row in the old artifact, -1 if new (or unkeyed)
+    old_valid = np.flatnonzero(keyed_rows(old_seas_id))
+    new_valid = keyed_rows(new_seas_id)
+    hit = pd.Index(old_seas_id[old_valid]).get_indexer(new_seas_id[new_valid])
+    old_pos = np.full(len(new_seas_id), -1, dtype=np.int64)
+    old_pos[new_valid] = np.where(hit >= 0, old_valid[hit], -1)
+    return old_pos
+
+
+def _normalize(features):
+    norms = np.linalg.norm(features, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return features / norms
+
+
+def _fit_stats(col_sum, col_sumsq, count):
+    # mean/scale as StandardScaler computes them, from running column sums
+    mean = col_sum / count
+    var = np.maximum(col_sumsq / count - mean ** 2, 0.0)
+    scale = np.sqrt(var)
+    scale[var <= count * np.finfo(np.float64).eps * mean ** 2] = 1.0  # constant columns
+    return mean, scale
+
+
+class FeatureArtifact:
+    def __init__(self, path, meta, arrays):
+        self.path = path
+        self.meta = meta
+        self.columns = meta["columns"]
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def load(cls, path):
+        # Every file from the same version, even if a new one is published meanwhile
+        def read(version):
+            meta = json.loads((version / "meta.json").read_text())
+            return cls(path, meta, {name: np.load(version / f"{name}.npy", mmap_mode="r") for name in ARRAYS})
+
+        return read_version(path, read)
+
+    def transform(self, rows):
+        # Raw stat rows (in column order) -> weighted feature space of this artifact
+        rows = np.asarray(rows, dtype=np.float64)
+        return ((rows - self.mean) / self.scale * self.weights).astype(np.float32)
+
+
+def _write_artifact(path, arrays, meta):
+    def write(version):
+        for name, array in arrays.items():
+            np.save(version / f"{name}.npy", array)
+        (version / "meta.json").write_text(json.dumps(meta))
+
+    publish_dir(path, write)
+    return FeatureArtifact.load(path)
+
+
+@timed("features.build")
+def build_artifact(path, key, df, numeric_cols, weights_by_stat):
+    from sklearn.preprocessing import StandardScaler  # only needed on a rebuild
+
+    values = df[numeric_cols].to_numpy(dtype=np.float64)
+    scaler = StandardScaler()
+    features = scaler.fit_transform(values)
+    weights = weight_vector(numeric_cols, weights_by_stat)
+    features = (features * weights).astype(np.float32)
+
+    arrays = {
+        "mean": scaler.mean_,
+        "scale": scaler.scale_,
+        "weights": weights,
+        "seas_id": df["seas_id"].to_numpy(dtype=np.float64),
+        "features": features,
+        "vectors": _normalize(features),
+        "row_hash": row_hashes(df, numeric_cols),
+        "col_sum": values.sum(axis=0),
+        "col_sumsq": (values ** 2).sum(axis=0),
+    }
+    meta = {
+        "version": ARTIFACT_VERSION, "key": key,
+        "schema_key": schema_key(numeric_cols, weights_by_stat),
+        "columns": list(numeric_cols), "rows": len(df),
+        "fit_id": uuid.uuid4().hex, "refit": "full", "generation": 0, "changes": [],
+    }
+    return _write_artifact(path, arrays, meta)
+
+
+@timed("features.update")
+def update_artifact(artifact, key, df, numeric_cols, refit="frozen"):
+    # Patch an artifact with the same schema to match df; see the header comment
+    values = df[numeric_cols].to_numpy(dtype=np.float64)
+    seas_id = df["seas_id"].to_numpy(dtype=np.float64)
+    hashes = row_hashes(df, numeric_cols)
+
+    old_pos = match_rows(artifact.seas_id, seas_id)
+    matched = old_pos >= 0
+    kept = matched.copy()
+    kept[matched] = artifact.row_hash[old_pos[matched]] == hashes[matched]
+    fresh = ~kept
+
+    # Column sums of today's raw values (the whole frame is in hand), so the
+    # streaming fit is exact: nothing is recovered from the weighted float32
+    # features, which would drift every generation and break on weight-0 stats
+    weights = np.asarray(artifact.weights)
+    col_sum = values.sum(axis=0)
+    col_sumsq = (values ** 2).sum(axis=0)
+    streamed_mean, streamed_scale = _fit_stats(col_sum, col_sumsq, len(df))
+
+    meta = dict(artifact.meta, key=key, rows=len(df), refit=refit)
+    if refit == "streaming":
+        mean, scale = streamed_mean, streamed_scale
+        features = ((values - mean) / scale * weights).astype(np.float32)
+        vectors = _normalize(features)
+        meta.update(fit_id=uuid.uuid4().hex, generation=0, changes=[])
+    else:
+        mean, scale = np.asarray(artifact.mean), np.asarray(artifact.scale)
+        features = np.empty((len(df), len(numeric_cols)), dtype=np.float32)
+        vectors = np.empty_like(features)
+        features[kept] = artifact.features[old_pos[kept]]
+        vectors[kept] = artifact.vectors[old_pos[kept]]
+        features[fresh] = ((values[fresh] - mean) / scale * weights).astype(np.float32)
+        vectors[fresh] = _normalize(features[fresh])
+
+        old_ids = artifact.seas_id[keyed_rows(artifact.seas_id)]
+        new_ids = seas_id[keyed_rows(seas_id)]
+        generation = artifact.meta["generation"] + 1
+        meta.update(generation=generation, changes=artifact.meta["changes"][-(MAX_CHANGES - 1):] + [{
+            "generation": generation,
+            "added": new_ids[~np.isin(new_ids, old_ids)].astype(int).tolist(),
+            "changed": seas_id[matched & ~kept].astype(int).tolist(),
+            "removed": old_ids[~np.isin(old_ids, new_ids)].astype(int).tolist(),
+            # How far the frozen fit is from a refit on today's data, in frozen-scale units
+            "mean_drift": float(np.max(np.abs(streamed_mean - mean) / scale)),
+            "scale_drift": float(np.max(np.abs(np.log(streamed_scale / scale)))),
+        }])
+
+    arrays = {
+        "mean": mean, "scale": scale, "weights": weights, "seas_id": seas_id,
+        "features": features, "vectors": vectors, "row_hash": hashes,
+        "col_sum": col_sum, "col_sumsq": col_sumsq,
+    }
+    return _write_artifact(artifact.path, arrays, meta)
+
+
+@timed("features.load")
+def load_feature_artifact(name, df, numeric_cols, weights_by_stat, sources, refit=None):
+    # Cached artifact for this feature set, updated or rebuilt when stale
+    refit = refit or os.environ.get("NBA_COMPS_REFIT", "frozen")
+    if refit not in REFIT_MODES:
+        raise ValueError(f"refit must be one of {REFIT_MODES}, got {refit!r}")
+
+    path = FEATURE_DIR / name
+    key = artifact_key(numeric_cols, weights_by_stat, sources)
+    artifact = None
+    if (path / "meta.json").exists():
+        try:
+            artifact = FeatureArtifact.load(path)
+        except (OSError, ValueError, KeyError):
+            pass
+    if artifact is not None and artifact.meta.get("version") == ARTIFACT_VERSION:
+        if (artifact.meta["key"] == key
+                and np.array_equal(artifact.seas_id, df["seas_id"].to_numpy(dtype=np.float64), equal_nan=True)):
+            return artifact
+        if refit != "full" and artifact.meta["schema_key"] == schema_key(numeric_cols, weights_by_stat):
+            return update_artifact(artifact, key, df, numeric_cols, refit=refit)
+    return build_artifact(path, key, df, numeric_cols, weights_by_stat)
+
+
+def main():
+    # Build step: importing each comps module loads or rebuilds its artifact
+    from shared.apps import load_app_module
+
+    for app in ["PlayerComps", "PlayerComps_with_Shooting"]:
+        comps, seconds = load_app_module(app)
+        artifact = comps.artifact
+        print(f"{app}: {artifact.path} ({artifact.features.shape[0]} x {artifact.features.shape[1]}, "
+              f"key {artifact.meta['key'][:12]}) in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
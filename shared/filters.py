@@ -0,0 +1,91 @@
+# Candidate pre-filters for similarity search: season window, position,
+# league, minimum minutes/games and style archetype (shared.archetypes). Rows
+# are kept in a season-sorted order so a season window is a searchsorted
+# slice, and every other filter (precomputed boolean masks, column compares)
+# only looks at the rows that survive it. A filtered query then scores just
+# the candidate rows, so its cost falls with the filter's selectivity while
+# the result stays exact.
+import numpy as np
+
+
+def _first_col(df, names):
+    for name in names:
+        if name in df:
+            return df[name].to_numpy()
+    return None
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.n_rows = len(df)
+        season = df["season"].to_numpy()
+        self._by_season = np.argsort(season, kind="stable")
+        self._sorted_seasons = season[self._by_season]
+
+        # Boolean masks per position token and league; hybrid positions
+        # ("SF-PF") count for each listed position
+        pos = df["pos"].astype(str).to_numpy()
+        self._pos_masks = {}
+        for value in np.unique(pos):
+            for token in value.split("-"):
+                mask = self._pos_masks.setdefault(token, np.zeros(len(df), dtype=bool))
+                mask |= pos == value
+        lg = df["lg"].astype(str).to_numpy()
+        self._lg_masks = {value: lg == value for value in np.unique(lg)}
+
+        # The shooting merge leaves g/mp as g_x/mp_x (Per 100 Poss side)
+        self.mp = _first_col(df, ["mp", "mp_x"])
+        self.g = _first_col(df, ["g", "g_x"])
+        self.archetype = None
+
+    def set_archetypes(self, labels):
+        # Archetype label per row, enabling the archetype filter
+        self.archetype = np.asarray(labels)
+
+    def _any_mask(self, masks, values):
+        values = [values] if isinstance(values, str) else values
+        if len(values) == 1:
+            return masks.get(values[0], np.zeros(self.n_rows, dtype=bool))
+        return np.logical_or.reduce([masks.get(v, np.zeros(self.n_rows, dtype=bool)) for v in values])
+
+    def candidates(self, seasons=None, pos=None, lg=None, min_mp=None, min_g=None, archetype=None):
+        # Row positions passing every given filter, or None when nothing is filtered.
+        # seasons is (first, last) inclusive; either end may be None. archetype
+        # is one label or a list of them.
+        if seasons is None and pos is None and lg is None and min_mp is None and min_g is None and archetype is None:
+            return None
+        if archetype is not None and self.archetype is None:
+            raise ValueError("archetype filter needs set_archetypes() first")
+
+        if seasons is None:
+            # No season window: combine whole-table masks, already in row order
+            mask = np.ones(self.n_rows, dtype=bool)
+            if pos is not None:
+                mask &= self._any_mask(self._pos_masks, pos)
+            if lg is not None:
+                mask &= self._any_mask(self._lg_masks, lg)
+            if min_mp is not None:
+                mask &= self.mp >= min_mp
+            if min_g is not None:
+                mask &= self.g >= min_g
+            if archetype is not None:
+                mask &= np.isin(self.archetype, archetype)
+            return np.flatnonzero(mask)
+
+        # Season window first (a contiguous slice of the season-sorted order),
+        # then the remaining filters only on the rows inside it
+        first, last = seasons
+        lo = 0 if first is None else np.searchsorted(self._sorted_seasons, first, side="left")
+        hi = len(self._sorted_seasons) if last is None else np.searchsorted(self._sorted_seasons, last, side="right")
+        rows = self._by_season[lo:hi]
+        if pos is not None:
+            rows = rows[self._any_mask(self._pos_masks, pos)[rows]]
+        if lg is not None:
+            rows = rows[self._any_mask(self._lg_masks, lg)[rows]]
+        if min_mp is not None:
+            rows = rows[self.mp[rows] >= min_mp]
+        if min_g is not None:
+            rows = rows[self.g[rows] >= min_g]
+        if archetype is not None:
+            rows = rows[np.isin(self.archetype[rows], archetype)]
+        return np.sort(rows)
@@ -0,0 +1,125 @@
+# Precomputed honors: award placements ranked once per (season, award) and a
+# per player-season summary (All-Star, end-of-season teams, award finishes,
+# Hall of Fame), so rendering a player's honors is a single dict lookup.
+#
+# The award and team tables carry player_ids from a different snapshot than
+# the stat tables, so every honors row is matched to a Player Career Info
+# player_id by name and season instead.
+import pandas as pd
+
+from shared.instrument import timed
+
+
+def award_ranks(award_shares_df):
+    # 1-based placement by points won within each (season, award); ties share a place
+    return (
+        award_shares_df["pts_won"].fillna(0)
+        .groupby([award_shares_df["season"], award_shares_df["award"]], observed=True)
+        .rank(method="min", ascending=False)
+        .astype("int16")
+    )
+
+
+def resolve_player_ids(df, career_info_df):
+    # Career player_id per row of df, matched on name with the season inside the career span
+    rows = df[["player", "season"]].reset_index(drop=True).reset_index(names="row")
+    careers = career_info_df[["player", "player_id", "first_seas", "last_seas"]].copy()
+    careers["player"] = careers["player"].astype(str)
+    rows["player"] = rows["player"].astype(str)
+
+    cand = rows.merge(careers, on="player", how="left")
+    cand["in_span"] = cand["season"].between(cand["first_seas"], cand["last_seas"])
+    cand = cand.sort_values(["row", "in_span"], ascending=[True, False], kind="stable")
+    ids = cand.drop_duplicates("row").set_index("row")["player_id"]
+    return pd.Series(ids.to_numpy(), index=df.index)
+
+
+def _is_true(value):
+    return value is True or value == "TRUE"
+
+
+class HonorsTable:
+    @timed("honors.build")
+    def __init__(self, all_star_df, eos_teams_df, award_shares_df, career_info_df):
+        summaries = {}
+
+        def entry(player_id, season):
+            key = (int(player_id), int(season))
+            if key not in summaries:
+                summaries[key] = {"all_star": False, "teams": [], "awards": []}
+            return summaries[key]
+
+        all_star_ids = resolve_player_ids(all_star_df, career_info_df)
+        for player_id, season in zip(all_star_ids, all_star_df["season"]):
+            if pd.notna(player_id):
+                entry(player_id, season)["all_star"] = True
+
+        eos_ids = resolve_player_ids(eos_teams_df, career_info_df)
+        for player_id, season, kind, number in zip(
+            eos_ids, eos_teams_df["season"], eos_teams_df["type"], eos_teams_df["number_tm"]
+        ):
+            if pd.notna(player_id):
+                entry(player_id, season)["teams"].append(f"{kind} {number} Team")
+
+        award_ids = resolve_player_ids(award_shares_df, career_info_df)
+        ranks = award_ranks(award_shares_df)
+        for player_id, season, award, rank, share, winner in zip(
+            award_ids, award_shares_df["season"], award_shares_df["award"], ranks,
+            award_shares_df["share"].fillna(0), award_shares_df["winner"]
+        ):
+            if pd.notna(player_id):
+                entry(player_id, season)["awards"].append({
+                    "award": award, "rank": int(rank), "share": float(share), "winner": _is_true(winner),
+                })
+
+        self.hof_ids = set(career_info_df.loc[career_info_df["hof"].map(_is_true), "player_id"])
+        self._summaries = summaries
+
+        # Name + season -> career player_id, for callers that only have a name
+        self._name_to_ids = {}
+        for player_id, player, first, last in zip(
+            career_info_df["player_id"], career_info_df["player"],
+            career_info_df["first_seas"], career_info_df["last_seas"]
+        ):
+            self._name_to_ids.setdefault(str(player).lower(), []).append((player_id, first, last))
+
+    def player_id(self, player, season):
+        careers = self._name_to_ids.get(str(player).lower(), [])
+        for player_id, first, last in careers:
+            if first <= season <= last:
+                return int(player_id)
+        return int(careers[0][0]) if careers else None
+
+    def get(self, player_id, season):
+        summary = self._summaries.get((int(player_id), int(season)), {})
+        return {
+            "player_id": int(player_id),
+            "season": int(season),
+            "all_star": summary.get("all_star", False),
+            "teams": summary.get("teams", []),
+            "awards": summary.get("awards", []),
+            "hof": int(player_id) in self.hof_ids,
+        }
+
+    def lookup(self, player, season):
+        player_id = self.player_id(player, season)
+        if player_id is None:
+            return {"player_id": None, "season": int(season), "all_star": False,
+                    "teams": [], "awards": [], "hof": False}
+        return self.get(player_id, season)
+
+    def bulk(self, keys):
+        # keys: iterable of (player_id, season); one row per key
+        return pd.DataFrame([self.get(player_id, season) for player_id, season in keys])
+
+
+_last_table = None
+
+
+def honors_table(all_star_df, eos_teams_df, award_shares_df, career_info_df):
+    # Built once for a given set of (st.cache_resource-shared) frames
+    global _last_table
+    key = tuple(id(df) for df in (all_star_df, eos_teams_df, award_shares_df, career_info_df))
+    if _last_table is None or _last_table[0] != key:
+        _last_table = (key, HonorsTable(all_star_df, eos_teams_df, award_shares_df, career_info_df))
+    return _last_table[1]
@@ -0,0 +1,168 @@
+# Daily refresh: bring the comps features and everything stored from them up
+# to date without a full rebuild.
+#
+#   python -m shared.ingest --app PlayerComps_with_Shooting [--refit frozen] [--k 10]
+#
+# Loading the app updates its feature artifact incrementally (see
+# shared.features). The stored top-k table from shared.batch_comps is then
+# patched from the artifact's change log: rows that were added or changed, or
+# whose list held one of those rows, are rescored; every other row is only
+# checked against the changed rows. The ANN index is re-bucketed under its
+# saved centroids. What went stale is written to data/cache/ingest/<app>.json.
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from shared.batch_comps import all_top_k, neighbours_table, patch_top_k, read_table, table_meta, write_table
+from shared.features import keyed_rows
+from shared.paths import CACHE_DIR
+
+REPORT_DIR = CACHE_DIR / "ingest"
+ANN_NAMES = {"PlayerComps_with_Shooting": "comps_with_shooting"}
+
+
+def pending_changes(artifact, since_generation):
+    # Union of the artifact's change records newer than since_generation, or
+    # None when the capped change log no longer reaches back that far
+    records = artifact.meta["changes"]
+    if records and records[0]["generation"] > since_generation + 1:
+        return None
+    added, changed, removed = set(), set(), set()
+    for record in records:
+        if record["generation"] > since_generation:
+            added.update(record["added"])
+            changed.update(record["changed"])
+            removed.update(record["removed"])
+    return {"added": sorted(added), "changed": sorted(changed - added), "removed": sorted(removed)}
+
+
+def table_to_lists(table, seas_id, k):
+    # Long top-k table -> N x k row positions in the current row order (-1 = unusable)
+    valid = np.flatnonzero(keyed_rows(seas_id))
+    position = pd.Index(seas_id[valid].astype(np.int64))
+
+    def to_rows(ids):
+        hit = position.get_indexer(ids)
+        return np.where(hit >= 0, valid[hit], -1)
+
+    old_ids = table["seas_id"].to_numpy()[::k]
+    old_neighbours = to_rows(table["neighbour_seas_id"].to_numpy()).reshape(-1, k)
+    old_scores = table["score"].to_numpy().reshape(-1, k)
+
+    neighbours = np.full((len(seas_id), k), -1, dtype=np.int32)
+    scores = np.full((len(seas_id), k), -np.inf, dtype=np.float32)
+    rows = to_rows(old_ids)
+    found = keyed_rows(old_ids) & (old_ids >= 0) & (rows >= 0)
+    neighbours[rows[found]] = old_neighbours[found]
+    scores[rows[found]] = old_scores[found]
+    return neighbours, scores
+
+
+def update_neighbours(comps, path, k):
+    artifact, vectors = comps.artifact, comps.artifact.vectors
+    seas_id = comps.df["seas_id"].to_numpy(dtype=np.float64)
+    meta = table_meta(artifact, k)
+    table, old_meta = read_table(path) if path.exists() else (None, None)
+
+    changes = None
+    if old_meta is not None and old_meta["fit_id"] == meta["fit_id"] and old_meta["k"] == k:
+        if old_meta["generation"] == meta["generation"]:
+            return {"mode": "current", "stale_seas_ids": []}
+        changes = pending_changes(artifact, old_meta["generation"])
+    if changes is None:
+        neighbours, scores = all_top_k(vectors, k=k)
+        write_table(neighbours_table(seas_id, neighbours, scores), path, meta=meta)
+        return {"mode": "rebuilt", "stale_seas_ids": "all"}
+
+    touched = np.isin(seas_id, changes["added"] + changes["changed"]) | ~keyed_rows(seas_id)
+    neighbours, scores = table_to_lists(table, seas_id, k)
+    neighbours, scores, recomputed, patched = patch_top_k(vectors, neighbours, scores, np.flatnonzero(touched))
+    write_table(neighbours_table(seas_id, neighbours, scores), path, meta=meta)
+
+    stale = np.concatenate([recomputed, patched])
+    stale_ids = seas_id[stale[keyed_rows(seas_id)[stale]]]
+    return {
+        "mode": "patched",
+        "changes": changes,
+        "recomputed": len(recomputed),
+        "patched": len(patched),
+        "stale_seas_ids": sorted(stale_ids.astype(int).tolist()),
+    }
+
+
+def stale_charts(df, seas_ids, chart_dir=CACHE_DIR / "charts"):
+    # Batch-rendered chart files (shared.charts) for the given player-seasons
+    rows = df[df["seas_id"].isin(seas_ids)]
+    paths = []
+    for player_id, season, tm in zip(rows["player_id"], rows["season"], rows["tm"]):
+        season_dir = chart_dir / str(int(season))
+        if season_dir.exists():
+            paths += [str(p) for p in season_dir.glob(f"{int(player_id)}_*_{tm}.*")]
+    return paths
+
+
+def ingest(app, k=10):
+    from shared.ann import refresh_index
+    from shared.apps import load_app_module
+
+    start = time.perf_counter()
+    comps, _ = load_app_module(app)
+    artifact = comps.artifact
+    report = {
+        "app": app,
+        "refit": artifact.meta["refit"],
+        "fit_id": artifact.meta["fit_id"],
+        "generation": artifact.meta["generation"],
+        "latest_change": artifact.meta["changes"][-1] if artifact.meta["changes"] else None,
+    }
+
+    path = CACHE_DIR / f"{app}_top{k}.parquet"
+    report["neighbours"] = dict(path=str(path), **update_neighbours(comps, path, k))
+    changes = report["neighbours"].pop("changes", {"added": [], "changed": [], "removed": []})
+
+    if app in ANN_NAMES:
+        index = refresh_index(ANN_NAMES[app], artifact.vectors)
+        report["ann_index"] = "absent" if index is None else "current"
+
+    report["changes"] = changes
+    report["stale_charts"] = stale_charts(comps.df, changes["added"] + changes["changed"])
+    report["seconds"] = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting",
+                        choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--refit", default="frozen", choices=["frozen", "streaming", "full"])
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["NBA_COMPS_REFIT"] = args.refit
+    report = ingest(args.app, k=args.k)
+
+    REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    out = REPORT_DIR / f"{args.app}.json"
+    out.write_text(json.dumps(report, indent=2))
+
+    changes, latest = report["changes"], report["latest_change"]
+    print(f"features since last ingest: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed")
+    if latest:
+        print(f"frozen fit drift: mean {latest['mean_drift']:.3f} sd, scale {latest['scale_drift']:.3f} log-ratio")
+    neighbours = report["neighbours"]
+    stale = neighbours["stale_seas_ids"]
+    print(f"neighbour lists: {neighbours['mode']}, {stale if stale == 'all' else len(stale)} stale")
+    if "ann_index" in report:
+        print(f"ann index: {report['ann_index']}")
+    print(f"stale charts: {len(report['stale_charts'])}")
+    print(f"done in {report['seconds']:.1f}s -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Per-stage instrumentation: wall time, call counts and memory for the named
+# stages of a page (data load, feature build, search, render).
+#
+#   from shared.instrument import stage, timed
+#
+#   @timed("comps.find_similar_players")
+#   def find_similar_players(...): ...
+#
+#   with stage("comps.merge"):
+#       df = df_main.merge(...)
+#
+# Every stage records into one process-wide registry. Memory is the growth
+# in peak RSS during the call; when tracemalloc is tracing (NBA_TRACEMALLOC=1
+# or tracemalloc.start()), the peak Python allocation is recorded as well
+# (an upper bound for nested stages, which cannot reset their parent's peak).
+# The tracemalloc peak is process-wide, so it is only reset and recorded for
+# a stage that ran with no other top-level stage active in another thread;
+# overlapping calls (e.g. concurrent Streamlit sessions) record no alloc peak.
+#
+#   registry.snapshot()       {stage: {calls, total_s, mean_ms, max_s, ...}}
+#   registry.dump(path)       the same as JSON, e.g. for dashboards
+#   debug_panel()             Streamlit expander (shown with ?debug=1 or NBA_DEBUG=1)
+#
+# NBA_INSTRUMENT_JSON=<path> dumps the registry to <path> at exit.
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows; RSS is then not recorded
+    resource = None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / 2 ** 20  # bytes on macOS
+    return peak / 1024  # KB on Linux
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._local = threading.local()
+        self._active = 0  # top-level stages running, across threads
+        self._overlaps = 0  # bumped whenever a top-level stage starts while another runs
+
+    def record(self, name, seconds, rss_growth_mb, alloc_peak_mb=None, error=False):
+        with self._lock:
+            s = self._stats.setdefault(name, {
+                "calls": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0, "last_s": 0.0,
+                "rss_growth_mb": 0.0, "alloc_peak_mb": None,
+            })
+            s["calls"] += 1
+            s["errors"] += int(error)
+            s["total_s"] += seconds
+            s["max_s"] = max(s["max_s"], seconds)
+            s["last_s"] = seconds
+            s["rss_growth_mb"] += rss_growth_mb
+            if alloc_peak_mb is not None:
+                s["alloc_peak_mb"] = max(s["alloc_peak_mb"] or 0.0, alloc_peak_mb)
+
+    @contextmanager
+    def stage(self, name):
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0:
+            with self._lock:
+                self._active += 1
+                if self._active > 1:
+                    self._overlaps += 1
+                # The peak is only ours if no other thread is inside a stage
+                self._local.alone = self._active == 1
+                self._local.overlaps = self._overlaps
+        tracing = tracemalloc.is_tracing() and self._local.alone
+        if tracing:
+            before, _ = tracemalloc.get_traced_memory()
+            if depth == 0:  # nested stages must not reset their parent's peak
+                tracemalloc.reset_peak()
+        rss = _peak_rss_mb()
+        self._local.depth = depth + 1
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self._local.depth = depth
+            alloc_peak = None
+            with self._lock:
+                alone = self._overlaps == self._local.overlaps
+                if depth == 0:
+                    self._active -= 1
+            if tracing and alone:
+                alloc_peak = max(tracemalloc.get_traced_memory()[1] - before, 0) / 2 ** 20
+            self.record(name, seconds, _peak_rss_mb() - rss, alloc_peak, error)
+
+    def snapshot(self):
+        with self._lock:
+            out = {}
+            for name, s in self._stats.items():
+                out[name] = dict(s, mean_ms=s["total_s"] / s["calls"] * 1000)
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump({"pid": os.getpid(), "time": time.time(), "stages": self.snapshot()}, f, indent=2)
+
+
+registry = Registry()
+stage = registry.stage
+
+
+def timed(name):
+    # Decorator form of stage()
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with registry.stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def debug_enabled():
+    if os.environ.get("NBA_DEBUG"):
+        return True
+    try:
+        import streamlit as st
+        return st.query_params.get("debug") == "1"
+    except Exception:
+        return False
+
+
+def debug_panel():
+    # Collapsible table of every stage recorded in this process so far
+    import pandas as pd
+    import streamlit as st
+
+    stats = registry.snapshot()
+    with st.expander("Debug: stage timings", expanded=False):
+        if not stats:
+            st.write("No stages recorded yet.")
+            return
+        table = pd.DataFrame.from_dict(stats, orient="index").sort_values("total_s", ascending=False)
+        st.dataframe(table[["calls", "errors", "total_s", "mean_ms", "max_s", "last_s", "rss_growth_mb", "alloc_peak_mb"]])
+        st.download_button("Download JSON", json.dumps(stats, indent=2), file_name="stages.json")
+
+
+if os.environ.get("NBA_TRACEMALLOC") and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+if os.environ.get("NBA_INSTRUMENT_JSON"):
+    atexit.register(registry.dump, os.environ["NBA_INSTRUMENT_JSON"])
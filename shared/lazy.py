@@ -0,0 +1,34 @@
+# Build-once values for expensive module-level state. Importing a module that
+# holds a Lazy costs nothing; the first get() builds the value under a lock,
+# so concurrent first requests (Streamlit sessions, server threads) build it
+# exactly once.
+import functools
+import threading
+
+
+class Lazy:
+    def __init__(self, build):
+        self._build = build
+        self._lock = threading.Lock()
+        self._value = None
+        self.built = False
+
+    def get(self):
+        if not self.built:
+            with self._lock:
+                if not self.built:
+                    self._value = self._build()
+                    self.built = True
+        return self._value
+
+
+def once(func):
+    # Decorator for zero-argument loaders: the result is built on first call and shared
+    lazy = Lazy(func)
+
+    @functools.wraps(func)
+    def wrapper():
+        return lazy.get()
+
+    wrapper.lazy = lazy
+    return wrapper
@@ -0,0 +1,142 @@
+# Leaderboards over the stat tables from presorted per-season column indexes.
+#
+#   python -m shared.leaderboards x3pa_per_100_poss [--view per_100] [--seasons 2015-2025]
+#                                 [--min-g 50] [--min-mp 0] [--top-n 25] [--ascending]
+#
+# For each stat, the rows of every season are sorted once (stat descending,
+# NaNs dropped) into one CSR array: order[offsets[i]:offsets[i + 1]] is
+# season seasons[i], best first. A query then walks only the seasons it
+# covers from the top, skips rows that fail the qualifiers (a boolean mask,
+# no re-sort), and heap-merges the per-season streams until it has top_n.
+# A season's scan usually stops after top_n rows, so a multi-season
+# leaderboard touches roughly top_n rows per season instead of the frame.
+#
+# Each stat's index is built on its first query and kept with the frame
+# (see leaderboard()). As in shared.rankings, traded players compete on
+# their TOT line only.
+import argparse
+import heapq
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from shared.lookup import cached_per_frame
+from shared.rankings import VIEWS, minutes_played, ranked_rows, stat_columns
+
+TABLES = dict(VIEWS, shooting="Player Shooting")
+OUTPUT_COLS = ["player", "season", "tm", "g"]
+_SCAN = 64  # rows read per step of a season stream
+
+
+class Leaderboard:
+    def __init__(self, df):
+        self.df = df
+        self.columns = stat_columns(df)
+        self.season = df["season"].to_numpy()
+        self.seasons = np.unique(self.season)
+        self.player_rows = ranked_rows(df)
+        self._minutes = None
+        self._index = {}
+
+    def index(self, stat):
+        # (order, offsets) for stat; built on first use
+        if stat not in self._index:
+            if stat not in self.columns:
+                raise KeyError(f"unknown stat {stat!r}")
+            values = self.df[stat].to_numpy(dtype=np.float64)
+            order = np.lexsort((-values, self.season))  # NaN sorts last within a season
+            order = order[~np.isnan(values[order])].astype(np.int32)
+            offsets = np.searchsorted(self.season[order], self.seasons, side="left")
+            self._index[stat] = (order, np.append(offsets, len(order)))
+        return self._index[stat]
+
+    def mask(self, min_g=None, min_mp=None, lg=None, pos=None, where=None):
+        # Rows allowed on the board; where is an optional extra boolean mask
+        allowed = self.player_rows.copy()
+        if min_g:
+            allowed &= self.df["g"].to_numpy(dtype=np.float64) >= min_g
+        if min_mp:
+            if self._minutes is None:
+                self._minutes = minutes_played(self.df)
+            allowed &= self._minutes >= min_mp
+        if lg:
+            allowed &= (self.df["lg"].astype(str) == lg).to_numpy()
+        if pos:
+            allowed &= (self.df["pos"].astype(str) == pos).to_numpy()
+        if where is not None:
+            allowed &= np.asarray(where, dtype=bool)
+        return allowed
+
+    def _stream(self, season, segment, values, allowed, sign):
+        # (value key, season, n, row) of one season in board order, qualifiers
+        # applied; ties across seasons go to the earlier season
+        n = 0
+        for start in range(0, len(segment), _SCAN):
+            rows = segment[start:start + _SCAN]
+            rows = rows[allowed[rows]]
+            for row, value in zip(rows.tolist(), values[rows].tolist()):
+                yield sign * value, season, n, row
+                n += 1
+
+    def top(self, stat, top_n=25, seasons=None, ascending=False, **filters):
+        # Frame positions and values of the best top_n player-seasons
+        order, offsets = self.index(stat)
+        values = self.df[stat].to_numpy(dtype=np.float64)
+        allowed = self.mask(**filters)
+
+        first, last = 0, len(self.seasons)
+        if seasons is not None:
+            first = np.searchsorted(self.seasons, seasons[0], side="left")
+            last = np.searchsorted(self.seasons, seasons[1], side="right")
+        streams = []
+        for i in range(first, last):
+            segment = order[offsets[i]:offsets[i + 1]]
+            if ascending:
+                segment = segment[::-1]
+            streams.append(self._stream(i, segment, values, allowed, 1 if ascending else -1))
+
+        best = list(itertools.islice(heapq.merge(*streams), top_n))
+        rows = np.array([item[-1] for item in best], dtype=np.intp)
+        return rows, values[rows]
+
+    def board(self, stat, top_n=25, seasons=None, ascending=False, **filters):
+        rows, values = self.top(stat, top_n, seasons, ascending, **filters)
+        out = self.df.iloc[rows][[col for col in OUTPUT_COLS if col in self.df]].reset_index(drop=True)
+        out[stat] = values
+        out.insert(0, "rank", np.arange(1, len(out) + 1))
+        return out
+
+
+def leaderboard(df):
+    # One Leaderboard per live frame, so its sorted indexes are reused
+    return cached_per_frame(df, "leaderboard", lambda: Leaderboard(df))
+
+
+def _parse_seasons(value):
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+def main():
+    from shared.data_store import load_table
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("stat")
+    parser.add_argument("--view", choices=sorted(TABLES), default="per_100")
+    parser.add_argument("--seasons", type=_parse_seasons, default=None, help="e.g. 2015-2025")
+    parser.add_argument("--min-g", type=float, default=None)
+    parser.add_argument("--min-mp", type=float, default=None)
+    parser.add_argument("--top-n", type=int, default=25)
+    parser.add_argument("--ascending", action="store_true")
+    args = parser.parse_args()
+
+    board = leaderboard(load_table(TABLES[args.view])).board(
+        args.stat, args.top_n, args.seasons, args.ascending, min_g=args.min_g, min_mp=args.min_mp,
+    )
+    with pd.option_context("display.width", 200):
+        print(board.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# Hash indexes from key values to row positions, built once per frame so a
+# lookup is a dict hit instead of a full-frame boolean mask.
+#
+# Indexes hold positions only (never the frame itself) and are cached per
+# frame object, so apps should load shared frames with st.cache_resource
+# (same object every rerun) rather than st.cache_data (a fresh copy).
+import weakref
+
+import numpy as np
+
+EMPTY = np.empty(0, dtype=np.intp)
+
+
+class RowIndex:
+    def __init__(self, df, cols, lower=False):
+        self.cols = tuple(cols)
+        self.lower = lower
+
+        valid = df[list(self.cols)].notna().all(axis=1).to_numpy()
+        columns = [self._normalize_col(df[col]).tolist() for col in self.cols]
+        self._positions = {}
+        for pos, key in enumerate(zip(*columns)):
+            if valid[pos]:
+                self._positions.setdefault(key, []).append(pos)
+
+    def _normalize_col(self, values):
+        if self.lower:
+            return values.astype(str).str.lower()
+        return values
+
+    def _normalize_key(self, key):
+        if self.lower:
+            return tuple(k.lower() if isinstance(k, str) else k for k in key)
+        return key
+
+    def positions(self, *key):
+        pos = self._positions.get(self._normalize_key(key))
+        return EMPTY if pos is None else np.array(pos, dtype=np.intp)
+
+    def __contains__(self, key):
+        key = key if isinstance(key, tuple) else (key,)
+        return self._normalize_key(key) in self._positions
+
+    def rows(self, df, *key):
+        return df.iloc[self.positions(*key)]
+
+
+# (player, season) index with explicit handling of traded players: they have
+# one row per team plus a "TOT" row with the combined season line. key picks
+# the player column: "player" (name) or "player_id".
+class PlayerSeasonIndex(RowIndex):
+    def __init__(self, df, lower=False, key="player"):
+        super().__init__(df, (key, "season"), lower=lower)
+        self._tm = np.array(df["tm"].tolist(), dtype=object) if "tm" in df else None
+
+    def position(self, player, season, tm=None):
+        # Single row for the player-season: the given team's row, otherwise
+        # the TOT row for traded players, otherwise the only row. None if absent.
+        pos = self.positions(player, season)
+        if len(pos) == 0:
+            return None
+        if self._tm is None or (len(pos) == 1 and tm is None):
+            return pos[0]
+
+        teams = self._tm[pos]
+        wanted = tm if tm is not None else "TOT"
+        match = pos[teams == wanted]
+        if len(match):
+            return match[0]
+        return None if tm is not None else pos[0]
+
+    def row(self, df, player, season, tm=None):
+        pos = self.position(player, season, tm)
+        return None if pos is None else df.iloc[pos]
+
+
+_frame_cache = {}
+
+
+def cached_per_frame(df, key, build):
+    # One build() result per live frame (and key); dropped when the frame is collected
+    cache_key = (id(df), key)
+    hit = _frame_cache.get(cache_key)
+    if hit is None or hit[0] != len(df):
+        if hit is None:
+            weakref.finalize(df, _frame_cache.pop, cache_key, None)
+        hit = (len(df), build())
+        _frame_cache[cache_key] = hit
+    return hit[1]
+
+
+def player_season_index(df, lower=False, key="player"):
+    return cached_per_frame(df, ("player_season", lower, key), lambda: PlayerSeasonIndex(df, lower=lower, key=key))
+
+
+def row_index(df, cols, lower=False):
+    cols = tuple(cols)
+    return cached_per_frame(df, (cols, lower), lambda: RowIndex(df, cols, lower=lower))
@@ -0,0 +1,196 @@
+# Player-name search for the selectors: accent-folded prefix matching for
+# typeahead plus trigram fuzzy matching for misspellings, over the players in
+# Player Career Info and the stat tables. Results are player_ids, best first
+# (longest career, then most recent), so callers go straight to player_id
+# lookups (position() finds a player-season row in any stat frame). A few
+# stat-table players have no player_id (and no Career Info row); they get
+# negative ids here and are matched by exact name instead, see key().
+#
+#   python -m shared.name_search "jok"         # prefix
+#   python -m shared.name_search "giannis ante"
+#   python -m shared.name_search "dwayne wade" # fuzzy
+#
+# Names are folded once ("Dražen Petrović" -> "drazen petrovic",
+# "Shaquille O'Neal" -> "shaquille oneal"). The prefix index is a trie
+# flattened into a sorted array of name tokens: every trie node is a
+# contiguous range, found with two bisects. Player numbers are assigned in
+# rank order, so the players under a node come out ranked by np.unique.
+# Every query token must prefix-match a token of the name, in any order.
+import argparse
+import bisect
+import re
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+from shared.lazy import once
+from shared.lookup import player_season_index
+
+# Letters NFKD does not decompose
+_FOLD = str.maketrans({"ð": "d", "đ": "d", "ø": "o", "ł": "l", "æ": "ae", "œ": "oe", "ß": "ss", "þ": "th"})
+_DROP = re.compile(r"['’.]")
+_SEPARATORS = re.compile(r"[^a-z0-9]+")
+_END = "￿"
+MIN_FUZZY_SCORE = 0.35
+
+
+def fold(name):
+    name = unicodedata.normalize("NFKD", str(name).lower().translate(_FOLD))
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return _SEPARATORS.sub(" ", _DROP.sub("", name)).strip()
+
+
+def trigrams(folded):
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def stat_players(stat_rows, known_ids):
+    # Career-Info-like rows for stat-table players missing from Career Info;
+    # players without a player_id get negative ids, one per name
+    rows = stat_rows[["player_id", "player", "season"]].copy()
+    rows["player"] = rows["player"].astype(str)
+    rows = rows[~rows["player_id"].isin(known_ids)]
+    missing = rows["player_id"].isna()
+    names = sorted(rows.loc[missing, "player"].unique())
+    rows.loc[missing, "player_id"] = rows.loc[missing, "player"].map({n: -(i + 1) for i, n in enumerate(names)})
+    return rows.groupby(["player_id", "player"], as_index=False).agg(
+        first_seas=("season", "min"), last_seas=("season", "max"), num_seasons=("season", "nunique"))
+
+
+class NameIndex:
+    def __init__(self, career_info_df, stat_dfs=()):
+        df = career_info_df[["player_id", "player", "first_seas", "last_seas", "num_seasons"]]
+        if stat_dfs:
+            stat_rows = pd.concat([stat_df[["player_id", "player", "season"]] for stat_df in stat_dfs])
+            df = pd.concat([df, stat_players(stat_rows, df["player_id"])], ignore_index=True)
+        # Rank order: longest career first, then the most recent
+        df = df.sort_values(
+            ["num_seasons", "last_seas", "player_id"], ascending=[False, False, True], kind="stable"
+        ).reset_index(drop=True)
+        self.player_ids = df["player_id"].to_numpy(dtype=np.int64)
+        self.names = df["player"].astype(str).tolist()
+        self.first_seas = df["first_seas"].to_numpy()
+        self.last_seas = df["last_seas"].to_numpy()
+        self._number = {pid: i for i, pid in enumerate(self.player_ids.tolist())}
+        folded = [fold(name) for name in self.names]
+
+        # Flattened trie: sorted (token, player number) pairs
+        pairs = sorted((token, i) for i, name in enumerate(folded) for token in set(name.split()))
+        self._tokens = [token for token, _ in pairs]
+        self._owners = np.array([i for _, i in pairs], dtype=np.int32)
+
+        self._exact = {}
+        for i, name in enumerate(folded):
+            self._exact.setdefault(name, []).append(i)
+
+        postings = {}
+        for i, name in enumerate(folded):
+            for gram in trigrams(name):
+                postings.setdefault(gram, []).append(i)
+        self._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._gram_counts = np.array([len(trigrams(name)) for name in folded], dtype=np.float32)
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    def _prefix_numbers(self, token):
+        lo = bisect.bisect_left(self._tokens, token)
+        hi = bisect.bisect_left(self._tokens, token + _END, lo)
+        return np.unique(self._owners[lo:hi])
+
+    def prefix(self, query, limit=10):
+        tokens = fold(query).split()
+        if not tokens:
+            return []
+        numbers = self._prefix_numbers(tokens[0])
+        for token in tokens[1:]:
+            numbers = np.intersect1d(numbers, self._prefix_numbers(token), assume_unique=True)
+        return self.player_ids[numbers[:limit]].tolist()
+
+    def fuzzy(self, query, limit=10):
+        # Dice similarity of name trigrams; ties keep rank order
+        grams = [self._postings[g] for g in trigrams(fold(query)) if g in self._postings]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self))
+        score = 2 * shared / (len(trigrams(fold(query))) + self._gram_counts)
+        numbers = np.flatnonzero(score >= MIN_FUZZY_SCORE)
+        numbers = numbers[np.argsort(-score[numbers], kind="stable")]
+        return self.player_ids[numbers[:limit]].tolist()
+
+    def search(self, query, limit=10):
+        # Prefix matches first, topped up with fuzzy ones
+        found = self.prefix(query, limit)
+        if len(found) < limit:
+            seen = set(found)
+            found += [pid for pid in self.fuzzy(query, limit) if pid not in seen][:limit - len(found)]
+        return found
+
+    def resolve(self, name, season=None):
+        # player_id for a typed or selected name: exact (folded) match, the
+        # one active in season if several share it; else the best search hit
+        numbers = self._exact.get(fold(name), [])
+        if season is not None:
+            active = [i for i in numbers if self.first_seas[i] <= season <= self.last_seas[i]]
+            numbers = active or numbers
+        if numbers:
+            return int(self.player_ids[numbers[0]])
+        found = self.search(name, limit=1)
+        return found[0] if found else None
+
+    def key(self, player_id):
+        # (column, value) that finds the player's rows in a stat table: their
+        # player_id, or the exact name for players without one
+        if player_id < 0:
+            return "player", self.name(player_id)
+        return "player_id", player_id
+
+    def position(self, df, player_id, season):
+        # Row position of the player's season in a stat frame, or None
+        key_col, key = self.key(player_id)
+        return player_season_index(df, key=key_col).position(key, season)
+
+    def name(self, player_id):
+        return self.names[self._number[player_id]]
+
+    def label(self, player_id):
+        # "Charles Smith (1989-1996)": tells apart players who share a name
+        i = self._number[player_id]
+        return f"{self.names[i]} ({self.first_seas[i]}-{self.last_seas[i]})"
+
+
+@once
+def name_index():
+    from shared.data_store import load_table
+
+    stat_dfs = []
+    for name in ["Player Per Game", "Per 100 Poss", "Player Totals"]:
+        try:
+            stat_dfs.append(load_table(name))
+        except FileNotFoundError:
+            pass
+    return NameIndex(load_table("Player Career Info"), stat_dfs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("query")
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = name_index()
+    build_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    found = index.search(args.query, args.limit)
+    search_us = (time.perf_counter() - start) * 1e6
+    for pid in found:
+        print(f"  {pid:6d}  {index.label(pid)}")
+    print(f"{len(index)} players, built in {build_ms:.0f}ms, search {search_us:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
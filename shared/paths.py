@@ -0,0 +1,10 @@
+import os
+from pathlib import Path
+
+# Absolute paths so the apps work whether they are started from the repo
+# root ("data/...") or from their own folder ("../data/...")
+ROOT_DIR = Path(__file__).resolve().parent.parent
+# NBA_DATA_DIR points every app at another copy of the tables, e.g. the
+# synthetic ones from benchmarks/synthetic.py
+DATA_DIR = Path(os.environ.get("NBA_DATA_DIR", ROOT_DIR / "data"))
+CACHE_DIR = DATA_DIR / "cache"  # derived artifacts (indexes, caches), never committed
@@ -0,0 +1,286 @@
+# Bulk export of player-season profile reports: what the combined player
+# season page shows, as one JSON and one PNG shot chart per player-season.
+#
+#   python -m shared.profile_export [--seasons 2020-2025] [--team LAL] [--player "Jokic"]
+#                                   [--workers 4] [--out data/cache/profiles] [--fresh]
+#
+# A report holds the stat blocks of the per-game, per-100 and totals views
+# (grouped like the page, by category_map_per_game / _per_100 / _totals),
+# honors, the shot profile zones, the top-10 comps and the chart's file name.
+# Items are the player-seasons of the page's comps frame (1997 on), by
+# player_id, so players who share a name are kept apart.
+#
+# The parent loads every table and builds the comps state, shot profile
+# table and lookup indexes once; workers are forked from it and share all of
+# it copy-on-write (the feature vectors are memory-mapped). Items are handed
+# out in shards of --shard-size. Files are written to <out>/<season>/ and
+# every finished item is appended to <out>/manifest.jsonl, so an interrupted
+# run skips what is already done when restarted. Entries from a different
+# feature fit are redone; --fresh ignores the manifest.
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from shared.paths import CACHE_DIR
+
+EXPORT_DIR = CACHE_DIR / "profiles"
+TOP_N = 10
+_VIEWS = [
+    ("per_game", "Player Per Game", "category_map_per_game"),
+    ("per_100", "Per 100 Poss", "category_map_per_100"),
+    ("totals", "Player Totals", "category_map_totals"),
+]
+
+_state = None  # set in the parent before the pool forks
+
+
+def _value(value):
+    # numpy/pandas scalars -> plain JSON values, NaN -> null
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+
+def _id(value):
+    # seas_id / player_id column value -> int, NaN -> null
+    return None if np.isnan(value) else int(value)
+
+
+def _slug(name):
+    return re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")
+
+
+def _write(path, data):
+    # Written under a temporary name first, so a killed worker leaves no half file
+    tmp = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def load_state():
+    from shared.apps import load_app_module
+    from shared.data_store import load_table
+    from shared.honors import honors_table
+    from shared.lookup import player_season_index
+    from shared.shot_profiles import shot_profiles
+
+    page, _ = load_app_module("combined_player_season_page")
+    comps = page.comps.get()
+
+    views = {}
+    for view, table, category_map in _VIEWS:
+        try:
+            df = load_table(table)
+        except FileNotFoundError:
+            print(f"warning: no {table} table, {view} stats are left out")
+            continue
+        views[view] = (df, player_season_index(df, key="player_id"), getattr(page, category_map))
+
+    shooting_df = page.load_shooting_data()
+    league_avg_df = page.load_league_averages()
+    return {
+        "page": page,
+        "comps": comps,
+        "comps_index": player_season_index(comps.df, key="player_id"),
+        "views": views,
+        "honors": honors_table(*page.load_award_data()),
+        "shooting_df": shooting_df,
+        "shooting_index": player_season_index(shooting_df, key="player_id"),
+        "profiles": shot_profiles(shooting_df, league_avg_df),
+        "fit": {"fit_id": comps.artifact.meta["fit_id"], "generation": comps.artifact.meta["generation"]},
+    }
+
+
+def select_items(df, seasons=None, team=None, player_id=None):
+    # Sorted (player_id, season) pairs of the comps frame matching the filters;
+    # the few rows without a player_id cannot be keyed and are left out
+    rows = df[df["player_id"].notna() & (df["player_id"] > 0)]
+    if seasons is not None:
+        rows = rows[(rows["season"] >= seasons[0]) & (rows["season"] <= seasons[1])]
+    if team is not None:
+        rows = rows[rows["tm"].astype(str) == team]
+    if player_id is not None:
+        rows = rows[rows["player_id"] == player_id]
+    pairs = rows[["player_id", "season"]].astype(np.int64).drop_duplicates()
+    return sorted(map(tuple, pairs.to_numpy().tolist()))
+
+
+def build_report(player_id, season):
+    # (report dict, chart PNG bytes or None) for one player-season
+    from shared.charts import figure_bytes, plot_shot_chart
+    from shared.shot_profiles import zones_for_row
+
+    state = _state
+    comps = state["comps"]
+    idx = state["comps_index"].position(player_id, season)
+    row = comps.df.iloc[idx]
+    report = {
+        "player_id": player_id, "season": season, "player": str(row["player"]),
+        "tm": str(row["tm"]), "pos": str(row["pos"]), "seas_id": _id(row["seas_id"]),
+    }
+
+    report["stats"] = {}
+    for view, (df, index, category_map) in state["views"].items():
+        stats = index.row(df, player_id, season)
+        if stats is not None:
+            report["stats"][view] = {
+                category: {stat: _value(value) for stat, value in pairs}
+                for category, pairs in state["page"].group_stats(stats, category_map).items()
+            }
+
+    report["honors"] = state["honors"].get(player_id, season)
+
+    top, scores = comps.engine.top_k(idx, TOP_N)
+    neighbours = comps.df.iloc[top]
+    report["comps"] = [
+        {"player": str(p), "season": int(s), "tm": str(tm), "seas_id": _id(sid), "similarity": float(score)}
+        for p, s, tm, sid, score in zip(neighbours["player"], neighbours["season"], neighbours["tm"],
+                                        neighbours["seas_id"], scores)
+    ]
+
+    chart = None
+    report["shot_profile"] = report["chart"] = None
+    pos = state["shooting_index"].position(player_id, season)
+    if pos is not None:
+        zones = zones_for_row(state["profiles"], pos)
+        report["shot_profile"] = {
+            zone: {"fga_pct": _value(fga), "fg_pct": _value(fg), "diff": _value(diff)}
+            for zone, (fga, fg, diff) in zones.items()
+        }
+        try:
+            chart = figure_bytes(plot_shot_chart(zones, report["player"], season), fmt="png")
+        except ValueError:
+            pass  # no attempts to plot (the page shows a warning instead)
+    return report, chart
+
+
+def export_item(player_id, season, out_dir):
+    report, chart = build_report(player_id, season)
+    stem = f"{player_id}_{_slug(report['player'])}"
+    season_dir = Path(out_dir) / str(season)
+    season_dir.mkdir(parents=True, exist_ok=True)
+    entry = {"player_id": player_id, "season": season, **_state["fit"],
+             "json": f"{season}/{stem}.json", "png": None}
+    if chart is not None:
+        entry["png"] = report["chart"] = f"{season}/{stem}.png"
+        _write(season_dir / f"{stem}.png", chart)
+    _write(season_dir / f"{stem}.json", json.dumps(report, indent=1, ensure_ascii=False, default=_value).encode())
+    return entry
+
+
+def _init_worker():
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+
+def _export_shard(args):
+    items, out_dir = args
+    return [export_item(player_id, season, out_dir) for player_id, season in items]
+
+
+def read_manifest(path, fit):
+    # (player_id, season) keys already exported under the current feature fit
+    done = set()
+    if not path.exists():
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # a line cut short by an interrupted run
+            if entry.get("fit_id") == fit["fit_id"] and entry.get("generation") == fit["generation"]:
+                done.add((entry["player_id"], entry["season"]))
+    return done
+
+
+def export(items, out_dir, workers=1, shard_size=16, fresh=False):
+    # Exports the items not yet in the manifest; returns (exported, skipped)
+    global _state
+    if _state is None:
+        _state = load_state()
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / "manifest.jsonl"
+    if fresh:
+        manifest_path.unlink(missing_ok=True)
+    done = read_manifest(manifest_path, _state["fit"])
+    todo = [item for item in items if item not in done]
+    shards = [(todo[i:i + shard_size], str(out_dir)) for i in range(0, len(todo), shard_size)]
+
+    exported = 0
+    with open(manifest_path, "a") as manifest:
+        def record(entries):
+            nonlocal exported
+            for entry in entries:
+                manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+            exported += len(entries)
+
+        if workers <= 1:
+            _init_worker()
+            for shard in shards:
+                record(_export_shard(shard))
+        else:
+            # fork: workers inherit the loaded state instead of rebuilding it
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                                     initializer=_init_worker) as pool:
+                for future in as_completed([pool.submit(_export_shard, shard) for shard in shards]):
+                    record(future.result())
+    return exported, len(items) - len(todo)
+
+
+def _parse_seasons(value):
+    # "2015-2025" or "2024"
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+def main():
+    from shared.name_search import name_index
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seasons", type=_parse_seasons, default=None, help="e.g. 2020-2025 or 2024")
+    parser.add_argument("--team", default=None, help="tm abbreviation, e.g. LAL")
+    parser.add_argument("--player", default=None, help="player name (accents and typos are fine)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--shard-size", type=int, default=16)
+    parser.add_argument("--out", default=str(EXPORT_DIR))
+    parser.add_argument("--fresh", action="store_true", help="ignore the manifest and export everything")
+    args = parser.parse_args()
+    out_dir = Path(args.out).resolve()  # load_app_module changes the working directory
+
+    player_id = None
+    if args.player:
+        player_id = name_index().resolve(args.player)
+        if player_id is None:
+            parser.error(f"no player matches {args.player!r}")
+        if player_id < 0:
+            parser.error(f"{args.player!r} has no player_id in the data, so no profile can be keyed")
+
+    start = time.perf_counter()
+    global _state
+    _state = load_state()
+    items = select_items(_state["comps"].df, args.seasons, args.team, player_id)
+    load_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exported, skipped = export(items, out_dir, args.workers, args.shard_size, args.fresh)
+    seconds = time.perf_counter() - start
+    rate = f", {exported / seconds:.1f}/s" if exported else ""
+    print(f"{len(items)} player-seasons: {exported} exported, {skipped} already done "
+          f"(load {load_seconds:.1f}s, export {seconds:.1f}s with {args.workers} workers{rate}) -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Atomic publishing of cache directories (feature artifacts, embeddings).
+#
+# Every build is written to its own directory next to the target, renamed
+# to the version directory <name>.v-<id>/ when complete, and then published by pointing the symlink <name> at it
+# with os.replace, which is atomic. A reader resolves the link once and
+# reads every file from that one version (read_version), so it never sees a
+# missing, half-written or mixed artifact. Concurrent builders each publish
+# a complete version and the last replace wins; nothing fails.
+#
+# The newest KEEP_VERSIONS versions are kept and older ones removed. A reader
+# whose version was removed before it opened its files simply resolves the
+# link again; files it already opened (mmaps) stay valid on POSIX.
+import os
+import shutil
+import uuid
+
+KEEP_VERSIONS = 2
+_READ_ATTEMPTS = 5
+
+
+def read_version(path, read):
+    # read(version_dir) on the current version, again on a newer one if it vanished
+    for attempt in range(_READ_ATTEMPTS):
+        version = path.resolve()
+        try:
+            return read(version)
+        except FileNotFoundError:
+            if attempt == _READ_ATTEMPTS - 1 or path.resolve() == version:
+                raise
+
+
+def publish_dir(path, write):
+    # write(directory) fills a fresh build directory, which is then swapped in.
+    # Builds run under .build-<id> so other builders' pruning leaves them alone.
+    build_id = uuid.uuid4().hex
+    build = path.with_name(f"{path.name}.build-{build_id}")
+    build.mkdir(parents=True)
+    try:
+        write(build)
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+    version = path.with_name(f"{path.name}.v-{build_id}")
+    os.rename(build, version)
+    os.utime(version)  # newest version, so pruning keeps it
+
+    link = path.with_name(f"{path.name}.link-{build_id}")
+    os.symlink(version.name, link)
+    if path.is_dir() and not path.is_symlink():
+        # A directory written before versioning: move it aside once
+        try:
+            os.rename(path, path.with_name(f"{path.name}.v-legacy-{build_id}"))
+        except OSError:
+            pass  # another process moved it first
+    os.replace(link, path)
+    _prune(path)
+    return version
+
+
+def _prune(path):
+    current = path.resolve()
+    versions = sorted(path.parent.glob(f"{path.name}.v-*"), key=_mtime, reverse=True)
+    for old in versions[KEEP_VERSIONS:]:
+        if old != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return 0
@@ -0,0 +1,188 @@
+# Per-season league rank and percentile for every stat of the per-game,
+# per-100 and totals tables, computed for all rows in one vectorized pass.
+#
+#   python -m shared.rankings [--view per_100] [--min-g 0] [--min-mp 0]
+#                             [--player "LeBron James" --season 2023]
+#
+# A RankTable is aligned with its source frame: row i of ranks/pct belongs
+# to row i of the frame, so a player page gets every rank with one
+# player_season_index(...).position() lookup.
+#
+#   ranks   int16 N x d, 1 = league leader (ties share the best rank), 0 = not ranked
+#   pct     float32 N x d, share of the ranked pool at or below the row, NaN if not ranked
+#   pool    number of ranked rows in the row's (season, lg)
+#
+# Rows are ranked within (season, lg). Only one row per player-season
+# competes: the TOT row for traded players, whose per-team rows stay
+# unranked. The min_g / min_mp qualifiers leave short stints unranked too.
+# Tables are saved to data/cache/rankings/ keyed on the source CSV hash.
+import argparse
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from shared.canonical import multi_team_rows, total_rows
+from shared.data_store import load_table, source_sha1
+from shared.instrument import timed
+from shared.paths import CACHE_DIR
+
+RANK_DIR = CACHE_DIR / "rankings"
+FORMAT_VERSION = 1
+
+VIEWS = {
+    "per_game": "Player Per Game",
+    "per_100": "Per 100 Poss",
+    "totals": "Player Totals",
+}
+# Not stats: never ranked
+IDENTITY_COLS = {"seas_id", "season", "player_id", "birth_year", "age", "experience"}
+# Stats where the league leader has the smallest value
+LOWER_IS_BETTER = {
+    "tov", "tov_per_game", "tov_per_100_poss",
+    "pf", "pf_per_game", "pf_per_100_poss",
+    "d_rtg",
+}
+
+
+def stat_columns(df):
+    return [col for col in df.select_dtypes(include=[np.number]).columns if col not in IDENTITY_COLS]
+
+
+def minutes_played(df):
+    # Season minutes; the per-game table only has minutes per game
+    if "mp" in df:
+        return df["mp"].to_numpy(dtype=np.float64)
+    return df["mp_per_game"].to_numpy(dtype=np.float64) * df["g"].to_numpy(dtype=np.float64)
+
+
+def ranked_rows(df, min_g=0, min_mp=0):
+    # One row per player-season (TOT for traded players) that meets the qualifiers
+    keep = ~multi_team_rows(df) | total_rows(df)
+    if min_g:
+        keep &= df["g"].to_numpy(dtype=np.float64) >= min_g
+    if min_mp:
+        keep &= minutes_played(df) >= min_mp
+    return keep
+
+
+class RankTable:
+    def __init__(self, columns, ranks, pct, pool, meta=None):
+        self.columns = list(columns)
+        self.ranks = ranks
+        self.pct = pct
+        self.pool = pool
+        self.meta = meta or {}
+        self._col_pos = {col: i for i, col in enumerate(self.columns)}
+
+    @classmethod
+    @timed("rankings.build")
+    def build(cls, df, min_g=0, min_mp=0, meta=None):
+        columns = stat_columns(df)
+        keep = ranked_rows(df, min_g, min_mp)
+        groups = [df["season"].to_numpy(), df["lg"].astype(str).to_numpy()]
+
+        values = df[columns].astype("float64")[keep]
+        higher = [col for col in columns if col not in LOWER_IS_BETTER]
+        lower = [col for col in columns if col in LOWER_IS_BETTER]
+        by_group = values.groupby([g[keep] for g in groups], sort=False)
+        ranks = pd.concat([
+            by_group[higher].rank(method="min", ascending=False),
+            by_group[lower].rank(method="min", ascending=True),
+        ], axis=1)[columns].reindex(df.index)
+        pct = pd.concat([
+            by_group[higher].rank(method="max", ascending=True, pct=True),
+            by_group[lower].rank(method="max", ascending=False, pct=True),
+        ], axis=1)[columns].reindex(df.index)
+        pool = pd.Series(keep).groupby(groups, sort=False).transform("sum").to_numpy()
+
+        rank_dtype = np.int16 if pool.max(initial=0) <= np.iinfo(np.int16).max else np.int32
+        return cls(
+            columns,
+            ranks.fillna(0).to_numpy().astype(rank_dtype),
+            (pct.to_numpy() * 100).astype(np.float32),
+            np.where(keep, pool, 0).astype(rank_dtype),
+            meta,
+        )
+
+    def __len__(self):
+        return self.ranks.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.ranks.nbytes + self.pct.nbytes + self.pool.nbytes
+
+    def for_row(self, pos):
+        # {stat: (rank, pct)} for frame row pos; empty if the row is not ranked
+        if pos is None or self.pool[pos] == 0:
+            return {}
+        ranks, pct = self.ranks[pos], self.pct[pos]
+        return {col: (int(ranks[i]), float(pct[i])) for i, col in enumerate(self.columns) if ranks[i] > 0}
+
+    def rank(self, pos, stat):
+        return int(self.ranks[pos, self._col_pos[stat]])
+
+    def save(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, ranks=self.ranks, pct=self.pct, pool=self.pool,
+                 columns=np.array(self.columns), meta=json.dumps(self.meta))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["columns"].tolist(), data["ranks"], data["pct"], data["pool"],
+                       json.loads(str(data["meta"])))
+
+
+def rank_key(view, min_g, min_mp):
+    return hashlib.sha1(json.dumps({
+        "version": FORMAT_VERSION, "view": view, "min_g": min_g, "min_mp": min_mp,
+        "source": source_sha1(VIEWS[view]),
+    }).encode()).hexdigest()
+
+
+def load_rank_table(view, df=None, min_g=0, min_mp=0):
+    # Saved table for this view and qualifiers, rebuilt when the source changed.
+    # df must be load_table(VIEWS[view]) (the default) so rows line up.
+    if view not in VIEWS:
+        raise ValueError(f"view must be one of {sorted(VIEWS)}, got {view!r}")
+    df = load_table(VIEWS[view]) if df is None else df
+    min_g, min_mp = float(min_g), float(min_mp)
+    key = rank_key(view, min_g, min_mp)
+    path = RANK_DIR / f"{view}-g{min_g:g}-mp{min_mp:g}.npz"
+    if path.exists():
+        try:
+            table = RankTable.load(path)
+            if table.meta.get("key") == key and len(table) == len(df):
+                return table
+        except (OSError, ValueError, KeyError):
+            pass
+
+    table = RankTable.build(df, min_g, min_mp, meta={"key": key, "view": view, "min_g": min_g, "min_mp": min_mp})
+    table.save(path)
+    return table
+
+
+def main():
+    from shared.lookup import player_season_index
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--view", choices=sorted(VIEWS), default="per_100")
+    parser.add_argument("--min-g", type=float, default=0)
+    parser.add_argument("--min-mp", type=float, default=0)
+    parser.add_argument("--player", default=None)
+    parser.add_argument("--season", type=int, default=None)
+    args = parser.parse_args()
+
+    df = load_table(VIEWS[args.view])
+    table = load_rank_table(args.view, df, args.min_g, args.min_mp)
+    print(f"{args.view}: {len(table)} rows x {len(table.columns)} stats, {table.nbytes / 2 ** 20:.1f} MB")
+    if args.player and args.season:
+        pos = player_season_index(df).position(args.player, args.season)
+        for stat, (rank, pct) in table.for_row(pos).items():
+            print(f"  {stat:20s} {rank:4d} / {table.pool[pos]:<4d} {pct:6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# Headless JSON API over the same preloaded frames the Streamlit apps use.
+#
+#   python -m shared.server [--host 127.0.0.1] [--port 8600] [--window-ms 0] [--max-batch 64]
+#
+#   GET /health
+#   GET /comps?player=LeBron James&season=2023&top_n=10
+#             [&seasons=2015-2025&pos=PG&lg=NBA&min_mp=1000&min_g=40]
+#   GET /profile?player=...&season=...          shot zones vs league average
+#   GET /stats?player=...&season=...&view=per_100|per_game|totals|shooting
+#   GET /honors?player=...&season=...
+#   GET /chart?player=...&season=...&fmt=png|svg
+#   GET /leaders?stat=x3pa_per_100_poss&view=per_100&seasons=2015-2025&min_g=50&top_n=25[&ascending=1]
+#
+# Data is loaded once at startup and shared by every request thread.
+# Concurrent /comps requests are coalesced: a batcher thread collects the
+# requests that arrive within --window-ms (up to --max-batch) and scores them
+# all with one matrix-matrix product.
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+DEFAULT_PORT = 8600  # clear of Streamlit's 8501, so the API and the apps can run side by side
+STAT_VIEWS = {
+    "per_100": "Per 100 Poss",
+    "per_game": "Player Per Game",
+    "totals": "Player Totals",
+    "shooting": "Player Shooting",
+}
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class NotFound(LookupError):
+    pass
+
+
+# Coalesces top-k queries from many threads into one engine.top_k_batch call
+# per window. window_ms=0 still batches whatever is already queued; None
+# turns batching off (no batcher thread is started; CompsService then scores
+# in the request thread).
+class MicroBatcher:
+    def __init__(self, engine, window_ms=0.0, max_batch=64):
+        self.engine = engine
+        self.window = None if window_ms is None else window_ms / 1000
+        self.max_batch = max_batch
+        self.batches = 0
+        self.queries = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        if self.window is not None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def submit(self, idx, k, candidates=None):
+        if self._thread is None:
+            raise RuntimeError("batching is off (window_ms=None); score with the engine directly")
+        future = Future()
+        self._queue.put((idx, k, candidates, future))
+        return future
+
+    def top_k(self, idx, k, candidates=None):
+        return self.submit(idx, k, candidates).result()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._score(batch)
+
+    def _score(self, batch):
+        try:
+            k = max(item[1] for item in batch)
+            candidates = [item[2] for item in batch]
+            results = self.engine.top_k_batch(
+                [item[0] for item in batch], k,
+                candidates=candidates if any(c is not None for c in candidates) else None,
+            )
+        except Exception as e:  # surface the failure to every waiting request
+            for item in batch:
+                item[3].set_exception(e)
+            return
+        self.batches += 1
+        self.queries += len(batch)
+        for (_, item_k, _, future), (top, scores) in zip(batch, results):
+            future.set_result((top[:item_k], scores[:item_k]))
+
+
+class CompsService:
+    def __init__(self, window_ms=0.0, max_batch=64):
+        from shared.apps import load_app_module
+        from shared.data_store import load_table
+
+        self._load_table = load_table
+        self.comps, _ = load_app_module("PlayerComps_with_Shooting")
+        self.batcher = MicroBatcher(self.comps.engine, window_ms=window_ms, max_batch=max_batch)
+        self.shooting_df = load_table("Player Shooting")
+        self.league_avg_df = load_table("League Average Shooting").set_index("Season")
+        self._tables = {}
+        self._honors = None
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        # Stat and award tables are loaded on first use, once per process
+        with self._lock:
+            if name not in self._tables:
+                try:
+                    self._tables[name] = self._load_table(name)
+                except FileNotFoundError as e:
+                    raise NotFound(str(e))
+            return self._tables[name]
+
+    def honors(self):
+        from shared.honors import HonorsTable
+
+        with self._lock:
+            if self._honors is None:
+                self._honors = HonorsTable(
+                    self._load_table("All-Star Selections"), self._load_table("End of Season Teams"),
+                    self._load_table("Player Award Shares"), self._load_table("Player Career Info"),
+                )
+            return self._honors
+
+    def similar(self, player, season, top_n=10, seasons=None, pos=None, lg=None, min_mp=None, min_g=None):
+        comps = self.comps
+        idx = comps.season_index.position(player, season)
+        if idx is None:
+            raise NotFound(f"No data for {player} in {season}")
+        candidates = comps.filter_index.candidates(seasons=seasons, pos=pos, lg=lg, min_mp=min_mp, min_g=min_g)
+        if self.batcher.window is None:  # batching off: score in the request thread
+            top, scores = comps.engine.top_k(idx, top_n, candidates=candidates)
+        else:
+            top, scores = self.batcher.top_k(idx, top_n, candidates=candidates)
+
+        rows = comps.df.iloc[top]
+        return [
+            {"player": p, "season": int(s), "tm": str(tm), "seas_id": int(sid), "similarity": float(score)}
+            for p, s, tm, sid, score in zip(rows["player"], rows["season"], rows["tm"], rows["seas_id"], scores)
+        ]
+
+    def profile(self, player, season):
+        from shared.lookup import player_season_index
+        from shared.shot_profiles import shot_profiles, zones_for_row
+
+        pos = player_season_index(self.shooting_df).position(player, season)
+        if pos is None:
+            raise NotFound(f"No shooting data for {player} in {season}")
+        zones = zones_for_row(shot_profiles(self.shooting_df, self.league_avg_df), pos)
+        return {label: {"fga_pct": _num(fga), "fg_pct": _num(fg), "diff": _num(diff)}
+                for label, (fga, fg, diff) in zones.items()}
+
+    def stats(self, player, season, view="per_100"):
+        from shared.lookup import player_season_index
+
+        if view not in STAT_VIEWS:
+            raise BadRequest(f"view must be one of {sorted(STAT_VIEWS)}")
+        df = self.table(STAT_VIEWS[view])
+        row = player_season_index(df).row(df, player, season)
+        if row is None:
+            raise NotFound(f"No {view} stats for {player} in {season}")
+        return {col: _num(value) for col, value in row.items()}
+
+    def honors_for(self, player, season):
+        honors = self.honors().lookup(player, season)
+        return json.loads(json.dumps(honors, default=_num))
+
+    def leaders(self, stat, view="per_100", top_n=25, seasons=None, ascending=False, min_g=None, min_mp=None):
+        from shared.leaderboards import leaderboard
+
+        if view not in STAT_VIEWS:
+            raise BadRequest(f"view must be one of {sorted(STAT_VIEWS)}")
+        board = leaderboard(self.table(STAT_VIEWS[view]))
+        if stat not in board.columns:
+            raise BadRequest(f"unknown stat {stat!r} for view {view}")
+        rows = board.board(stat, top_n, seasons, ascending, min_g=min_g, min_mp=min_mp)
+        return [{col: _num(value) for col, value in row.items()} for row in rows.to_dict("records")]
+
+    def chart(self, player, season, fmt="png"):
+        # Safe from request threads: shared.charts draws on per-call figures, not pyplot
+        from shared.charts import shot_chart_bytes
+
+        try:
+            return shot_chart_bytes(self.shooting_df, player, season, self.league_avg_df, fmt=fmt)
+        except ValueError as e:
+            raise NotFound(str(e))
+
+
+def _num(value):
+    # numpy/pandas scalars -> plain JSON values, NaN -> null
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, (bool, int, float, str)) or value is None:
+        return value
+    return str(value)
+
+
+def _parse_seasons(value):
+    # "2015-2025" or "2024"
+    first, _, last = value.partition("-")
+    return int(first), int(last or first)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so load tests measure the service, not connects
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    service = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if content_type == "application/json":
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            self._route(url.path, params)
+        except BadRequest as e:
+            self._send(400, {"error": str(e)})
+        except NotFound as e:
+            self._send(404, {"error": str(e)})
+        except Exception as e:
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def _route(self, path, params):
+        service = self.service
+        if path == "/health":
+            batcher = service.batcher
+            self._send(200, {"status": "ok", "rows": len(service.comps.df),
+                             "batches": batcher.batches, "queries": batcher.queries})
+            return
+
+        if path == "/leaders":
+            try:
+                stat = params["stat"]
+                query = {
+                    "view": params.get("view", "per_100"),
+                    "top_n": int(params.get("top_n", 25)),
+                    "seasons": _parse_seasons(params["seasons"]) if "seasons" in params else None,
+                    "ascending": params.get("ascending") == "1",
+                    "min_g": float(params["min_g"]) if "min_g" in params else None,
+                    "min_mp": float(params["min_mp"]) if "min_mp" in params else None,
+                }
+            except KeyError as e:
+                raise BadRequest(f"missing parameter {e.args[0]!r}")
+            except ValueError as e:
+                raise BadRequest(str(e))
+            self._send(200, service.leaders(stat, **query))
+            return
+
+        if path not in ("/comps", "/profile", "/stats", "/honors", "/chart"):
+            raise NotFound(f"unknown endpoint {path}")
+        try:
+            player, season = params["player"], int(params["season"])
+        except KeyError as e:
+            raise BadRequest(f"missing parameter {e.args[0]!r}")
+        except ValueError:
+            raise BadRequest("season must be an integer")
+
+        if path == "/comps":
+            try:
+                filters = {
+                    "seasons": _parse_seasons(params["seasons"]) if "seasons" in params else None,
+                    "pos": params.get("pos"),
+                    "lg": params.get("lg"),
+                    "min_mp": float(params["min_mp"]) if "min_mp" in params else None,
+                    "min_g": float(params["min_g"]) if "min_g" in params else None,
+                }
+                top_n = int(params.get("top_n", 10))
+            except ValueError as e:
+                raise BadRequest(str(e))
+            self._send(200, service.similar(player, season, top_n=top_n, **filters))
+        elif path == "/profile":
+            self._send(200, service.profile(player, season))
+        elif path == "/stats":
+            self._send(200, service.stats(player, season, view=params.get("view", "per_100")))
+        elif path == "/honors":
+            self._send(200, service.honors_for(player, season))
+        elif path == "/chart":
+            fmt = params.get("fmt", "png")
+            if fmt not in ("png", "svg"):
+                raise BadRequest("fmt must be png or svg")
+            self._send(200, service.chart(player, season, fmt=fmt),
+                       content_type="image/png" if fmt == "png" else "image/svg+xml")
+
+
+class CompsHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # the default backlog of 5 drops connects under load
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, window_ms=0.0, max_batch=64, service=None):
+    # port=0 picks a free port; see server.server_address
+    handler = type("BoundHandler", (Handler,), {"service": service or CompsService(window_ms, max_batch)})
+    return CompsHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--window-ms", type=float, default=0.0, help="negative turns batching off")
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    window_ms = None if args.window_ms < 0 else args.window_ms
+    server = make_server(args.host, args.port, window_ms, args.max_batch)
+    host, port = server.server_address[:2]
+    print(f"loaded in {time.perf_counter() - start:.1f}s, serving on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# Vectorized shot profiles: the zone table (FGA share, FG%, league FG% and
+# the difference) for every row of Player Shooting in one pass, joined to
+# League Average Shooting on season. get_player_shot_profile() in the apps
+# just slices its player's rows out of this table.
+#
+#   python -m shared.shot_profiles [--out data/cache/shot_profiles.parquet]
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from shared.lookup import cached_per_frame
+from shared.paths import CACHE_DIR
+
+# (label, FG% column, FGA-share column); 3PT zones get their share split below
+ZONES = [
+    ("0–3 ft", "fg_percent_from_x0_3_range", "percent_fga_from_x0_3_range"),
+    ("3–10 ft", "fg_percent_from_x3_10_range", "percent_fga_from_x3_10_range"),
+    ("10–16 ft", "fg_percent_from_x10_16_range", "percent_fga_from_x10_16_range"),
+    ("16 ft – 3PT", "fg_percent_from_x16_3p_range", "percent_fga_from_x16_3p_range"),
+    ("Corner 3", "corner_3_point_percent", None),
+    ("Non-Corner 3", "fg_percent_from_x3p_range", None),
+]
+ZONE_LABELS = [label for label, _, _ in ZONES]
+
+
+def shot_profile_table(shooting_df, league_avg_df):
+    # Tidy frame, len(ZONES) rows per shooting row, in shooting_df row order
+    n = len(shooting_df)
+    league = league_avg_df.reindex(shooting_df["season"].to_numpy())
+
+    def col(frame, name):
+        return frame[name].to_numpy(dtype=np.float64) * 100
+
+    three_share = col(shooting_df, "percent_fga_from_x3p_range")
+    corner_share = shooting_df["percent_corner_3s_of_3pa"].to_numpy(dtype=np.float64) * three_share
+    fga_pct = np.column_stack([
+        corner_share if label == "Corner 3"
+        else three_share - corner_share if label == "Non-Corner 3"
+        else col(shooting_df, share_col)
+        for label, _, share_col in ZONES
+    ])
+    fg_pct = np.column_stack([col(shooting_df, fg_col) for _, fg_col, _ in ZONES])
+    league_fg_pct = np.column_stack([col(league, fg_col) for _, fg_col, _ in ZONES])
+
+    per_row = len(ZONES)
+    table = pd.DataFrame({
+        "row": np.repeat(np.arange(n), per_row),
+        "seas_id": np.repeat(shooting_df["seas_id"].to_numpy(), per_row),
+        "player": np.repeat(shooting_df["player"].to_numpy(), per_row),
+        "season": np.repeat(shooting_df["season"].to_numpy(), per_row),
+        "tm": np.repeat(shooting_df["tm"].astype(str).to_numpy(), per_row),
+        "zone": pd.Categorical(np.tile(ZONE_LABELS, n), categories=ZONE_LABELS, ordered=True),
+        "fga_pct": fga_pct.ravel(),
+        "fg_pct": fg_pct.ravel(),
+        "league_fg_pct": league_fg_pct.ravel(),
+        "diff": (fg_pct - league_fg_pct).ravel(),
+    })
+    return table
+
+
+def shot_profiles(shooting_df, league_avg_df):
+    # Cached shot_profile_table for the frames the apps keep loaded
+    return cached_per_frame(
+        shooting_df, ("shot_profiles", id(league_avg_df)),
+        lambda: shot_profile_table(shooting_df, league_avg_df),
+    )
+
+
+def zones_for_row(table, pos):
+    # {zone: (fga_pct, fg_pct, diff)} for shooting row pos, as plot_shot_chart expects
+    rows = table.iloc[pos * len(ZONES):(pos + 1) * len(ZONES)]
+    return dict(zip(ZONE_LABELS, zip(rows["fga_pct"], rows["fg_pct"], rows["diff"])))
+
+
+def main():
+    from shared.data_store import load_table
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=str(CACHE_DIR / "shot_profiles.parquet"))
+    args = parser.parse_args()
+
+    table = shot_profile_table(load_table("Player Shooting"),
+                               load_table("League Average Shooting").set_index("Season"))
+    table.to_parquet(args.out, index=False)
+    print(f"{table['row'].nunique()} player-seasons x {len(ZONES)} zones -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
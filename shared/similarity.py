@@ -0,0 +1,250 @@
+import os
+
+import numpy as np
+
+# Storage precision for the normalized matrix. float16 and int8 trade a
+# little ranking accuracy for 2-4x less memory than float32; see
+# benchmarks/bench_precision.py for the overlap/latency report.
+PRECISIONS = ("float64", "float32", "float16", "int8")
+DEFAULT_PRECISION = os.environ.get("NBA_COMPS_PRECISION")  # None keeps the input dtype
+
+_CHUNK_ROWS = 8192  # compact rows are widened to float32 this many at a time
+_DENSE_CANDIDATE_SHARE = 0.25  # above this share, filtered queries score every row
+
+
+# Cosine similarity engine that keeps only the L2-normalized feature matrix
+# (N x d) in memory. Scores for one player-season are a single matrix-vector
+# product, so nothing of size N x N is ever built.
+class SimilarityEngine:
+    def __init__(self, features, precision="float64"):
+        features = np.asarray(features, dtype=np.float64)
+        norms = np.linalg.norm(features, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0  # all-zero rows score 0 against everything, like cosine_similarity
+        self._store(features / norms, precision)
+
+    @classmethod
+    def from_normalized(cls, vectors, precision=DEFAULT_PRECISION):
+        # Wraps an already normalized matrix as-is (e.g. a memory-mapped
+        # artifact) unless a different storage precision is requested
+        engine = cls.__new__(cls)
+        if precision is None or precision == vectors.dtype.name:
+            engine.vectors = vectors
+            engine.code_scale = None
+        else:
+            engine._store(np.asarray(vectors), precision)
+        return engine
+
+    def _store(self, vectors, precision):
+        if precision not in PRECISIONS:
+            raise ValueError(f"precision must be one of {PRECISIONS}, got {precision!r}")
+        self.code_scale = None
+        if precision == "int8":
+            # Symmetric per-column quantization; normalized values lie in [-1, 1]
+            scale = np.abs(vectors).max(axis=0) / 127
+            scale[scale == 0] = 1.0
+            self.vectors = np.round(vectors / scale).astype(np.int8)
+            self.code_scale = scale.astype(np.float32)
+        else:
+            self.vectors = vectors.astype(precision, copy=False)
+
+    @property
+    def precision(self):
+        return "int8" if self.code_scale is not None else self.vectors.dtype.name
+
+    @property
+    def nbytes(self):
+        return self.vectors.nbytes + (0 if self.code_scale is None else self.code_scale.nbytes)
+
+    def __len__(self):
+        return self.vectors.shape[0]
+
+    def _compute_dtype(self):
+        return np.float64 if self.vectors.dtype == np.float64 else np.float32
+
+    def vector(self, idx):
+        # Row idx as a float query vector (dequantized for int8 storage)
+        row = np.asarray(self.vectors[idx], dtype=self._compute_dtype())
+        return row * self.code_scale if self.code_scale is not None else row
+
+    def _dot(self, query):
+        if self.vectors.dtype in (np.float64, np.float32):
+            return self.vectors @ query.astype(self.vectors.dtype, copy=False)
+
+        # float16/int8 have no BLAS kernels: widen in bounded chunks instead
+        if self.code_scale is not None:
+            query = query * self.code_scale
+        query = query.astype(np.float32, copy=False)
+        scores = np.empty(len(self), dtype=np.float32)
+        for start in range(0, len(self), _CHUNK_ROWS):
+            chunk = self.vectors[start:start + _CHUNK_ROWS]
+            scores[start:start + len(chunk)] = chunk.astype(np.float32) @ query
+        return scores
+
+    def _dot_rows(self, rows, query):
+        # Scores for a candidate subset only, so cost scales with len(rows)
+        if self.vectors.dtype in (np.float64, np.float32):
+            return self.vectors[rows] @ query.astype(self.vectors.dtype, copy=False)
+        if self.code_scale is not None:
+            query = query * self.code_scale
+        return self.vectors[rows].astype(np.float32) @ query.astype(np.float32, copy=False)
+
+    def scores(self, idx):
+        return self._dot(self.vector(idx))
+
+    def scores_batch(self, indices):
+        # B x N scores for several query rows in one matrix-matrix product
+        queries = np.stack([self.vector(idx) for idx in indices])
+        if self.vectors.dtype in (np.float64, np.float32):
+            return queries.astype(self.vectors.dtype, copy=False) @ self.vectors.T
+
+        if self.code_scale is not None:
+            queries = queries * self.code_scale
+        queries = queries.astype(np.float32, copy=False)
+        scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        for start in range(0, len(self), _CHUNK_ROWS):
+            chunk = self.vectors[start:start + _CHUNK_ROWS]
+            scores[:, start:start + len(chunk)] = queries @ chunk.astype(np.float32).T
+        return scores
+
+    def top_k_batch(self, indices, k, exclude_self=True, candidates=None):
+        # top_k for several rows at once; candidates is None or one entry
+        # (row positions or None) per query. Returns a list of (top, scores).
+        scores = self.scores_batch(indices)
+        results = []
+        for i, idx in enumerate(indices):
+            row = scores[i]
+            k_i = k
+            if candidates is not None and candidates[i] is not None:
+                allowed = np.zeros(len(self), dtype=bool)
+                allowed[candidates[i]] = True
+                row[~allowed] = -np.inf
+                k_i = min(k, len(candidates[i]))
+            top, top_scores = self._top_k(row, k_i, idx if exclude_self else None)
+            keep = np.isfinite(top_scores)
+            results.append((top[keep], top_scores[keep]))
+        return results
+
+    def top_k_for_vector(self, query, k, exclude=None, candidates=None):
+        query = np.asarray(query, dtype=self._compute_dtype())
+        norm = np.linalg.norm(query)
+        query = query / norm if norm else query
+        if candidates is not None:
+            return self._top_k_subset(query, k, exclude, candidates)
+        return self._top_k(self._dot(query), k, exclude)
+
+    def top_k(self, idx, k, exclude_self=True, candidates=None):
+        # candidates: optional row positions to rank against (a pre-filter)
+        exclude = idx if exclude_self else None
+        if candidates is not None:
+            return self._top_k_subset(self.vector(idx), k, exclude, candidates)
+        return self._top_k(self.scores(idx), k, exclude)
+
+    def _top_k_subset(self, query, k, exclude, candidates):
+        candidates = np.asarray(candidates, dtype=np.intp)
+        if len(candidates) > len(self) * _DENSE_CANDIDATE_SHARE:
+            # Wide filters: one full BLAS pass plus a mask beats gathering rows
+            scores = self._dot(query)
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[candidates] = True
+            scores[~allowed] = -np.inf
+            top, top_scores = self._top_k(scores, min(k, len(candidates)), exclude)
+            keep = np.isfinite(top_scores)
+            return top[keep], top_scores[keep]
+
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        top, scores = self._top_k(self._dot_rows(candidates, query), k, None)
+        return candidates[top], scores
+
+    def _top_k(self, scores, k, exclude):
+        return top_k_of(scores, k, exclude)
+
+
+def top_k_of(scores, k, exclude=None):
+    # Best k positions of a score vector (exclude is masked out in place)
+    if exclude is not None:
+        scores[exclude] = -np.inf
+    k = min(k, len(scores) - (0 if exclude is None else np.size(exclude)))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=scores.dtype)
+
+    # argpartition picks the k best in O(N); only those k get sorted
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return top, scores[top]
+
+
+# Cosine similarity with the column weights applied at query time. Keeps the
+# standardized (unweighted) features Z once; for weights w,
+#
+#   sim(a, b) = sum(w^2 * z_a * z_b) / (|w * z_a| |w * z_b|)
+#
+# and |w * z| for every row is one product Z^2 @ w^2, so a new weighting
+# costs two matrix products instead of a feature rebuild. Every method takes
+# one weight vector (d,) or a stack of them (B x d) and scores all at once.
+class WeightedSimilarity:
+    def __init__(self, standardized):
+        self.z = np.ascontiguousarray(standardized, dtype=np.float32)
+        self.z_sq = self.z ** 2
+        self._norm_cache = {}
+
+    @classmethod
+    def from_artifact(cls, artifact):
+        # Undo the artifact's baked-in weights (a weight-0 column stays 0)
+        weights = np.asarray(artifact.weights, dtype=np.float64)
+        safe = np.where(weights == 0, 1.0, weights)
+        return cls(np.asarray(artifact.features, dtype=np.float32) / safe.astype(np.float32))
+
+    def __len__(self):
+        return self.z.shape[0]
+
+    def _weight_sets(self, weights):
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float32))
+        if weights.shape[1] != self.z.shape[1]:
+            raise ValueError(f"expected {self.z.shape[1]} weights per set, got {weights.shape[1]}")
+        return weights
+
+    def norms(self, weights):
+        # N x B weighted row norms; the last few weight sets are cached
+        weights = self._weight_sets(weights)
+        key = weights.tobytes()
+        norms = self._norm_cache.get(key)
+        if norms is None:
+            norms = np.sqrt(self.z_sq @ (weights ** 2).T)
+            norms[norms == 0] = 1.0
+            if len(self._norm_cache) >= 8:
+                self._norm_cache.pop(next(iter(self._norm_cache)))
+            self._norm_cache[key] = norms
+        return norms
+
+    def scores(self, indices, weights):
+        # len(indices) x B x N scores: every query row under every weight set
+        weights = self._weight_sets(weights)
+        norms = self.norms(weights)
+        queries = self.z[indices][:, None, :] * weights[None] ** 2
+        dots = (queries.reshape(-1, self.z.shape[1]) @ self.z.T).reshape(len(indices), len(weights), -1)
+        return dots / norms.T[None] / norms[indices][:, :, None]
+
+    def top_k_configs(self, idx, k, weights, exclude_self=True, candidates=None):
+        # One query under many weight sets; a list of (top, scores), one per set
+        scores = self.scores([idx], weights)[0]
+        results = []
+        for row in scores:
+            k_i = k
+            if candidates is not None:
+                allowed = np.zeros(len(self), dtype=bool)
+                allowed[candidates] = True
+                row[~allowed] = -np.inf
+                k_i = min(k, len(candidates))
+            top, top_scores = top_k_of(row, k_i, idx if exclude_self else None)
+            keep = np.isfinite(top_scores)
+            results.append((top[keep], top_scores[keep]))
+        return results
+
+    def top_k(self, idx, k, weights, exclude_self=True, candidates=None):
+        return self.top_k_configs(idx, k, self._weight_sets(weights)[:1], exclude_self, candidates)[0]
+
+    def top_k_batch(self, indices, k, weights, exclude_self=True):
+        # Many queries under one weight set; a list of (top, scores), one per query
+        scores = self.scores(indices, self._weight_sets(weights)[:1])[:, 0]
+        return [top_k_of(row, k, idx if exclude_self else None) for idx, row in zip(indices, scores)]
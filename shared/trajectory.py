@@ -0,0 +1,87 @@
+# Career-trajectory similarity: "whose arc through ages 21-26 looks most like
+# this player's". Each player's per-season normalized feature vectors are laid
+# out once in a padded (players x ages x features) tensor plus a presence
+# mask, so a query scores every player's window in one batched product.
+#
+# A trajectory score is the mean per-season cosine over the query's seasons;
+# seasons a candidate is missing count as 0, so partial careers rank lower.
+import numpy as np
+import pandas as pd
+
+
+class TrajectoryIndex:
+    def __init__(self, df, vectors, key="age"):
+        # key: "age" or "experience", the axis seasons are aligned on
+        self.key = key
+        player_ids = df["player_id"].to_numpy(dtype=np.float64)
+        keys = df[key].to_numpy()
+        is_total = df["tm"].astype(str).to_numpy() == "TOT"
+
+        # One row per (player, key): the TOT row for traded players. Rows without
+        # a real player_id (NaN, or 0 from a frame filled before indexing) are skipped
+        rows = np.flatnonzero(~np.isnan(player_ids) & (player_ids > 0))
+        rows = rows[np.lexsort((~is_total[rows], keys[rows], player_ids[rows]))]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = (player_ids[rows][1:] != player_ids[rows][:-1]) | (keys[rows][1:] != keys[rows][:-1])
+        rows = rows[first]
+
+        codes, uniques = pd.factorize(player_ids[rows], sort=True)
+        self.player_ids = uniques.astype(np.int64)
+        self.key_min = int(keys[rows].min())
+        slots = keys[rows] - self.key_min
+        n_keys = int(slots.max()) + 1
+
+        self.tensor = np.zeros((len(uniques), n_keys, vectors.shape[1]), dtype=np.float32)
+        self.tensor[codes, slots] = vectors[rows]
+        self.mask = np.zeros((len(uniques), n_keys), dtype=bool)
+        self.mask[codes, slots] = True
+        self.rows = np.full((len(uniques), n_keys), -1, dtype=np.int64)
+        self.rows[codes, slots] = rows  # df row behind each filled slot
+
+        # Display name per player: the name on their most recent row
+        names = pd.Series(df["player"].astype(str).to_numpy()[rows], index=codes)
+        self.names = names.groupby(level=0).last().reindex(range(len(uniques))).to_numpy()
+        self._code_by_id = {pid: code for code, pid in enumerate(self.player_ids)}
+
+    def code(self, player_id):
+        return self._code_by_id.get(int(player_id))
+
+    def _window(self, start, end):
+        lo = max(int(start) - self.key_min, 0)
+        hi = min(int(end) - self.key_min + 1, self.tensor.shape[1])
+        return lo, hi
+
+    def scores(self, player_id, start, end):
+        # (score, overlap) for every player over key values start..end inclusive
+        code = self.code(player_id)
+        if code is None:
+            raise ValueError(f"No seasons for player_id {player_id}")
+        lo, hi = self._window(start, end)
+        query_mask = self.mask[code, lo:hi]
+        n_query = int(query_mask.sum())
+        if n_query == 0:
+            raise ValueError(f"player_id {player_id} has no seasons with {self.key} {start}-{end}")
+
+        window = self.tensor[:, lo:hi]
+        # players x seasons cosines in one batched product
+        dots = np.einsum("pad,ad->pa", window, self.tensor[code, lo:hi], optimize=True)
+        both = self.mask[:, lo:hi] & query_mask
+        score = np.where(both, dots, 0).sum(axis=1) / n_query
+        return score, both.sum(axis=1)
+
+    def similar(self, player_id, start, end, top_n=10, min_overlap=1):
+        score, overlap = self.scores(player_id, start, end)
+        score[overlap < min_overlap] = -np.inf
+        score[self.code(player_id)] = -np.inf
+
+        k = min(top_n, int(np.isfinite(score).sum()))
+        if k <= 0:
+            return pd.DataFrame(columns=["player_id", "player", "score", "seasons_matched"])
+        top = np.argpartition(-score, k - 1)[:k]
+        top = top[np.argsort(-score[top], kind="stable")]
+        return pd.DataFrame({
+            "player_id": self.player_ids[top],
+            "player": self.names[top],
+            "score": score[top],
+            "seasons_matched": overlap[top],
+        })
@@ -0,0 +1,189 @@
+# Weight-tuning harness for the comps engines: scores many weights_by_stat
+# variants against a labelled set of "should be comps" pairs.
+#
+#   python -m shared.weight_tuning [--app PlayerComps_with_Shooting] [--labels next_season]
+#                                  [--configs 256] [--sigma 0.5] [--queries 500] [--k 10]
+#                                  [--workers 4] [--from-json configs.json]
+#
+# Label sets (positives for a query row):
+#
+#   next_season   the same player's previous and next season
+#   honors        other players' seasons with the same All-NBA / All-Defensive /
+#                 All-Rookie team selection (e.g. "All-NBA 1st Team")
+#
+# Configurations are the app's weights_by_stat plus --configs random variants
+# (each weight times exp(N(0, sigma))), or a JSON list of {stat: weight} dicts.
+# For each config and query the best-ranked positive gives hit@k (a positive
+# in the top k) and the reciprocal rank; configs are reported by mean
+# reciprocal rank (MRR). Scoring uses WeightedSimilarity, so a chunk of
+# configs shares each matrix product, and chunks run in --workers processes.
+# The report is written to data/cache/tuning/<app>-<labels>.json.
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from shared.features import weight_vector
+from shared.paths import CACHE_DIR
+from shared.similarity import WeightedSimilarity
+
+TUNING_DIR = CACHE_DIR / "tuning"
+LABELS = ("next_season", "honors")
+_QUERY_CHUNK = 16  # query rows scored together (x configs x N floats)
+
+
+def next_season_pairs(df):
+    # Row -> rows of the same player one season before or after
+    rows = pd.DataFrame({"player_id": df["player_id"].to_numpy(), "season": df["season"].to_numpy()})
+    rows["row"] = np.arange(len(df))
+    rows = rows.dropna(subset=["player_id"])
+    positives = {}
+    for shift in (-1, 1):
+        hits = rows.merge(rows.assign(season=rows["season"] - shift), on=["player_id", "season"], suffixes=("", "_pos"))
+        for row, pos in zip(hits["row"], hits["row_pos"]):
+            positives.setdefault(row, set()).add(pos)
+    return positives
+
+
+def honors_pairs(df):
+    # Row -> other players' rows that got the same end-of-season team
+    from shared.data_store import load_table
+    from shared.honors import HonorsTable
+
+    honors = HonorsTable(
+        load_table("All-Star Selections"), load_table("End of Season Teams"),
+        load_table("Player Award Shares"), load_table("Player Career Info"),
+    )
+    groups = {}
+    for row, (player_id, season) in enumerate(zip(df["player_id"], df["season"])):
+        if pd.isna(player_id):
+            continue
+        for team in honors.get(player_id, season)["teams"]:
+            groups.setdefault(team, []).append((row, player_id))
+    positives = {}
+    for members in groups.values():
+        for row, player_id in members:
+            others = {other for other, other_id in members if other_id != player_id}
+            if others:
+                positives.setdefault(row, set()).update(others)
+    return positives
+
+
+def labelled_queries(df, labels, n_queries, seed=0):
+    positives = next_season_pairs(df) if labels == "next_season" else honors_pairs(df)
+    rows = np.array(sorted(positives), dtype=np.intp)
+    rng = np.random.default_rng(seed)
+    if len(rows) > n_queries:
+        rows = np.sort(rng.choice(rows, size=n_queries, replace=False))
+    return rows, [np.array(sorted(positives[row]), dtype=np.intp) for row in rows]
+
+
+def evaluate(engine, queries, positives, weight_sets, k=10):
+    # hit@k and MRR per weight set (B), averaged over the queries
+    weight_sets = np.atleast_2d(weight_sets)
+    hits = np.zeros(len(weight_sets))
+    reciprocal = np.zeros(len(weight_sets))
+    for start in range(0, len(queries), _QUERY_CHUNK):
+        chunk = queries[start:start + _QUERY_CHUNK]
+        scores = engine.scores(chunk, weight_sets)  # chunk x B x N
+        for i, (row, pos) in enumerate(zip(chunk, positives[start:start + _QUERY_CHUNK])):
+            s = scores[i]
+            s[:, row] = -np.inf
+            best = s[:, pos].max(axis=1)
+            rank = (s > best[:, None]).sum(axis=1) + 1
+            hits += rank <= k
+            reciprocal += 1.0 / rank
+    return hits / len(queries), reciprocal / len(queries)
+
+
+_worker = {}
+
+
+def _init_worker(standardized, queries, positives, k):
+    _worker.update(engine=WeightedSimilarity(standardized), queries=queries, positives=positives, k=k)
+
+
+def _evaluate_chunk(weight_sets):
+    return evaluate(_worker["engine"], _worker["queries"], _worker["positives"], weight_sets, _worker["k"])
+
+
+def random_configs(base_weights, n, sigma=0.5, seed=0):
+    # The base weights first, then n log-normal perturbations of them
+    rng = np.random.default_rng(seed)
+    noise = np.exp(sigma * rng.standard_normal((n, len(base_weights))))
+    return np.vstack([base_weights, base_weights * noise])
+
+
+def tune(engine, queries, positives, weight_sets, k=10, workers=1, chunk=32):
+    chunks = [weight_sets[i:i + chunk] for i in range(0, len(weight_sets), chunk)]
+    if workers <= 1:
+        results = [evaluate(engine, queries, positives, c, k) for c in chunks]
+    else:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(engine.z, queries, positives, k)) as pool:
+            results = list(pool.map(_evaluate_chunk, chunks))
+    return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+
+def main():
+    from shared.apps import load_app_module
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="PlayerComps_with_Shooting", choices=["PlayerComps", "PlayerComps_with_Shooting"])
+    parser.add_argument("--labels", default="next_season", choices=LABELS)
+    parser.add_argument("--configs", type=int, default=256)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--from-json", default=None, help="JSON list of {stat: weight} dicts")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    comps, _ = load_app_module(args.app)
+    cols = comps.numeric_cols
+    engine = WeightedSimilarity.from_artifact(comps.artifact)
+    queries, positives = labelled_queries(comps.df, args.labels, args.queries, args.seed)
+
+    base = weight_vector(cols, comps.weights_by_stat)
+    if args.from_json:
+        with open(args.from_json) as f:
+            weight_sets = np.vstack([base] + [weight_vector(cols, config) for config in json.load(f)])
+    else:
+        weight_sets = random_configs(base, args.configs, args.sigma, args.seed)
+
+    start = time.perf_counter()
+    hit_rate, mrr = tune(engine, queries, positives, weight_sets, args.k, args.workers)
+    seconds = time.perf_counter() - start
+
+    order = np.argsort(-mrr, kind="stable")
+    report = {
+        "app": args.app, "labels": args.labels, "queries": len(queries), "k": args.k,
+        "seconds": seconds, "columns": cols,
+        "configs": [
+            {"config": int(i), "base": bool(i == 0), "mrr": float(mrr[i]), f"hit@{args.k}": float(hit_rate[i]),
+             "weights": dict(zip(cols, weight_sets[i].round(4).tolist()))}
+            for i in order
+        ],
+    }
+    TUNING_DIR.mkdir(parents=True, exist_ok=True)
+    out = TUNING_DIR / f"{args.app}-{args.labels}.json"
+    out.write_text(json.dumps(report, indent=2))
+
+    print(f"{len(weight_sets)} configs x {len(queries)} queries in {seconds:.1f}s "
+          f"({len(weight_sets) * len(queries) / seconds:.0f} config-queries/s)")
+    print(f"base: MRR {mrr[0]:.3f}, hit@{args.k} {hit_rate[0]:.3f}")
+    for i in order[:10]:
+        # The stats this config moved most relative to the base weights
+        change = np.log(weight_sets[i] / np.where(base == 0, 1, base))
+        moved = "base" if i == 0 else ", ".join(
+            f"{cols[j]} x{np.exp(change[j]):.2f}" for j in np.argsort(-np.abs(change))[:3])
+        print(f"  #{i:<4d} MRR {mrr[i]:.3f}  hit@{args.k} {hit_rate[i]:.3f}  {moved}")
+    print(f"-> {out}")
+
+
+if __name__ == "__main__":
+    main()